@@ -1,12 +1,23 @@
 # backend/app.py
-from flask import Flask, request, jsonify, render_template, session, redirect, url_for, flash, send_file
+from flask import Flask, Blueprint, Response, current_app, request, jsonify, render_template, session, redirect, url_for, flash, send_file, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select, update, insert, extract, bindparam, inspect, text, func, or_, and_
 from datetime import datetime
-import os, re, ast
+import os, re, ast, time
+from itertools import chain, count
+import click
 from pathlib import Path
-import pandas as pd
-from .utils import time_to_seconds
+from .utils import time_to_seconds, times_to_seconds
+from .export import format_export_rows, write_xlsx, iter_csv
+from .serialize import ndjson_chunk, json_array_chunks
+from .ingest import BULK_CHUNK_SIZE, detect_format, iter_bulk_rows, chunked
+from .scoring import (
+    compile_base_times, base_time_slot, compile_rudolph_index, rudolph_cell_key, lookup_rudolph_points,
+    fina_points_array, rudolph_points_array, rudolph_age, compile_rudolph_curves,
+)
+from .events import EVENT_NAMES, event_code, require_event_code, event_name
+from .database import RoutingSession, read_replica, configure as configure_database, init_app as init_database
 from functools import wraps
 import json
 
@@ -18,35 +29,35 @@ STATIC_DIR = PROJECT_ROOT / "static"
 DOCS_DIR = PROJECT_ROOT / "docs"
 DATA_DIR = BASE_DIR / "data"
 PDF_PATH = DOCS_DIR / "rudolph.pdf"
-YEAR = 2025
+# The current (live) season; past seasons are archived with `flask archive-season`
+YEAR = int(os.environ.get("YEAR", 2025))
+# Every season shares one database; the file keeps the name of the season it started in
+DEFAULT_DATABASE = BASE_DIR / "data_2025.db"
 # ---------- App ----------
-app = Flask(
-    __name__,
-    template_folder=str(TEMPLATES_DIR) if TEMPLATES_DIR.exists() else None,
-    static_folder=str(STATIC_DIR) if STATIC_DIR.exists() else None
-)
-CORS(app)
-app.secret_key = os.environ.get("SECRET_KEY", "supersecretkey")
-# Session cookie hardening
-app.config.update(
-    SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE="Lax",
-    SESSION_COOKIE_SECURE=os.environ.get("SESSION_COOKIE_SECURE", "false").lower() == "true",
-)
+# The Flask app itself is built by create_app() at the bottom of this module
+main_bp = Blueprint("main", __name__, cli_group=None)
 
 # ---------- DB ----------
-DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{BASE_DIR / f'data_{YEAR}.db'}")
-app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # ---------- Models ----------
-class Swimmers(db.Model):
+class Athlete(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(100), nullable=False)
+    name_key = db.Column(db.String(100), nullable=False)  # normalize_name(full_name), used for dedup/search
     year_of_birth = db.Column(db.Integer, nullable=False)
     gender = db.Column(db.String(10), nullable=False)
-    event = db.Column(db.String(100), nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("name_key", "year_of_birth", "gender", name="uq_athlete_identity"),
+    )
+
+class Swimmers(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey("athlete.id"), nullable=False)
+    # Copies of the athlete's birth year/gender: scoring inputs and part of the event indexes
+    year_of_birth = db.Column(db.Integer, nullable=False)
+    gender = db.Column(db.String(10), nullable=False)
+    event_code = db.Column(db.SmallInteger, nullable=False)  # backend/events.py catalog
     result = db.Column(db.Float, nullable=False)  # stored in seconds
     name_of_competition = db.Column(db.String(100), nullable=False)
     date_of_competition = db.Column(db.Date, nullable=False)
@@ -54,11 +65,31 @@ class Swimmers(db.Model):
     place_taken = db.Column(db.Integer, nullable=False)
     fina_points = db.Column(db.Integer, nullable=True)
     rudolph_points = db.Column(db.Integer, nullable=True)
+    athlete = db.relationship(Athlete)
     __table_args__ = (
         db.CheckConstraint("gender in ('M','F')", name="ck_swimmers_gender"),
         db.CheckConstraint("pool_length in (25,50)", name="ck_swimmers_pool_length"),
+        # Back the /api/swimmers filters + sorts with index range scans
+        db.Index("ix_swimmers_event_code_result", "event_code", "gender", "pool_length", "result"),
+        db.Index("ix_swimmers_event_code_fina", "event_code", "gender", "pool_length", "fina_points"),
+        db.Index("ix_swimmers_event_code_rudolph", "event_code", "gender", "pool_length", "rudolph_points"),
+        db.Index("ix_swimmers_competition_date", "name_of_competition", "date_of_competition"),
+        db.Index("ix_swimmers_date", "date_of_competition"),
+        db.Index("ix_swimmers_year_of_birth", "year_of_birth"),
+        # Personal bests and history per athlete
+        db.Index("ix_swimmers_athlete_event_best", "athlete_id", "event_code", "pool_length", "result"),
+        db.Index("ix_swimmers_athlete_date", "athlete_id", "date_of_competition"),
+        # Never hand out an id twice, even once the newest rows were archived or deleted
+        {"sqlite_autoincrement": True},
     )
 
+    @property
+    def event(self) -> str:
+        return event_name(self.event_code)
+
+from .cache import cached_response, bump_data_version, ensure_data_version_row, migrate_data_version, current_data_version, request_key, not_modified, set_validators, cached_export_path, init_app as init_cache  # noqa: E402
+from .metrics import timed, timed_iter, init_app as init_metrics  # noqa: E402
+
 # ---------- Admin credentials ----------
 ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "admin2025")
@@ -67,86 +98,337 @@ def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         if not session.get("logged_in"):
-            return redirect(url_for("login"))
+            return redirect(url_for("main.login"))
         return f(*args, **kwargs)
     return decorated
 
 # ---------- Routes ----------
-@app.route("/login", methods=["GET", "POST"])
+@main_bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = request.form.get("username")
         password = request.form.get("password")
         if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
             session["logged_in"] = True
-            return redirect(url_for("home"))
+            return redirect(url_for("main.home"))
         flash("Invalid username or password", "err")
     return render_template("index.html")
 
-@app.route("/logout")
+@main_bp.route("/logout")
 @login_required
 def logout():
     session.pop("logged_in", None)
-    return redirect(url_for("login"))
+    return redirect(url_for("main.login"))
 
-@app.route("/")
+@main_bp.route("/")
 @login_required
 def home():
     return render_template("index.html")
 
-@app.route("/api/data", methods=["POST"])
+def _result_values(data, result_seconds: float = None) -> dict:
+    """Normalize one submitted result into Swimmers column values, points included.
+
+    result_seconds may carry data["result"] already parsed (bulk imports parse a chunk at once).
+    """
+    gender = normalize_gender(data["gender"]) or data["gender"]
+    code = require_event_code(data["event"])
+    if result_seconds is None:
+        result_seconds = time_to_seconds(data["result"])  # supports both seconds and mm:ss,ms
+    year_of_birth = int(data["year_of_birth"])
+    pool_len = int(data["pool_length"])
+    place_taken = int(data["place_taken"])
+    name_of_competition = str(data["name_of_competition"])
+    event_date = datetime.strptime(data["date_of_competition"], "%Y-%m-%d").date()
+    require_live_season(event_date)
+
+    # Compute points
+    base_time = get_base_time(code, gender, pool_len)
+    fina_pts = int(calculate_fina_points(base_time, result_seconds)) if base_time else 0
+    rudolph_pts = calculate_rudolph_points(code, gender, event_date.year - year_of_birth, result_seconds, event_date.year)
+
+    return dict(
+        full_name=data["full_name"],
+        year_of_birth=year_of_birth,
+        gender=gender,
+        event_code=code,
+        result=result_seconds,
+        name_of_competition=name_of_competition,
+        date_of_competition=event_date,
+        pool_length=pool_len,
+        place_taken=place_taken,
+        fina_points=fina_pts,
+        rudolph_points=rudolph_pts
+    )
+
+def _partition_of(s) -> tuple:
+    return partition_key(s.event_code, s.gender, s.pool_length, s.date_of_competition, s.year_of_birth)
+
+@main_bp.route("/api/data", methods=["POST"])
 @login_required
 def add_data():
     data = request.form or request.json or {}
     try:
-        # Normalize/parse inputs
-        gender = normalize_gender(data["gender"]) or data["gender"]
-        event_name = normalize_event_name(data["event"]) or data["event"]
-        result_seconds = time_to_seconds(data["result"])  # supports both seconds and mm:ss,ms
-        pool_len = int(data["pool_length"])
-        place_taken = int(data["place_taken"])
-        name_of_competition = str(data["name_of_competition"])
-        event_date = datetime.strptime(data["date_of_competition"], "%Y-%m-%d").date()
-
-        # Compute points
-        base_time = get_base_time(event_name, gender, pool_len)
-        fina_pts = int(calculate_fina_points(base_time, result_seconds)) if base_time else 0
-        rudolph_pts = calculate_rudolph_points(event_name, gender, event_date.year - int(data["year_of_birth"]), result_seconds)
-
-        new_entry = Swimmers(
-            full_name=data["full_name"],
-            year_of_birth=int(data["year_of_birth"]),
-            gender=gender,
-            event=event_name,
-            result=result_seconds,
-            name_of_competition=name_of_competition,
-            date_of_competition=event_date,
-            pool_length=pool_len,
-            place_taken=place_taken,
-            fina_points=fina_pts,
-            rudolph_points=rudolph_pts
-        )
+        values = _result_values(data)
+        attach_athletes([values])
+        new_entry = Swimmers(**values)
         db.session.add(new_entry)
+        db.session.flush()
+        refresh_partitions([_partition_of(new_entry)])
+        bump_data_version()
         db.session.commit()
         return jsonify({"message": "Data inserted successfully!"}), 201
     except Exception as e:
         return jsonify({"error": f"Bad payload: {e}"}), 400
 
-@app.route("/api/swimmers", methods=["GET"])
+def _insert_chunk(values: list, report: list, atomic: bool) -> int:
+    """executemany-insert (row_number, values) pairs; returns how many were inserted.
+
+    If the batch violates a constraint it is retried row by row inside savepoints so only
+    the offending rows are rejected (in atomic mode the first failure aborts the import).
+    """
+    if not values:
+        return 0
+    attach_athletes([v for _, v in values])
+    table = Swimmers.__table__
+    try:
+        with db.session.begin_nested():
+            db.session.connection().execute(insert(table), [v for _, v in values])
+        return len(values)
+    except Exception as e:
+        if atomic:
+            raise
+        current_app.logger.info("bulk chunk insert failed (%s); retrying row by row", e)
+    inserted = 0
+    for row_number, v in values:
+        try:
+            with db.session.begin_nested():
+                db.session.connection().execute(insert(table), [v])
+            inserted += 1
+        except Exception as e:
+            report[row_number - 1] = {"row": row_number, "status": "rejected", "error": str(getattr(e, "orig", e))}
+    return inserted
+
+def _mark_not_inserted(report: list, start: int = 0) -> None:
+    # Rows that passed validation but were rolled back
+    for entry in report[start:]:
+        if entry["status"] == "accepted":
+            entry["status"] = "not_inserted"
+
+def _rejected(report: list) -> int:
+    return sum(entry["status"] == "rejected" for entry in report)
+
+@main_bp.route("/api/data/bulk", methods=["POST"])
 @login_required
+def add_data_bulk():
+    """Import many results from an uploaded CSV/XLSX file or a JSON array body.
+
+    Rows are parsed and inserted BULK_CHUNK_SIZE at a time, one transaction per chunk.
+    With ?atomic=true nothing is stored unless every row is accepted; every row is still
+    validated and reported, valid ones as "not_inserted".
+    """
+    atomic = request.args.get("atomic", "false").lower() in {"1", "true", "yes"}
+    try:
+        chunk_size = request.args.get("chunk_size", type=int)
+        if "chunk_size" in request.args and (chunk_size is None or chunk_size < 1):
+            return jsonify({"error": "chunk_size must be a positive integer"}), 400
+        chunk_size = chunk_size or BULK_CHUNK_SIZE
+        upload = request.files.get("file")
+        if upload is not None:
+            fmt = detect_format(upload.filename, upload.mimetype, request.args.get("format"))
+            rows = iter_bulk_rows(fmt, stream=upload.stream)
+        else:
+            fmt = detect_format("", request.content_type, request.args.get("format"))
+            rows = iter_bulk_rows(fmt, stream=request.stream, payload=request.get_json(silent=True) if fmt == "json" else None)
+    except Exception as e:
+        return jsonify({"error": f"Bad upload: {e}"}), 400
+
+    report, accepted, partitions = [], 0, set()
+    failed = False  # atomic mode: a row was rejected, the rest is only validated
+    chunk_start = 0
+    try:
+        for first, chunk in chunked(rows, chunk_size):
+            chunk_start = len(report)
+            values = []
+            # Rows whose time does not parse here go through time_to_seconds for the error message
+            parsed, invalid = times_to_seconds([data.get("result") if isinstance(data, dict) else None for data in chunk])
+            parsed = parsed.tolist()
+            for i in invalid:
+                parsed[i] = None
+            with timed("scoring_duration_seconds", function="bulk_import_chunk"):
+                for row_number, data, result_seconds in zip(count(first), chunk, parsed):
+                    try:
+                        values.append((row_number, _result_values(data, result_seconds)))
+                        report.append({"row": row_number, "status": "accepted"})
+                    except KeyError as e:
+                        report.append({"row": row_number, "status": "rejected", "error": f"missing field {e}"})
+                    except Exception as e:
+                        report.append({"row": row_number, "status": "rejected", "error": str(e)})
+            if atomic and (failed or len(values) < len(chunk)):
+                failed = True
+                continue
+            accepted += _insert_chunk(values, report, atomic)
+            chunk_partitions = {
+                partition_key(v["event_code"], v["gender"], v["pool_length"], v["date_of_competition"], v["year_of_birth"])
+                for _, v in values
+            }
+            if atomic:
+                partitions |= chunk_partitions
+            else:
+                # The leaderboard is committed with each chunk, never behind it
+                refresh_partitions(chunk_partitions)
+                bump_data_version()
+                db.session.commit()
+        if atomic and (failed or len(report) == 0):
+            db.session.rollback()
+            accepted = 0
+            _mark_not_inserted(report)
+        elif atomic:
+            refresh_partitions(partitions)
+            bump_data_version()
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        # Earlier chunks stay committed unless the import is atomic
+        _mark_not_inserted(report, 0 if atomic else chunk_start)
+        if not atomic:
+            return jsonify({"error": str(e), "accepted": accepted, "rejected": _rejected(report), "rows": report}), 400
+        return jsonify({"error": f"Import aborted: {getattr(e, 'orig', e)}", "accepted": 0,
+                        "rejected": _rejected(report), "rows": report}), 400
+
+    body = {"accepted": accepted, "rejected": _rejected(report), "atomic": atomic, "rows": report}
+    if not accepted:
+        body["error"] = "Import rolled back: some rows were rejected" if atomic and report else "No rows imported"
+    return jsonify(body), 201 if accepted else 400
+
+# ---------- Result filters / keyset pagination ----------
+LIST_MAX_LIMIT = 500
+# sort key -> (column, default direction); ties are always broken by id in the same direction.
+# Results without points (NULL) come last in either direction.
+_LIST_SORTS = {
+    "id": (Swimmers.id, "desc"),
+    "result": (Swimmers.result, "asc"),
+    "fina_points": (Swimmers.fina_points, "desc"),
+    "rudolph_points": (Swimmers.rudolph_points, "desc"),
+}
+
+def result_filters(args) -> dict:
+    """Pick the supported result filters out of a request.args-like mapping."""
+    filters = {}
+    if args.get("event"):
+        filters["event_code"] = require_event_code(args["event"])
+    if args.get("gender"):
+        filters["gender"] = normalize_gender(args["gender"]) or args["gender"]
+    if args.get("pool_length"):
+        filters["pool_length"] = int(args["pool_length"])
+    if args.get("competition"):
+        filters["competition"] = args["competition"]
+    if args.get("year_of_birth"):
+        filters["year_of_birth"] = int(args["year_of_birth"])
+    if args.get("athlete_id"):
+        filters["athlete_id"] = int(args["athlete_id"])
+    for key in ("date_from", "date_to"):
+        if args.get(key):
+            filters[key] = datetime.strptime(args[key], "%Y-%m-%d").date()
+    if args.get("seasons") or args.get("season"):
+        filters["seasons"] = parse_seasons(str(args.get("seasons") or args["season"]))
+    return filters
+
+def apply_result_filters(stmt, filters: dict):
+    if "event_code" in filters:
+        stmt = stmt.where(Swimmers.event_code == filters["event_code"])
+    if "gender" in filters:
+        stmt = stmt.where(Swimmers.gender == filters["gender"])
+    if "pool_length" in filters:
+        stmt = stmt.where(Swimmers.pool_length == filters["pool_length"])
+    if "competition" in filters:
+        stmt = stmt.where(Swimmers.name_of_competition == filters["competition"])
+    if "year_of_birth" in filters:
+        stmt = stmt.where(Swimmers.year_of_birth == filters["year_of_birth"])
+    if "athlete_id" in filters:
+        stmt = stmt.where(Swimmers.athlete_id == filters["athlete_id"])
+    if "date_from" in filters:
+        stmt = stmt.where(Swimmers.date_of_competition >= filters["date_from"])
+    if "date_to" in filters:
+        stmt = stmt.where(Swimmers.date_of_competition <= filters["date_to"])
+    if filters.get("seasons", ALL_SEASONS) != ALL_SEASONS:
+        stmt = stmt.where(season_condition(Swimmers.date_of_competition, filters["seasons"]))
+    return stmt
+
+def keyset_args(args) -> tuple:
+    """(sort, order, after_id, after_value) from request args; ValueError if they are unusable."""
+    sort = args.get("sort", "id")
+    if sort not in _LIST_SORTS:
+        raise ValueError(f"Unsupported sort: {sort}")
+    order = args.get("order", _LIST_SORTS[sort][1]).lower()
+    if order not in {"asc", "desc"}:
+        raise ValueError(f"Unsupported order: {order}")
+    after_id = args.get("after_id", type=int)
+    raw_value = args.get("after_value", "")
+    if after_id is not None and sort != "id" and not raw_value:
+        raise ValueError("after_value is required when sorting by " + sort)
+    try:
+        # "null": the cursor row has no value in the sort column
+        after_value = float(raw_value) if raw_value and raw_value != "null" else None
+    except ValueError:
+        raise ValueError("after_value must be a number or null") from None
+    return sort, order, after_id, after_value
+
+def apply_keyset(stmt, sort: str, order: str, after_id=None, after_value=None):
+    """Order by (sort column, id) and start strictly after the given cursor.
+
+    For sort != id, after_value None means the cursor row's value is NULL.
+    """
+    column, _ = _LIST_SORTS[sort]
+    desc = order == "desc"
+    if after_id is not None:
+        id_after = Swimmers.id < after_id if desc else Swimmers.id > after_id
+        if sort == "id":
+            stmt = stmt.where(id_after)
+        elif after_value is None:
+            stmt = stmt.where(column.is_(None), id_after)
+        else:
+            after = or_(column < after_value if desc else column > after_value, and_(column == after_value, id_after))
+            stmt = stmt.where(or_(after, column.is_(None)) if column.nullable else after)
+    if sort == "id":
+        return stmt.order_by(Swimmers.id.desc() if desc else Swimmers.id)
+    if desc:
+        return stmt.order_by(column.desc().nulls_last(), Swimmers.id.desc())
+    return stmt.order_by(column.asc().nulls_last(), Swimmers.id)
+
+@main_bp.route("/api/swimmers", methods=["GET"])
+@login_required
+@read_replica
+@cached_response()
 def list_swimmers():
+    """One page of results, newest first by default.
+
+    Pass the X-Next-After-Id (and, for sort != id, X-Next-After-Value) response headers
+    back as after_id / after_value to fetch the following page.
+    """
     try:
-        limit = int(request.args.get("limit", 20))
-        swimmers = (
-            Swimmers.query.order_by(Swimmers.id.desc()).limit(limit).all()
-        )
-        def to_dict(s: Swimmers):
+        limit = request.args.get("limit", type=int)
+        if "limit" in request.args and (limit is None or limit < 1):
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit or 20, LIST_MAX_LIMIT)
+        try:
+            sort, order, after_id, after_value = keyset_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        filters = result_filters(request.args)
+        stmt = select(*Swimmers.__table__.c, Athlete.full_name).join(Athlete, Swimmers.athlete_id == Athlete.id)
+        stmt = apply_result_filters(stmt, filters)
+        stmt = apply_keyset(stmt, sort, order, after_id, after_value).limit(limit + 1)
+        rows = db.session.execute(for_seasons(stmt, filters.get("seasons"))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        def to_dict(s):
             return {
                 "id": s.id,
+                "athlete_id": s.athlete_id,
                 "full_name": s.full_name,
                 "year_of_birth": s.year_of_birth,
                 "gender": s.gender,
-                "event": s.event,
+                "event": event_name(s.event_code),
                 "result": s.result,
                 "name_of_competition": s.name_of_competition,
                 "date_of_competition": s.date_of_competition.isoformat(),
@@ -155,111 +437,233 @@ def list_swimmers():
                 "fina_points": s.fina_points or 0,
                 "rudolph_points": s.rudolph_points or 0,
             }
-        return jsonify([to_dict(s) for s in swimmers])
+        response = jsonify([to_dict(s) for s in rows])
+        if has_more:
+            last = rows[-1]
+            response.headers["X-Next-After-Id"] = str(last.id)
+            if sort != "id":
+                value = getattr(last, sort)
+                response.headers["X-Next-After-Value"] = "null" if value is None else str(value)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+# Streamed reads select only the requested fields, as tuples
+STREAM_BATCH_SIZE = 2000
+_STREAM_FIELDS = {
+    "id": Swimmers.id,
+    "athlete_id": Swimmers.athlete_id,
+    "full_name": Athlete.full_name,
+    "year_of_birth": Swimmers.year_of_birth,
+    "gender": Swimmers.gender,
+    "event": Swimmers.event_code,  # replaced by the event name
+    "event_code": Swimmers.event_code,
+    "result": Swimmers.result,
+    "name_of_competition": Swimmers.name_of_competition,
+    "date_of_competition": Swimmers.date_of_competition,
+    "pool_length": Swimmers.pool_length,
+    "place_taken": Swimmers.place_taken,
+    "fina_points": func.coalesce(Swimmers.fina_points, 0),
+    "rudolph_points": func.coalesce(Swimmers.rudolph_points, 0),
+}
+_STREAM_DEFAULT_FIELDS = [f for f in _STREAM_FIELDS if f != "event_code"]  # same keys as /api/swimmers
+
+def stream_rows(fields: list, filters: dict, sort: str = "id", order: str = "asc",
+                after_id=None, after_value=None, limit: int = None):
+    """Yield batches of {field: value} dicts straight off a server-side cursor."""
+    stmt = select(*(_STREAM_FIELDS[f] for f in fields)).select_from(Swimmers)
+    if "full_name" in fields:
+        stmt = stmt.join(Athlete, Swimmers.athlete_id == Athlete.id)
+    stmt = apply_keyset(apply_result_filters(stmt, filters), sort, order, after_id, after_value)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    stmt = for_seasons(stmt, filters.get("seasons"))
+    result = db.session.connection().execution_options(yield_per=STREAM_BATCH_SIZE).execute(stmt)
+    names = tuple(fields)
+    event_names = EVENT_NAMES
+    for rows in result.partitions():
+        batch = [dict(zip(names, row)) for row in rows]
+        if "event" in names:
+            for item in batch:
+                item["event"] = event_names[item["event"]]
+        yield batch
+
+@main_bp.route("/api/swimmers/stream", methods=["GET"])
+@login_required
+@read_replica
+def stream_swimmers():
+    """Every matching result as NDJSON (default) or one chunked JSON array (?format=json).
+
+    ?fields=id,event,result picks the columns (default: those of /api/swimmers). Filters,
+    sort/order and the after_id/after_value cursor work as in /api/swimmers; ?limit caps
+    the row count, which is unbounded otherwise.
+    """
+    try:
+        fmt = request.args.get("format", "ndjson").lower()
+        if fmt not in {"ndjson", "json"}:
+            return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+        fields = list(dict.fromkeys(f.strip() for f in request.args.get("fields", "").split(",") if f.strip()))
+        unknown = [f for f in fields if f not in _STREAM_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        sort, order, after_id, after_value = keyset_args(request.args)
+        filters = result_filters(request.args)
+        limit = request.args.get("limit", type=int)
+        if "limit" in request.args and (limit is None or limit < 0):
+            return jsonify({"error": "limit must be a non-negative integer"}), 400
+        version, updated_at = current_data_version()
+        key = request_key()
+        not_mod = not_modified(version, updated_at, key)
+        if not_mod is not None:
+            return not_mod
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+    batches = stream_rows(fields or _STREAM_DEFAULT_FIELDS, filters, sort, order, after_id, after_value, limit)
+    if fmt == "ndjson":
+        chunks, mimetype = (ndjson_chunk(batch) for batch in batches), "application/x-ndjson"
+    else:
+        chunks, mimetype = json_array_chunks(batches), "application/json"
+    response = Response(
+        stream_with_context(timed_iter(chunks, "export_duration_seconds", format=fmt)), mimetype=mimetype
+    )
+    return set_validators(response, version, updated_at, key, public=False)
 
-@app.route("/api/swimmers/<int:swimmer_id>", methods=["PUT"])
+@main_bp.route("/api/swimmers/<int:swimmer_id>", methods=["PUT"])
 @login_required
 def update_swimmer(swimmer_id: int):
     payload = request.json or {}
     s = Swimmers.query.get_or_404(swimmer_id)
     try:
-        if "full_name" in payload:
-            s.full_name = payload["full_name"]
-        if "year_of_birth" in payload:
-            s.year_of_birth = int(payload["year_of_birth"])
-        if "gender" in payload:
-            s.gender = normalize_gender(payload["gender"]) or payload["gender"]
+        old_partition = _partition_of(s)
+        if {"full_name", "year_of_birth", "gender"} & payload.keys():
+            # A changed identity moves the result to the matching (possibly new) athlete
+            full_name = payload.get("full_name", s.athlete.full_name)
+            if "year_of_birth" in payload:
+                s.year_of_birth = int(payload["year_of_birth"])
+            if "gender" in payload:
+                s.gender = normalize_gender(payload["gender"]) or payload["gender"]
+            ids = resolve_athlete_ids([(full_name, s.year_of_birth, s.gender)])
+            s.athlete_id = ids[athlete_key(full_name, s.year_of_birth, s.gender)]
         if "event" in payload:
-            s.event = normalize_event_name(payload["event"]) or payload["event"]
+            s.event_code = require_event_code(payload["event"])
         if "result" in payload:
             s.result = float(time_to_seconds(payload["result"]))
         if "name_of_competition" in payload:
             s.name_of_competition = payload["name_of_competition"]
         if "date_of_competition" in payload:
             s.date_of_competition = datetime.strptime(payload["date_of_competition"], "%Y-%m-%d").date()
+            require_live_season(s.date_of_competition)
         if "pool_length" in payload:
             s.pool_length = int(payload["pool_length"])
         if "place_taken" in payload:
             s.place_taken = int(payload["place_taken"])
         # Recompute points if any relevant fields changed
-        base_time = get_base_time(s.event, s.gender, s.pool_length)
+        base_time = get_base_time(s.event_code, s.gender, s.pool_length)
         s.fina_points = int(calculate_fina_points(base_time, s.result)) if base_time else 0
         age = s.date_of_competition.year - s.year_of_birth
-        s.rudolph_points = calculate_rudolph_points(s.event, s.gender, age, s.result)
+        s.rudolph_points = calculate_rudolph_points(s.event_code, s.gender, age, s.result, s.date_of_competition.year)
+        db.session.flush()
+        refresh_partitions([old_partition, _partition_of(s)])
+        bump_data_version(rewrite=True)
         db.session.commit()
         return jsonify({"message": "Updated"})
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
-@app.route("/api/swimmers/<int:swimmer_id>", methods=["DELETE"])
+@main_bp.route("/api/swimmers/<int:swimmer_id>", methods=["DELETE"])
 @login_required
 def delete_swimmer(swimmer_id: int):
     s = Swimmers.query.get_or_404(swimmer_id)
     try:
+        partition = _partition_of(s)
         db.session.delete(s)
+        db.session.flush()
+        refresh_partitions([partition])
+        bump_data_version(rewrite=True)
         db.session.commit()
         return jsonify({"message": "Deleted"})
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
-@app.route("/api/export", methods=["GET"])
+EXPORT_BATCH_SIZE = 1000
+_EXPORT_COLUMNS = (
+    Athlete.full_name, Swimmers.year_of_birth, Swimmers.gender, Swimmers.event_code, Swimmers.result,
+    Swimmers.name_of_competition, Swimmers.date_of_competition, Swimmers.pool_length,
+    Swimmers.place_taken, Swimmers.fina_points, Swimmers.rudolph_points,
+)
+
+def export_rows(filters: dict = None, format_times: bool = False):
+    """Stream formatted export rows straight off a server-side cursor (only exported columns)."""
+    filters = filters or {}
+    stmt = select(*_EXPORT_COLUMNS).select_from(Swimmers).join(Athlete, Swimmers.athlete_id == Athlete.id)
+    stmt = for_seasons(apply_result_filters(stmt, filters).order_by(Swimmers.id), filters.get("seasons"))
+    result = db.session.connection().execution_options(yield_per=EXPORT_BATCH_SIZE).execute(stmt)
+    for batch in result.partitions():
+        yield from format_export_rows(batch, format_times)
+
+@main_bp.route("/api/export", methods=["GET"])
 @login_required
+@read_replica
 def export_excel():
     try:
-        swimmers = Swimmers.query.all()
-        if not swimmers:
-            return jsonify({"error": "No data to export"}), 400
-        rows = []
-        for s in swimmers:
-            rows.append({
-                "ФИО": s.full_name,
-                "Год рождения": s.year_of_birth,
-                "Пол": 'Ж' if s.gender == 'F' else 'M',
-                "Дистанция": s.event,
-                "Время": s.result,
-                "Название соревнования": s.name_of_competition,
-                "Дата проведения соревнований": s.date_of_competition,
-                "Тип бассейна": s.pool_length,
-                "Занятое место": s.place_taken,
-                "FINA Points": s.fina_points or 0,
-                "Rudolph Points": s.rudolph_points or 0,
-            })
-        df = pd.DataFrame(rows)
-        # Map events to RU labels
-        df['Дистанция'] = df['Дистанция'].astype(str).str.replace('M ', 'm ', regex=False)
-        mapping = {
-            '50m Freestyle':'50м кроль','100m Freestyle':'100м кроль','200m Freestyle':'200м кроль','400m Freestyle':'400м кроль','800m Freestyle':'800м кроль','1500m Freestyle':'1500м кроль',
-            '50m Breaststroke':'50м брасс','100m Breaststroke':'100м брасс','200m Breaststroke':'200м брасс',
-            '50m Butterfly':'50м батт','100m Butterfly':'100м батт','200m Butterfly':'200м батт',
-            '50m Backstroke':'50м на спине','100m Backstroke':'100м на спине','200m Backstroke':'200м на спине',
-            '200m Medley':'200м комплекс','400m Medley':'400м комплекс'
-        }
-        df['Дистанция'] = df['Дистанция'].replace(mapping)
-        # Format date
-        df['Дата проведения соревнований'] = pd.to_datetime(df['Дата проведения соревнований'], errors='coerce').dt.strftime('%d/%m/%Y')
-        # Ensure ints
-        df['FINA Points'] = pd.to_numeric(df['FINA Points'], errors='coerce').fillna(0).astype(int)
-        df['Rudolph Points'] = pd.to_numeric(df['Rudolph Points'], errors='coerce').fillna(0).astype(int)
-        # Write file
-        excel_dir = PROJECT_ROOT / 'output' / f'Swimming Ranking {YEAR}'
-        excel_dir.mkdir(parents=True, exist_ok=True)
-        excel_path = excel_dir / 'Swimmers_Data.xlsx'
-        df.to_excel(str(excel_path), index=False)
-        return send_file(str(excel_path), as_attachment=True, download_name='Swimmers_Data.xlsx')
+        fmt = request.args.get("format", "xlsx").lower()
+        if fmt not in {"xlsx", "csv"}:
+            return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+        filters = result_filters(request.args)
+        # Times are exported as seconds unless ?format_times=true asks for "mm:ss,cc"
+        format_times = request.args.get("format_times", "false").lower() in {"1", "true", "yes"}
+        version, updated_at = current_data_version()
+        key = request_key()
+        not_mod = not_modified(version, updated_at, key)
+        if not_mod is not None:
+            return not_mod
+        if fmt == "csv":
+            rows = export_rows(filters, format_times)
+            first = next(rows, None)
+            if first is None:
+                return jsonify({"error": "No data to export"}), 400
+            response = Response(
+                stream_with_context(timed_iter(iter_csv(chain([first], rows)), "export_duration_seconds", format="csv")),
+                mimetype="text/csv",
+                headers={"Content-Disposition": "attachment; filename=Swimmers_Data.csv"},
+            )
+            return set_validators(response, version, updated_at, key, public=False)
+
+        # xlsx is built once per data version and filter set into a shared file cache
+        # (temp file + atomic rename, so concurrent workers never share a partial file)
+        @timed("export_duration_seconds", format="xlsx")
+        def build(tmp_path):
+            if not write_xlsx(export_rows(filters, format_times), tmp_path):
+                raise LookupError("No data to export")
+        try:
+            path = cached_export_path(version, updated_at, key, ".xlsx", build)
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 400
+        response = send_file(path, as_attachment=True, download_name='Swimmers_Data.xlsx', conditional=False, etag=False)
+        return set_validators(response, version, updated_at, key, public=False)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-@app.route("/healthz")
-def healthz():
-    return {"ok": True}, 200
+@main_bp.route("/api/admin/recompute-points", methods=["POST"])
+@login_required
+def recompute_points_endpoint():
+    # Runs as a background job; poll /api/jobs/<id> for progress
+    try:
+        chunk_size = int(request.args.get("chunk_size", RECOMPUTE_CHUNK_SIZE))
+        job, created = submit_job("recompute_points", {"chunk_size": chunk_size})
+        return jsonify(job_dict(job)), 202 if created else 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
 
-# ---------- Startup ----------
-with app.app_context():
-    db.create_all()
+@main_bp.route("/healthz")
+def healthz():
+    startup = {"create_app_ms": round(current_app.config["CREATE_APP_SECONDS"] * 1000, 1)}
+    if _REFERENCE_LOAD_SECONDS is not None:
+        startup["reference_tables_ms"] = round(_REFERENCE_LOAD_SECONDS * 1000, 1)
+    return {"ok": True, "startup": startup}, 200
 
 # ---------- Helpers ----------
 def calculate_fina_points(base_time, swimmer_time):
@@ -272,7 +676,12 @@ def calculate_fina_points(base_time, swimmer_time):
     return 0
 
 def normalize_event_name(event: str) -> str:
-    return (event or "").strip().title()
+    # Canonical catalog name for known events ("50 free" -> "50M Freestyle")
+    return EVENT_NAMES[event_code(event)] or (event or "").strip().title()
+
+def normalize_name(full_name: str) -> str:
+    # Case/whitespace-insensitive identity key; ё and е are used interchangeably in entries
+    return " ".join(str(full_name or "").split()).casefold().replace("ё", "е")
 
 def normalize_gender(gender: str) -> str:
     if not gender:
@@ -285,86 +694,234 @@ def normalize_gender(gender: str) -> str:
     return ""
 
 # ---------- FINA base times ----------
+# base_time_slot(gender, pool) -> per-event-code base times (see scoring.compile_base_times)
 _BASE_TIMES = None
+BASE_TIMES_PATH = BASE_DIR / "base_times.json"
+
+def _compile_base_times() -> tuple:
+    with timed("table_load_duration_seconds", table="base_times"):
+        raw = {}
+        if BASE_TIMES_PATH.exists():
+            with open(BASE_TIMES_PATH, "r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+        return compile_base_times(raw)
 
 def _load_base_times():
     global _BASE_TIMES
     if _BASE_TIMES is None:
-        json_path = BASE_DIR / "base_times.json"
-        if json_path.exists():
-            with open(json_path, "r", encoding="utf-8") as fh:
-                _BASE_TIMES = json.load(fh)
-        else:
-            _BASE_TIMES = {}
+        _BASE_TIMES = _compile_base_times()
 
-def get_base_time(event_name: str, gender: str, pool_length: int):
+def get_base_time(event, gender: str, pool_length: int):
+    """FINA base time for an event code (or name) in seconds; None if there is none."""
     _load_base_times()
-    if not _BASE_TIMES:
-        return None
-    key_pool = "scm" if pool_length == 25 else "lcm"
-    key_gender = "male" if gender == "M" else "female"
-    table_key = f"fina_base_times_{key_pool}_{key_gender}"
-    table = _BASE_TIMES.get(table_key, {})
-    # The JSON includes both "50M Freestyle" and "50 Freestyle"; try both cases
-    return table.get(event_name) or table.get(event_name.replace("M ", " "))
+    code = event if type(event) is int else event_code(event)
+    return _BASE_TIMES[base_time_slot(gender, pool_length)][code] or None
+
+_BASE_TIMES_ARRAY = None
+
+def _base_times_array():
+    """_BASE_TIMES as a (slot, code) float array for the vectorized recompute."""
+    global _BASE_TIMES_ARRAY
+    if _BASE_TIMES_ARRAY is None:
+        import numpy as np
+        _load_base_times()
+        _BASE_TIMES_ARRAY = np.array(_BASE_TIMES, dtype=float)
+    return _BASE_TIMES_ARRAY
+
+# ---------- Bulk recompute ----------
+RECOMPUTE_CHUNK_SIZE = 5000
+_POINTS_UPDATE = (
+    update(Swimmers.__table__)
+    .where(Swimmers.__table__.c.id == bindparam("b_id"))
+    .values(fina_points=bindparam("fina_points"), rudolph_points=bindparam("rudolph_points"))
+)
+
+@timed("scoring_duration_seconds", function="recompute_points")
+def recompute_points(chunk_size: int = RECOMPUTE_CHUNK_SIZE, on_chunk=None, where=None) -> dict:
+    """Recompute FINA and Rudolph points for every row (or only those matching where), one
+    id-range chunk per transaction.
+
+    Only rows whose stored points differ are written back. on_chunk(rows_done) is called
+    after every committed chunk. The leaderboard is rebuilt afterwards; with where, only
+    the partitions of rewritten rows are refreshed.
+    """
+    import numpy as np
+    sync_points_tables(force=True)
+    _load_rudolph_tables()
+    started = time.perf_counter()
+    season_expr = extract("year", Swimmers.date_of_competition)
+    last_id, rows, updated = 0, 0, 0
+    partitions = set()
+
+    def update_rankings():
+        bump_data_version(rewrite=True)
+        if where is None:
+            rebuild_rankings()
+        else:
+            refresh_partitions(partitions)
+            db.session.commit()
+
+    while True:
+        stmt = (
+            select(
+                Swimmers.id, Swimmers.event_code, Swimmers.gender, Swimmers.pool_length,
+                Swimmers.result, season_expr, Swimmers.year_of_birth, Swimmers.fina_points, Swimmers.rudolph_points,
+            )
+            .where(Swimmers.id > last_id)
+            .order_by(Swimmers.id)
+            .limit(chunk_size)
+        )
+        if where is not None:
+            stmt = stmt.where(where)
+        chunk = db.session.connection().execute(stmt).all()
+        if not chunk:
+            break
+        ids, codes, genders, pools, results, seasons, births, old_fina, old_rudolph = zip(*chunk)
+        codes = np.asarray(codes, dtype=np.int64)
+        genders = np.asarray(genders, dtype=object)
+        slots = (np.asarray(pools) == 50) * 2 + (genders == "F")
+        base = _base_times_array()[slots, codes]
+        fina = fina_points_array(base, results)
+        seasons = np.asarray(seasons, dtype=np.int64)
+        ages = seasons - np.asarray(births, dtype=np.int64)
+        results = np.asarray(results, dtype=float)
+        rudolph = np.zeros(len(chunk), dtype=np.int64)
+        # Each row is scored with the Rudolph table of its competition's season
+        for season in np.unique(seasons).tolist():
+            index = rudolph_index_for(season)
+            if index:
+                rows_in = seasons == season
+                rudolph[rows_in] = rudolph_points_array(index, codes[rows_in], genders[rows_in], ages[rows_in], results[rows_in])
+        old_fina = np.array([-1 if v is None else v for v in old_fina], dtype=np.int64)
+        old_rudolph = np.array([-1 if v is None else v for v in old_rudolph], dtype=np.int64)
+        changed = np.flatnonzero((fina != old_fina) | (rudolph != old_rudolph))
+        if len(changed):
+            db.session.connection().execute(
+                _POINTS_UPDATE,
+                [
+                    {"b_id": ids[i], "fina_points": int(fina[i]), "rudolph_points": int(rudolph[i])}
+                    for i in changed.tolist()
+                ],
+            )
+            if where is not None:
+                partitions.update(
+                    (int(seasons[i]), int(codes[i]), genders[i], pools[i], rudolph_age(int(ages[i])))
+                    for i in changed.tolist()
+                )
+        db.session.commit()
+        rows += len(chunk)
+        updated += len(changed)
+        last_id = ids[-1]
+        if on_chunk is not None:
+            try:
+                on_chunk(rows)
+            except BaseException:
+                # Stopped early (e.g. a cancelled job): keep the leaderboard in step with what was committed
+                if updated:
+                    update_rankings()
+                raise
+    if updated:
+        update_rankings()
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "updated": updated,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
 
 def assign_rudolph_points_to_swimmers():
-    csv_path = DATA_DIR / f"rudolph_points_{YEAR}.csv"
-    if not csv_path.exists():
-        app.logger.warning(f"rudolph_points_{YEAR}.csv not found; skipping")
-        return
-    rudolph_points_df = pd.read_csv(csv_path)
-    for swimmer in Swimmers.query.all():
-        try:
-            age = swimmer.date_of_competition.year - swimmer.year_of_birth
-            if age > 18:
-                age = 19
-            parts = (swimmer.event or "").split()
-            if len(parts) < 2:
-                continue
-            distance = parts[0].lower()
-            stroke = parts[1].title()
-            filtered = rudolph_points_df.loc[(rudolph_points_df["age"]==age) & (rudolph_points_df["gender"]==swimmer.gender)]
-            res = 0
-            for _, point_data in filtered.iterrows():
-                try:
-                    results_dict = ast.literal_eval(point_data["events"])
-                except Exception:
-                    continue
-                bucket = results_dict[0] if results_dict else {}
-                if stroke not in bucket:
-                    continue
-                for result in bucket[stroke]:
-                    if f"{result.get('distance')}m" == distance:
-                        try:
-                            swimmer_seconds = float(swimmer.result)
-                        except Exception:
-                            swimmer_seconds = time_to_seconds(swimmer.result)
-                        threshold_seconds = time_to_seconds(result.get("time", "0"))
-                        # Faster times (lower seconds) should meet or beat the threshold
-                        if threshold_seconds and swimmer_seconds >= threshold_seconds:
-                            res = int(point_data["point"])
-                            break
-            swimmer.rudolph_points = res
-        except Exception:
-            continue
-    db.session.commit()
+    # Superseded by recompute_points(), which also refreshes FINA points
+    return recompute_points()
+
+@main_bp.cli.command("recompute-points")
+@click.option("--chunk-size", default=RECOMPUTE_CHUNK_SIZE, show_default=True)
+def recompute_points_command(chunk_size):
+    """Recompute FINA and Rudolph points for the whole table."""
+    stats = recompute_points(chunk_size)
+    print(f"{stats['rows']} rows ({stats['updated']} updated) in {stats['seconds']}s, {stats['rows_per_sec']} rows/sec")
+
+# Rudolph tables: data/rudolph_points_<year>.csv, one per published year. A result is scored
+# with the newest table not newer than its competition (the oldest one before that).
+def rudolph_table_years() -> list:
+    return sorted(int(p.stem.rsplit("_", 1)[1]) for p in DATA_DIR.glob("rudolph_points_[0-9][0-9][0-9][0-9].csv"))
+
+def rudolph_table_year(season: int, years: list = None):
+    """Year of the Rudolph table that scores results of a season; None if there are no tables."""
+    years = rudolph_table_years() if years is None else years
+    if not years:
+        return None
+    return max((y for y in years if y <= season), default=years[0])
 
 # In-memory Rudolph points for faster per-insert lookup
-_RUDOLPH_POINTS_DF = None
+_RUDOLPH_POINTS_DFS = {}
 
-def _load_rudolph_points_df():
-    global _RUDOLPH_POINTS_DF
-    if _RUDOLPH_POINTS_DF is None:
-        csv_path = DATA_DIR / f"rudolph_points_{YEAR}.csv"
+def _load_rudolph_points_df(year: int):
+    if year not in _RUDOLPH_POINTS_DFS:
+        csv_path = rudolph_table_path(year)
         if csv_path.exists():
-            _RUDOLPH_POINTS_DF = pd.read_csv(csv_path)
+            import pandas as pd  # only the reference path needs pandas
+            with timed("table_load_duration_seconds", table="rudolph_points_df"):
+                _RUDOLPH_POINTS_DFS[year] = pd.read_csv(csv_path)
         else:
-            _RUDOLPH_POINTS_DF = None
+            _RUDOLPH_POINTS_DFS[year] = None
+    return _RUDOLPH_POINTS_DFS[year]
 
-def calculate_rudolph_points(event_name: str, gender: str, age: int, swimmer_seconds: float) -> int:
-    _load_rudolph_points_df()
-    if _RUDOLPH_POINTS_DF is None:
+# Compiled once per process: table year -> sorted thresholds per (event code, gender, age) cell
+_RUDOLPH_TABLES = None
+_RUDOLPH_SEASON_TABLES = {}  # season -> compiled table ([] when there is none)
+
+def rudolph_table_path(year: int) -> Path:
+    return DATA_DIR / f"rudolph_points_{year}.csv"
+
+def _compile_rudolph_tables() -> dict:
+    with timed("table_load_duration_seconds", table="rudolph_index"):
+        return {y: compile_rudolph_index(rudolph_table_path(y)) for y in rudolph_table_years()}
+
+def _load_rudolph_tables():
+    global _RUDOLPH_TABLES
+    if _RUDOLPH_TABLES is None:
+        _RUDOLPH_TABLES = _compile_rudolph_tables()
+
+def rudolph_index_for(season: int) -> list:
+    # The cache is read before the tables (reload_reference_tables swaps them the other way
+    # round), so a table from before a reload never lands in the new cache
+    cache = _RUDOLPH_SEASON_TABLES
+    index = cache.get(season)
+    if index is None:
+        _load_rudolph_tables()
+        tables = _RUDOLPH_TABLES
+        year = rudolph_table_year(season, sorted(tables))
+        index = cache[season] = tables[year] if year is not None else []
+    return index
+
+# Reverse lookups: table year -> compile_rudolph_curves() of the table
+_RUDOLPH_CURVES = {}
+
+def rudolph_curves_for(season: int) -> tuple:
+    """(table year, per-cell point curves) of the Rudolph table that scores a season; (None, []) without tables."""
+    curves = _RUDOLPH_CURVES  # read before the tables, as in rudolph_index_for
+    _load_rudolph_tables()
+    tables = _RUDOLPH_TABLES
+    year = rudolph_table_year(season, sorted(tables))
+    if year is None:
+        return None, []
+    if year not in curves:
+        curves[year] = compile_rudolph_curves(tables[year])
+    return year, curves[year]
+
+def calculate_rudolph_points(event, gender: str, age: int, swimmer_seconds: float, season: int = None) -> int:
+    """Rudolph points for an event code (or name), from the table of the season (default: the current one)."""
+    index = rudolph_index_for(YEAR if season is None else season)
+    if not index:
+        return 0
+    code = event if type(event) is int else event_code(event)
+    return lookup_rudolph_points(index, code, gender, age, swimmer_seconds)
+
+# Reference implementation (DataFrame scan + literal_eval per call); kept for cross-checks only
+def calculate_rudolph_points_reference(event_name: str, gender: str, age: int, swimmer_seconds: float, year: int = None) -> int:
+    df = _load_rudolph_points_df(rudolph_table_year(YEAR) if year is None else year)
+    if df is None:
         return 0
     if age > 18:
         age = 19
@@ -373,7 +930,7 @@ def calculate_rudolph_points(event_name: str, gender: str, age: int, swimmer_sec
         return 0
     distance = parts[0].lower()  # e.g., "50m"
     stroke = parts[1].title()
-    filtered = _RUDOLPH_POINTS_DF.loc[( _RUDOLPH_POINTS_DF["age"] == age) & (_RUDOLPH_POINTS_DF["gender"] == gender)]
+    filtered = df.loc[(df["age"] == age) & (df["gender"] == gender)]
     best = 0
     for _, point_data in filtered.iterrows():
         try:
@@ -390,7 +947,176 @@ def calculate_rudolph_points(event_name: str, gender: str, age: int, swimmer_sec
                     best = max(best, int(point_data["point"]))
     return best
 
+@main_bp.cli.command("check-rudolph-index")
+@click.option("--year", type=int, default=None, help="Table year (default: every table).")
+def check_rudolph_index(year):
+    """Compare the compiled index against the reference lookup around every threshold."""
+    _load_rudolph_tables()
+    for table_year in ([year] if year else sorted(_RUDOLPH_TABLES)):
+        _check_rudolph_table(table_year)
+
+def _check_rudolph_table(year: int):
+    mismatches = checked = 0
+    for cell, entry in enumerate(_RUDOLPH_TABLES.get(year, [])):
+        if entry is None:
+            continue
+        code, gender, age = rudolph_cell_key(cell)
+        event_name = EVENT_NAMES[code]
+        for t in entry[0]:
+            for probe in (t - 0.01, t, t + 0.01):
+                fast = lookup_rudolph_points(_RUDOLPH_TABLES[year], code, gender, age, probe)
+                slow = calculate_rudolph_points_reference(event_name, gender, age, probe, year)
+                checked += 1
+                if fast != slow:
+                    mismatches += 1
+                    print(f"MISMATCH {year} age={age} gender={gender} event={event_name} t={probe:.2f}: {fast} != {slow}")
+    print(f"{year}: checked {checked} lookups, {mismatches} mismatches")
+
+# ---------- Reference tables ----------
+_REFERENCE_LOAD_SECONDS = None
+
+def load_reference_tables() -> float:
+    """Load the FINA base times and compile the Rudolph index now instead of on first use.
+
+    Called in the gunicorn master under --preload, so forked workers share the tables
+    copy-on-write. Returns the seconds spent.
+    """
+    global _REFERENCE_LOAD_SECONDS
+    started = time.perf_counter()
+    _load_base_times()
+    _load_rudolph_tables()
+    for year in _RUDOLPH_TABLES:
+        rudolph_curves_for(year)
+    _REFERENCE_LOAD_SECONDS = time.perf_counter() - started
+    return _REFERENCE_LOAD_SECONDS
+
+def reload_reference_tables() -> tuple:
+    """Compile the reference tables from disk again and swap them in; returns (base times, Rudolph tables).
+
+    Lookups already running finish with the tables they started with.
+    """
+    global _BASE_TIMES, _BASE_TIMES_ARRAY, _RUDOLPH_TABLES, _RUDOLPH_SEASON_TABLES, _RUDOLPH_CURVES, _RUDOLPH_POINTS_DFS
+    import numpy as np
+    base_times = _compile_base_times()
+    rudolph_tables = _compile_rudolph_tables()
+    curves = {year: compile_rudolph_curves(index) for year, index in rudolph_tables.items()}
+    _BASE_TIMES_ARRAY = np.array(base_times, dtype=float)
+    _BASE_TIMES = base_times
+    _RUDOLPH_TABLES = rudolph_tables
+    _RUDOLPH_SEASON_TABLES = {}
+    _RUDOLPH_CURVES = curves
+    _RUDOLPH_POINTS_DFS = {}
+    return base_times, rudolph_tables
+
+# ---------- Blueprints ----------
+from .seasons import ALL_SEASONS, parse_seasons, season_condition, for_seasons, require_live_season, migrate_swimmers_autoincrement, init_app as init_seasons  # noqa: E402
+
+from .rankings import rankings_bp, Leaderboard, partition_key, refresh_partitions, rebuild_rankings  # noqa: E402
+
+from .athletes import athletes_bp, attach_athletes, resolve_athlete_ids, athlete_key, migrate_athletes  # noqa: E402
+
+from .jobs import submit_job, job_dict, start_job_runner, init_app as init_jobs  # noqa: E402
+from .stats import init_app as init_stats  # noqa: E402
+from .points_tables import sync_points_tables, init_app as init_points_tables  # noqa: E402
+from .targets import targets_bp  # noqa: E402
+
+# ---------- Schema ----------
+def migrate_event_codes() -> bool:
+    """Replace swimmers.event (name string) with event_code (idempotent); True if anything was migrated.
+
+    Refuses to run while any stored name is not in the event catalog, so no result loses its event.
+    """
+    conn = db.session.connection()
+    inspector = inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns("swimmers")}
+    if "event" not in columns:
+        db.session.rollback()
+        return False
+    names = [row[0] for row in conn.execute(text("SELECT DISTINCT event FROM swimmers"))]
+    unknown = sorted(n for n in names if not event_code(n))
+    if unknown:
+        raise RuntimeError(f"Unknown events in swimmers.event, fix them before migrating: {unknown}")
+    if "event_code" not in columns:
+        conn.execute(text("ALTER TABLE swimmers ADD COLUMN event_code SMALLINT"))
+    conn.execute(
+        text("UPDATE swimmers SET event_code = :code WHERE event = :name"),
+        [{"code": event_code(n), "name": n} for n in names],
+    )
+    # Indexes over the old column go first (SQLite cannot drop an indexed column)
+    for index in inspector.get_indexes("swimmers"):
+        if "event" in index["column_names"]:
+            conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+    conn.execute(text("ALTER TABLE swimmers DROP COLUMN event"))
+    # The leaderboard is derived data; recreate it keyed by code
+    if inspector.has_table("leaderboard") and "event" in {c["name"] for c in inspector.get_columns("leaderboard")}:
+        conn.execute(text("DROP TABLE leaderboard"))
+    db.session.commit()
+    return True
+
+def init_db() -> None:
+    """Create missing tables and indexes, migrate older schemas and seed the data-version row."""
+    db.create_all()
+    migrate_data_version()
+    migrated = migrate_athletes()
+    migrated = migrate_event_codes() or migrated
+    migrate_swimmers_autoincrement()
+    if migrated:
+        db.create_all()
+        bump_data_version(rewrite=True)
+        rebuild_rankings()
+    # create_all() skips indexes on tables that already exist
+    for model in (Swimmers, Leaderboard):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+    ensure_data_version_row()
+
+@main_bp.cli.command("init-db")
+def init_db_command():
+    """Create or upgrade the database schema (run once per deploy, before starting the server)."""
+    init_db()
+    print("Database schema is up to date")
+
+# ---------- App factory ----------
+def create_app(config: dict = None) -> Flask:
+    """Build the Flask app. Touches neither the database nor the reference tables."""
+    started = time.perf_counter()
+    app = Flask(
+        __name__,
+        template_folder=str(TEMPLATES_DIR) if TEMPLATES_DIR.exists() else None,
+        static_folder=str(STATIC_DIR) if STATIC_DIR.exists() else None
+    )
+    CORS(app, expose_headers=["X-Next-After-Id", "X-Next-After-Value"])
+    app.secret_key = os.environ.get("SECRET_KEY", "supersecretkey")
+    app.config.update(
+        # Session cookie hardening
+        SESSION_COOKIE_HTTPONLY=True,
+        SESSION_COOKIE_SAMESITE="Lax",
+        SESSION_COOKIE_SECURE=os.environ.get("SESSION_COOKIE_SECURE", "false").lower() == "true",
+        SQLALCHEMY_DATABASE_URI=os.environ.get("DATABASE_URL", f"sqlite:///{DEFAULT_DATABASE}"),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    app.config.update(config or {})
+    configure_database(app)
+    db.init_app(app)
+    init_database(app, db)
+    init_cache(app)
+    init_metrics(app)
+    app.register_blueprint(main_bp)
+    app.register_blueprint(rankings_bp)
+    app.register_blueprint(athletes_bp)
+    app.register_blueprint(targets_bp)
+    init_jobs(app)
+    init_stats(app)
+    init_seasons(app)
+    init_points_tables(app)
+    app.config["CREATE_APP_SECONDS"] = time.perf_counter() - started
+    return app
+
 # ---------- Run ----------
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
+    app = create_app()
+    # Only in the reloader's serving child, not the watcher process
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_job_runner(app)
     app.run(debug=True, host="0.0.0.0", port=port)
@@ -0,0 +1,216 @@
+# backend/athletes.py
+# Athlete identity: results reference an Athlete row (name + birth year + gender, deduplicated
+# on the normalized name) by integer id instead of repeating the name on every result.
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select, insert, inspect, func, text
+from sqlalchemy.exc import IntegrityError
+from .app import db, Athlete, Swimmers, login_required, normalize_name, normalize_gender
+from .events import require_event_code, event_name
+from .cache import cached_response
+from .seasons import ALL_SEASONS, parse_seasons, season_condition, for_seasons
+
+athletes_bp = Blueprint("athletes", __name__, cli_group=None)
+
+_LOOKUP_BATCH = 500
+
+
+def athlete_key(full_name: str, year_of_birth: int, gender: str) -> tuple:
+    return (normalize_name(full_name), int(year_of_birth), gender)
+
+
+def resolve_athlete_ids(identities) -> dict:
+    """Map (full_name, year_of_birth, gender) identities to athlete ids, creating missing athletes.
+
+    Runs in the caller's transaction. Returns {athlete_key(...): id}.
+    """
+    wanted = {}
+    for full_name, year_of_birth, gender in identities:
+        wanted.setdefault(athlete_key(full_name, year_of_birth, gender), " ".join(str(full_name).split()))
+    conn = db.session.connection()
+    table = Athlete.__table__
+
+    def lookup(keys) -> dict:
+        found = {}
+        names = sorted({k[0] for k in keys})
+        for start in range(0, len(names), _LOOKUP_BATCH):
+            rows = conn.execute(
+                select(table.c.id, table.c.name_key, table.c.year_of_birth, table.c.gender)
+                .where(table.c.name_key.in_(names[start:start + _LOOKUP_BATCH]))
+            )
+            for row in rows:
+                key = (row.name_key, row.year_of_birth, row.gender)
+                if key in keys:
+                    found[key] = row.id
+        return found
+
+    ids = lookup(wanted.keys())
+    missing = [
+        {"full_name": wanted[k], "name_key": k[0], "year_of_birth": k[1], "gender": k[2]}
+        for k in wanted if k not in ids
+    ]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                conn.execute(insert(table), missing)
+        except IntegrityError:
+            # A concurrent writer created some of them; insert the rest one at a time
+            for values in missing:
+                try:
+                    with db.session.begin_nested():
+                        conn.execute(insert(table), [values])
+                except IntegrityError:
+                    pass
+        ids.update(lookup({k for k in wanted if k not in ids}))
+    return ids
+
+
+def attach_athletes(values_list: list) -> None:
+    """Replace full_name in result value dicts (from _result_values) with athlete_id."""
+    ids = resolve_athlete_ids((v["full_name"], v["year_of_birth"], v["gender"]) for v in values_list)
+    for v in values_list:
+        v["athlete_id"] = ids[athlete_key(v.pop("full_name"), v["year_of_birth"], v["gender"])]
+
+
+# ---------- Migration from per-result names ----------
+
+def migrate_athletes() -> bool:
+    """Move swimmers.full_name into the athlete table (idempotent); True if anything was migrated."""
+    columns = {c["name"] for c in inspect(db.engine).get_columns("swimmers")}
+    if "full_name" not in columns:
+        return False
+    conn = db.session.connection()
+    if "athlete_id" not in columns:
+        conn.execute(text("ALTER TABLE swimmers ADD COLUMN athlete_id INTEGER REFERENCES athlete(id)"))
+    identities = conn.execute(text("SELECT DISTINCT full_name, year_of_birth, gender FROM swimmers")).all()
+    ids = resolve_athlete_ids(identities)
+    # Temporary index so each per-identity UPDATE is a range scan rather than a table scan
+    conn.execute(text("CREATE INDEX tmp_swimmers_identity ON swimmers (full_name, year_of_birth, gender)"))
+    conn.execute(
+        text("UPDATE swimmers SET athlete_id = :athlete_id "
+             "WHERE full_name = :full_name AND year_of_birth = :year_of_birth AND gender = :gender"),
+        [
+            {"athlete_id": ids[athlete_key(n, y, g)], "full_name": n, "year_of_birth": y, "gender": g}
+            for n, y, g in identities
+        ],
+    )
+    conn.execute(text("DROP INDEX tmp_swimmers_identity"))
+    conn.execute(text("ALTER TABLE swimmers DROP COLUMN full_name"))
+    # The leaderboard is derived data keyed by name in older schemas; recreate it empty
+    inspector = inspect(conn)
+    if inspector.has_table("leaderboard") and "full_name" in {c["name"] for c in inspector.get_columns("leaderboard")}:
+        conn.execute(text("DROP TABLE leaderboard"))
+    db.session.commit()
+    return True
+
+
+@athletes_bp.cli.command("migrate-athletes")
+def migrate_athletes_command():
+    """Backfill the athlete table from swimmers.full_name and drop the column."""
+    if not migrate_athletes():
+        print("Already migrated")
+        return
+    from .rankings import rebuild_rankings
+    db.create_all()
+    print(f"Migrated {db.session.scalar(select(func.count()).select_from(Athlete))} athletes; "
+          f"leaderboard rebuilt with {rebuild_rankings()} rows")
+
+
+# ---------- Routes ----------
+
+def _athlete_dict(a: Athlete) -> dict:
+    return {"id": a.id, "full_name": a.full_name, "year_of_birth": a.year_of_birth, "gender": a.gender}
+
+
+def _result_dict(s) -> dict:
+    return {
+        "id": s.id,
+        "event": event_name(s.event_code),
+        "result": s.result,
+        "name_of_competition": s.name_of_competition,
+        "date_of_competition": s.date_of_competition.isoformat(),
+        "pool_length": s.pool_length,
+        "place_taken": s.place_taken,
+        "fina_points": s.fina_points or 0,
+        "rudolph_points": s.rudolph_points or 0,
+    }
+
+
+@athletes_bp.route("/api/athletes", methods=["GET"])
+@login_required
+@cached_response()
+def search_athletes():
+    stmt = select(Athlete)
+    q = request.args.get("q")
+    if q:
+        stmt = stmt.where(Athlete.name_key.startswith(normalize_name(q), autoescape=True))
+    if request.args.get("gender"):
+        stmt = stmt.where(Athlete.gender == (normalize_gender(request.args["gender"]) or request.args["gender"]))
+    year_of_birth = request.args.get("year_of_birth", type=int)
+    if request.args.get("year_of_birth") and year_of_birth is None:
+        return jsonify({"error": "year_of_birth must be an integer"}), 400
+    if year_of_birth is not None:
+        stmt = stmt.where(Athlete.year_of_birth == year_of_birth)
+    limit = request.args.get("limit", type=int)
+    if "limit" in request.args and (limit is None or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit or 20, 200)
+    return jsonify([_athlete_dict(a) for a in db.session.scalars(stmt.order_by(Athlete.name_key, Athlete.id).limit(limit))])
+
+
+def _athlete_results(athlete_id: int, seasons):
+    """Condition on the athlete (and seasons) for results read with for_seasons()."""
+    condition = Swimmers.athlete_id == athlete_id
+    if seasons not in (None, ALL_SEASONS):
+        condition &= season_condition(Swimmers.date_of_competition, seasons)
+    return condition
+
+
+def _seasons_arg():
+    value = request.args.get("seasons") or request.args.get("season")
+    return parse_seasons(value) if value else None
+
+
+@athletes_bp.route("/api/athletes/<int:athlete_id>/bests", methods=["GET"])
+@login_required
+@cached_response()
+def athlete_bests(athlete_id: int):
+    """Personal best per (event, pool_length), both served from ix_swimmers_athlete_event_best.
+
+    Live seasons by default; ?seasons=2023-2025 or ?seasons=all includes archived ones.
+    """
+    athlete = db.get_or_404(Athlete, athlete_id)
+    seasons = _seasons_arg()
+    best = (
+        select(Swimmers.event_code, Swimmers.pool_length, func.min(Swimmers.result).label("best"))
+        .where(_athlete_results(athlete_id, seasons))
+        .group_by(Swimmers.event_code, Swimmers.pool_length)
+        .subquery()
+    )
+    rows = db.session.execute(for_seasons(
+        select(*Swimmers.__table__.c)
+        .join(best, (Swimmers.event_code == best.c.event_code) & (Swimmers.pool_length == best.c.pool_length)
+              & (Swimmers.result == best.c.best))
+        .where(_athlete_results(athlete_id, seasons))
+        .order_by(Swimmers.event_code, Swimmers.pool_length, Swimmers.id),
+        seasons,
+    ))
+    bests = {}
+    for s in rows:
+        bests.setdefault((s.event_code, s.pool_length), s)  # earliest id wins a tie
+    return jsonify({"athlete": _athlete_dict(athlete), "bests": [_result_dict(s) for s in bests.values()]})
+
+
+@athletes_bp.route("/api/athletes/<int:athlete_id>/results", methods=["GET"])
+@login_required
+@cached_response()
+def athlete_results(athlete_id: int):
+    """Result history in date order (optionally one event/pool, or other seasons as in bests)."""
+    athlete = db.get_or_404(Athlete, athlete_id)
+    seasons = _seasons_arg()
+    stmt = select(*Swimmers.__table__.c).where(_athlete_results(athlete_id, seasons))
+    if request.args.get("event"):
+        stmt = stmt.where(Swimmers.event_code == require_event_code(request.args["event"]))
+    if request.args.get("pool_length"):
+        stmt = stmt.where(Swimmers.pool_length == int(request.args["pool_length"]))
+    rows = db.session.execute(for_seasons(stmt.order_by(Swimmers.date_of_competition, Swimmers.id), seasons))
+    return jsonify({"athlete": _athlete_dict(athlete), "results": [_result_dict(s) for s in rows]})
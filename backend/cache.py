@@ -0,0 +1,214 @@
+# backend/cache.py
+# Read cache shared by the read endpoints. Every cached response is keyed by its URL plus
+# a data-version counter stored in the database; write paths bump the counter inside their
+# transaction, so every gunicorn worker sees the change on its next read and stale entries
+# simply stop matching. Responses carry ETag/Last-Modified so browsers revalidate with 304s.
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+import click
+from flask import current_app, request, make_response
+from flask.cli import with_appcontext
+from sqlalchemy import select, update, inspect, text
+from sqlalchemy.exc import IntegrityError
+from .app import db
+
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 256))
+CACHE_MAX_BODY_BYTES = int(os.environ.get("CACHE_MAX_BODY_BYTES", 2 * 1024 * 1024))
+# Exports of older data versions outlive a newer one by this long: another worker may have
+# just looked one up and not opened it yet
+EXPORT_CACHE_GRACE_SECONDS = float(os.environ.get("EXPORT_CACHE_GRACE_SECONDS", 300))
+# Headers (besides Content-Type) that are part of a cached response
+_CACHED_HEADERS = ("X-Next-After-Id", "X-Next-After-Value", "Content-Disposition")
+
+
+class DataVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    # Bumped only by writes that change or remove existing rows; while it stands still, the
+    # data has only grown and derived copies (the stats snapshot) can catch up by id
+    rewrite_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+def migrate_data_version() -> None:
+    """Add columns that older data_version tables lack (idempotent)."""
+    conn = db.session.connection()
+    if "rewrite_version" not in {c["name"] for c in inspect(conn).get_columns("data_version")}:
+        conn.execute(text("ALTER TABLE data_version ADD COLUMN rewrite_version INTEGER NOT NULL DEFAULT 0"))
+    db.session.commit()
+
+
+def ensure_data_version_row() -> None:
+    if db.session.get(DataVersion, 1) is None:
+        try:
+            db.session.add(DataVersion(id=1, version=0, updated_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # another worker created it first
+
+
+def bump_data_version(rewrite: bool = False) -> None:
+    """Invalidate every cached read; call inside the write's transaction, before commit.
+
+    Pass rewrite=True when the write updated or deleted existing rows rather than only adding some.
+    """
+    values = dict(version=DataVersion.version + 1, updated_at=datetime.now(timezone.utc).replace(tzinfo=None))
+    if rewrite:
+        values["rewrite_version"] = DataVersion.rewrite_version + 1
+    db.session.execute(update(DataVersion).where(DataVersion.id == 1).values(**values))
+
+
+def current_data_version():
+    """(version, updated_at) of the data, read from the shared counter row."""
+    row = db.session.execute(select(DataVersion.version, DataVersion.updated_at).where(DataVersion.id == 1)).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at.replace(tzinfo=timezone.utc)
+
+
+# ---------- In-process response cache ----------
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (status, body, mimetype, headers)
+
+
+def _cache_get(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+        return entry
+
+
+def _cache_put(key, entry) -> None:
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def request_key() -> str:
+    """Stable digest of the request path and its (sorted) query parameters."""
+    args = sorted((k, v) for k in request.args for v in request.args.getlist(k))
+    return hashlib.sha1(repr((request.path, args)).encode("utf-8")).hexdigest()[:20]
+
+
+def version_tag(version: int, updated_at) -> str:
+    # The timestamp keeps tags unique if the database (and its counter) is ever recreated
+    stamp = int(updated_at.timestamp() * 1000) if updated_at is not None else 0
+    return f"v{version}.{stamp}"
+
+
+def set_validators(response, version: int, updated_at, key: str, public: bool):
+    response.set_etag(f"{version_tag(version, updated_at)}-{key}")
+    if updated_at is not None:
+        response.last_modified = updated_at
+    response.cache_control.no_cache = True  # always revalidate, 304 when unchanged
+    if public:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    return response
+
+
+def not_modified(version: int, updated_at, key: str, public: bool = False):
+    """A 304 response if the client's validators still match the current data version, else None."""
+    if request.if_none_match and request.if_none_match.contains(f"{version_tag(version, updated_at)}-{key}"):
+        return set_validators(make_response("", 304), version, updated_at, key, public)
+    if not request.if_none_match and updated_at is not None and request.if_modified_since:
+        if updated_at.replace(microsecond=0) <= request.if_modified_since:
+            return set_validators(make_response("", 304), version, updated_at, key, public)
+    return None
+
+
+def cached_response(public: bool = False):
+    """Cache a GET view's successful responses per (URL, data version) and answer revalidations with 304."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version, updated_at = current_data_version()
+            key = request_key()
+            not_mod = not_modified(version, updated_at, key, public)
+            if not_mod is not None:
+                return not_mod
+            entry = _cache_get((key, version))
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                if len(body) <= CACHE_MAX_BODY_BYTES:
+                    headers = {h: response.headers[h] for h in _CACHED_HEADERS if h in response.headers}
+                    _cache_put((key, version), (response.status_code, body, response.mimetype, headers))
+                response.headers["X-Cache"] = "MISS"
+            else:
+                status, body, mimetype, headers = entry
+                response = make_response(body, status, headers)
+                response.mimetype = mimetype
+                response.headers["X-Cache"] = "HIT"
+            return set_validators(response, version, updated_at, key, public)
+        return wrapper
+    return decorator
+
+
+# ---------- Export file cache ----------
+
+def cached_export_path(version: int, updated_at, key: str, suffix: str, build) -> Path:
+    """Path of the export for (data version, key), building it with build(tmp_path) on a miss.
+
+    Files are written under a temp name and renamed into place, so concurrent workers never
+    see a partial file; exports of older versions are removed, once past the grace period, as
+    new ones are written.
+    """
+    export_dir = Path(current_app.config["EXPORT_CACHE_DIR"])
+    export_dir.mkdir(parents=True, exist_ok=True)
+    tag = version_tag(version, updated_at)
+    path = export_dir / f"{tag}-{key}{suffix}"
+    if path.exists():
+        return path
+    fd, tmp_path = tempfile.mkstemp(dir=export_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        build(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    expired = time.time() - EXPORT_CACHE_GRACE_SECONDS
+    for old in export_dir.glob(f"v*{suffix}"):
+        try:
+            # Never a newer version: another worker may be at it already
+            if int(old.name[1:].split(".", 1)[0]) < version and old.stat().st_mtime < expired:
+                old.unlink()
+        except (OSError, ValueError):
+            pass
+    return path
+
+
+@click.command("bump-data-version")
+@with_appcontext
+def bump_data_version_command():
+    """Invalidate all cached reads (e.g. after editing the database by hand)."""
+    bump_data_version(rewrite=True)
+    db.session.commit()
+    print(f"Data version is now {current_data_version()[0]}")
+
+
+def shared_dir(app, name: str) -> Path:
+    """<tempdir>/<name>/<hash of the database URI>: shared by every worker on the host, one per database."""
+    digest = hashlib.sha1(app.config["SQLALCHEMY_DATABASE_URI"].encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / name / digest
+
+
+def init_app(app) -> None:
+    # Exports are cached as files so every worker on the host can reuse them
+    app.config.setdefault("EXPORT_CACHE_DIR", os.environ.get("EXPORT_CACHE_DIR")
+                          or str(shared_dir(app, "swimming-export-cache")))
+    app.cli.add_command(bump_data_version_command)
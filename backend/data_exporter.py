@@ -1,77 +1,30 @@
-import pandas as pd
+# Run from the project root: python -m backend.data_exporter [season]
+import sys
+from itertools import chain
 from pathlib import Path
-from app import db, Swimmers, app  # Importing the app and db instance from app.py
+from .app import create_app, export_rows, YEAR
+from .export import write_xlsx, seconds_to_time  # noqa: F401  (seconds_to_time re-exported for old callers)
 
-def seconds_to_time(result_in_seconds):
-    try:
-        result_in_seconds = float(result_in_seconds)
-    except ValueError:
-        raise ValueError(f"Invalid input for time conversion: {result_in_seconds}")
-    minutes = int(result_in_seconds // 60)
-    seconds = int(result_in_seconds % 60)
-    milliseconds = int((result_in_seconds % 1) * 100)
+def export_to_excel(filters: dict = None, season: int = None):
+    # With a season, only its results (archived or not) go to that season's folder
+    if season is not None:
+        filters = dict(filters or {}, seasons=(season,))
 
-    formatted_time = f"{minutes:02}:{seconds:02},{milliseconds:02}"
-    return formatted_time
+    with create_app().app_context():
 
-def export_to_excel():
-
-    with app.app_context():
-
-        swimmers = Swimmers.query.all()
-
-        if not swimmers:
+        rows = export_rows(filters, format_times=True)
+        first = next(rows, None)
+        if first is None:
             print("No data found in the database.")
             return
 
-        swimmers_data = []
-        for swimmer in swimmers:
-            swimmers_data.append({
-                "ФИО": swimmer.full_name,
-                "Год рождения": swimmer.year_of_birth,
-                "Пол": swimmer.gender,
-                "Дистанция": swimmer.event,
-                "Время": swimmer.result,
-                "Дата проведения соревнований": swimmer.date_of_competition,
-                "Тип бассейна": swimmer.pool_length,
-                "FINA Points": swimmer.fina_points,
-                "Rudolph Points": swimmer.rudolph_points
-            })
-
-        df = pd.DataFrame(swimmers_data)
-        df['Пол'] = df['Пол'].replace('F', 'Ж')
-        # Normalize event name variations ("50M" vs "50m") to match mapping keys
-        df['Дистанция'] = df['Дистанция'].astype(str).str.replace('M ', 'm ', regex=False)
-        df['Дистанция'] = df['Дистанция'].replace('50m Freestyle', '50м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('100m Freestyle', '100м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('200m Freestyle', '200м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('400m Freestyle', '400м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('800m Freestyle', '800м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('1500m Freestyle', '1500м кроль')
-        df['Дистанция'] = df['Дистанция'].replace('50m Breaststroke', '50м брасс')
-        df['Дистанция'] = df['Дистанция'].replace('100m Breaststroke', '100м брасс')
-        df['Дистанция'] = df['Дистанция'].replace('200m Breaststroke', '200м брасс')
-        df['Дистанция'] = df['Дистанция'].replace('50m Butterfly', '50м батт')
-        df['Дистанция'] = df['Дистанция'].replace('100m Butterfly', '100м батт')
-        df['Дистанция'] = df['Дистанция'].replace('200m Butterfly', '200м батт')
-        df['Дистанция'] = df['Дистанция'].replace('50m Backstroke', '50м на спине')
-        df['Дистанция'] = df['Дистанция'].replace('100m Backstroke', '100м на спине')
-        df['Дистанция'] = df['Дистанция'].replace('200m Backstroke', '200м на спине')
-        df['Дистанция'] = df['Дистанция'].replace('200m Medley', '200м комплекс')
-        df['Дистанция'] = df['Дистанция'].replace('400m Medley', '400м комплекс')
-        df['Время'] = df['Время'].apply(seconds_to_time)
-        df['Дата проведения соревнований'] = pd.to_datetime(df['Дата проведения соревнований'], errors='coerce')
-        df['Дата проведения соревнований'] = df['Дата проведения соревнований'].dt.strftime('%d/%m/%Y')
-        df['FINA Points'] = pd.to_numeric(df['FINA Points'], errors='coerce').fillna(0).astype(int)
-
         project_root = Path(__file__).resolve().parents[1]
-        output_dir = project_root / 'output' / 'Swimming Ranking 2025'
+        output_dir = project_root / 'output' / f'Swimming Ranking {season or YEAR}'
         output_dir.mkdir(parents=True, exist_ok=True)
         excel_file = output_dir / 'Swimmers_Data.xlsx'
-        df.to_excel(str(excel_file), index=False)
-
-        print(f"Database successfully exported to {excel_file}")
+        count = write_xlsx(chain([first], rows), excel_file)
+        print(f"Database successfully exported to {excel_file} ({count} rows)")
 
 if __name__ == '__main__':
 
-    export_to_excel()
+    export_to_excel(season=int(sys.argv[1]) if len(sys.argv) > 1 else None)
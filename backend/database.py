@@ -0,0 +1,108 @@
+# backend/database.py
+# Engine tuning. SQLite connections get WAL journaling and cache/busy-timeout pragmas, so
+# readers never block the writer and concurrent writers wait instead of failing with
+# "database is locked". Server databases get an explicit, pre-pinged and recycled pool.
+# With DATABASE_REPLICA_URL set, routes marked @read_replica run their queries on the replica.
+import os
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = "replica"
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+# SQLite; SQLITE_JOURNAL_MODE=default keeps SQLite's own rollback journal
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")  # safe with WAL; FULL otherwise
+SQLITE_CACHE_SIZE_KB = _env_int("SQLITE_CACHE_SIZE_KB", 16384)
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+# Postgres and other pooled servers
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 5)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 10)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # below typical server/proxy idle cutoffs
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+def normalize_url(url: str) -> str:
+    # Heroku-style postgres:// URLs are rejected by SQLAlchemy 2
+    return "postgresql://" + url[len("postgres://"):] if url.startswith("postgres://") else url
+
+
+def engine_options(url: str) -> dict:
+    """Engine keyword arguments for a database URL."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}  # pragmas are applied per connection by _sqlite_pragmas
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _sqlite_pragmas(in_memory: bool):
+    statements = [f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}"]
+    if SQLITE_JOURNAL_MODE.lower() != "default" and not in_memory:
+        statements.append(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    if SQLITE_SYNCHRONOUS.lower() != "default":
+        statements.append(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    statements.append(f"PRAGMA cache_size = {-SQLITE_CACHE_SIZE_KB}")  # negative = KiB
+    statements.append("PRAGMA temp_store = MEMORY")
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+    return on_connect
+
+
+# ---------- Read replica routing ----------
+
+class RoutingSession(Session):
+    """db.session that sends a @read_replica request's queries to the replica engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get("db_use_replica") and not self._flushing:
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(f):
+    """Run this view's queries on the read replica, if one is configured. Read-only views only."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_use_replica = True
+        return f(*args, **kwargs)
+    return decorated
+
+
+def configure(app) -> None:
+    """Fill in engine options and the replica bind; call before db.init_app(app)."""
+    url = app.config["SQLALCHEMY_DATABASE_URI"] = normalize_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+    for key, value in engine_options(url).items():
+        options.setdefault(key, value)
+    replica_url = app.config.setdefault("DATABASE_REPLICA_URL", os.environ.get("DATABASE_REPLICA_URL"))
+    if replica_url:
+        replica_url = normalize_url(replica_url)
+        app.config.setdefault("SQLALCHEMY_BINDS", {})[REPLICA_BIND] = {"url": replica_url, **engine_options(replica_url)}
+
+
+def init_app(app, db) -> None:
+    """Install the SQLite pragmas on every SQLite engine; call after db.init_app(app)."""
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                in_memory = engine.url.database in (None, "", ":memory:")
+                event.listen(engine, "connect", _sqlite_pragmas(in_memory))
@@ -0,0 +1,98 @@
+# backend/events.py
+# Canonical event catalog. Input spellings ("50M Freestyle", "50 free", "50м кроль", ...) are
+# parsed once to a small integer code; results store the code, and per-event tables (base
+# times, Rudolph cells, labels) are sequences indexed by it. Codes are persisted: append new
+# events, never renumber.
+import re
+from typing import NamedTuple
+
+
+class Event(NamedTuple):
+    code: int
+    distance: int
+    stroke: str
+    label_ru: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.distance}M {self.stroke}"
+
+
+EVENTS = (
+    Event(1, 50, "Freestyle", "50м кроль"),
+    Event(2, 100, "Freestyle", "100м кроль"),
+    Event(3, 200, "Freestyle", "200м кроль"),
+    Event(4, 400, "Freestyle", "400м кроль"),
+    Event(5, 800, "Freestyle", "800м кроль"),
+    Event(6, 1500, "Freestyle", "1500м кроль"),
+    Event(7, 50, "Breaststroke", "50м брасс"),
+    Event(8, 100, "Breaststroke", "100м брасс"),
+    Event(9, 200, "Breaststroke", "200м брасс"),
+    Event(10, 50, "Butterfly", "50м батт"),
+    Event(11, 100, "Butterfly", "100м батт"),
+    Event(12, 200, "Butterfly", "200м батт"),
+    Event(13, 50, "Backstroke", "50м на спине"),
+    Event(14, 100, "Backstroke", "100м на спине"),
+    Event(15, 200, "Backstroke", "200м на спине"),
+    Event(16, 100, "Medley", "100м комплекс"),  # short course only
+    Event(17, 200, "Medley", "200м комплекс"),
+    Event(18, 400, "Medley", "400м комплекс"),
+)
+MAX_EVENT_CODE = len(EVENTS)
+
+# Indexed by code; slot 0 is "unknown"
+EVENT_NAMES = ("",) + tuple(e.name for e in EVENTS)
+EVENT_LABELS_RU = ("",) + tuple(e.label_ru for e in EVENTS)
+
+STROKE_ALIASES = {
+    "Freestyle": ("freestyle", "free", "fr", "кроль", "вольный стиль", "в/с"),
+    "Breaststroke": ("breaststroke", "breast", "br", "брасс"),
+    "Butterfly": ("butterfly", "fly", "bf", "батт", "баттерфляй", "дельфин"),
+    "Backstroke": ("backstroke", "back", "bk", "на спине", "спина"),
+    "Medley": ("medley", "im", "комплекс", "к/п"),
+}
+_STROKES = {alias: stroke for stroke, aliases in STROKE_ALIASES.items() for alias in aliases}
+_BY_PARTS = {(e.distance, e.stroke): e.code for e in EVENTS}
+_EVENT_RE = re.compile(r"(\d+)\s*(?:m|м|meters?|метров)?\.?\s+(.+)")
+
+# Exact spellings seen in practice, so the common case is one dict lookup
+_BY_SPELLING = {}
+for _e in EVENTS:
+    for _alias, _stroke in _STROKES.items():
+        if _stroke == _e.stroke:
+            for _spelling in (f"{_e.distance}m {_alias}", f"{_e.distance} {_alias}", f"{_e.distance}м {_alias}"):
+                _BY_SPELLING[_spelling] = _e.code
+
+
+def code_for(distance: int, stroke: str) -> int:
+    """Code of (distance, canonical stroke name); 0 if the catalog has no such event."""
+    return _BY_PARTS.get((int(distance), stroke), 0)
+
+
+def event_code(value) -> int:
+    """Parse an event code, name or alias to its code; 0 if it is not a known event."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if 0 < value <= MAX_EVENT_CODE else 0
+    key = " ".join(str(value or "").split()).casefold()
+    code = _BY_SPELLING.get(key)
+    if code is not None:
+        return code
+    if key.isdigit():
+        return event_code(int(key))
+    match = _EVENT_RE.fullmatch(key)
+    if match is None:
+        return 0
+    stroke = _STROKES.get(match.group(2))
+    return _BY_PARTS.get((int(match.group(1)), stroke), 0) if stroke else 0
+
+
+def require_event_code(value) -> int:
+    code = event_code(value)
+    if not code:
+        raise ValueError(f"Unknown event: {value}")
+    return code
+
+
+def event_name(code: int) -> str:
+    """Canonical stored name ("50M Freestyle") of a code."""
+    return EVENT_NAMES[code] if 0 < code <= MAX_EVENT_CODE else ""
@@ -0,0 +1,99 @@
+# backend/export.py
+import csv
+import io
+from .events import EVENT_LABELS_RU, event_code
+
+EXPORT_HEADERS = [
+    "ФИО",
+    "Год рождения",
+    "Пол",
+    "Дистанция",
+    "Время",
+    "Название соревнования",
+    "Дата проведения соревнований",
+    "Тип бассейна",
+    "Занятое место",
+    "FINA Points",
+    "Rudolph Points",
+]
+
+def event_label_ru(event) -> str:
+    """Russian label of an event code (names are accepted for old callers)."""
+    code = event if type(event) is int else event_code(event)
+    return EVENT_LABELS_RU[code] or str(event)
+
+
+def seconds_to_time(result_in_seconds):
+    try:
+        result_in_seconds = float(result_in_seconds)
+    except ValueError:
+        raise ValueError(f"Invalid input for time conversion: {result_in_seconds}")
+    minutes = int(result_in_seconds // 60)
+    seconds = int(result_in_seconds % 60)
+    milliseconds = int((result_in_seconds % 1) * 100)
+
+    formatted_time = f"{minutes:02}:{seconds:02},{milliseconds:02}"
+    return formatted_time
+
+
+def format_export_row(row, format_times: bool = False) -> tuple:
+    """Turn one (full_name, year_of_birth, gender, event_code, result, competition, date, pool,
+    place, fina, rudolph) tuple into an output row matching EXPORT_HEADERS."""
+    (full_name, year_of_birth, gender, event, result, competition,
+     event_date, pool_length, place_taken, fina_points, rudolph_points) = row
+    return (
+        full_name,
+        year_of_birth,
+        'Ж' if gender == 'F' else 'M',
+        EVENT_LABELS_RU[event],
+        seconds_to_time(result) if format_times else result,
+        competition,
+        event_date.strftime('%d/%m/%Y') if event_date else None,
+        pool_length,
+        place_taken,
+        int(fina_points or 0),
+        int(rudolph_points or 0),
+    )
+
+
+def format_export_rows(rows, format_times: bool = False) -> list:
+    """format_export_row over a batch of rows, formatting the time column in one array call."""
+    if not format_times or not rows:
+        return [format_export_row(row) for row in rows]
+    from .utils import seconds_to_times
+    times, invalid = seconds_to_times([row[4] for row in rows])
+    if invalid:
+        seconds_to_time(rows[invalid[0]][4])  # raises the scalar's error
+    return [format_export_row((*row[:4], t, *row[5:])) for row, t in zip(rows, times.tolist())]
+
+
+def write_xlsx(rows, path) -> int:
+    """Write formatted rows to path with a write-only workbook; returns the row count."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(EXPORT_HEADERS)
+    count = 0
+    for row in rows:
+        ws.append(row)
+        count += 1
+    wb.save(str(path))
+    return count
+
+
+def iter_csv(rows, batch: int = 500):
+    """Yield the CSV export as encoded chunks (UTF-8 with BOM so Excel picks up Cyrillic)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write('\ufeff')
+    writer.writerow(EXPORT_HEADERS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    yield buf.getvalue().encode('utf-8')
@@ -0,0 +1,86 @@
+# backend/ingest.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from itertools import islice
+
+BULK_CHUNK_SIZE = 500
+
+
+def detect_format(filename: str, content_type: str, explicit: str = None) -> str:
+    if explicit:
+        return explicit.lower()
+    name = (filename or "").lower()
+    for ext in ("csv", "xlsx", "json"):
+        if name.endswith("." + ext):
+            return ext
+    content_type = (content_type or "").lower()
+    if "json" in content_type:
+        return "json"
+    if "spreadsheetml" in content_type:
+        return "xlsx"
+    return "csv"
+
+
+def _clean(value):
+    # Spreadsheet cells come back typed; the row parser expects API-style strings
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _is_blank(row: dict) -> bool:
+    return all(v is None or v == "" for v in row.values())
+
+
+def iter_csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text):
+        row = {(k or "").strip(): _clean(v) for k, v in row.items()}
+        if not _is_blank(row):
+            yield row
+
+
+def iter_xlsx_rows(stream):
+    from openpyxl import load_workbook
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        for values in rows:
+            row = {h: _clean(v) for h, v in zip(header, values) if h}
+            if not _is_blank(row):
+                yield row
+    finally:
+        wb.close()
+
+
+def iter_bulk_rows(fmt: str, stream=None, payload=None):
+    if fmt == "csv":
+        return iter_csv_rows(stream)
+    if fmt == "xlsx":
+        return iter_xlsx_rows(stream)
+    if fmt == "json":
+        if payload is None and stream is not None:
+            payload = json.load(stream)  # an uploaded .json file
+        if not isinstance(payload, list):
+            raise ValueError("JSON body must be an array of result objects")
+        return iter(payload)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def chunked(rows, size: int):
+    """Yield (first_row_number, rows) chunks; row numbers are 1-based data rows."""
+    rows = iter(rows)
+    first = 1
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield first, chunk
+        first += len(chunk)
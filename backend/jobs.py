@@ -0,0 +1,546 @@
+# backend/jobs.py
+# Background jobs for heavy admin operations (full export, points recompute, Rudolph PDF
+# extraction). Jobs live in the job table, so they survive worker restarts; every gunicorn
+# worker runs a small dispatcher that claims queued jobs with an atomic UPDATE and runs at
+# most JOB_WORKERS of them in threads. A unique partial index allows only one running job
+# per kind, and running jobs heartbeat a lease: if their worker dies the lease expires and
+# the job is queued again (up to JOB_MAX_ATTEMPTS). Artifacts are deleted from the shared
+# artifact directory JOB_ARTIFACT_TTL_SECONDS after they were written.
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import click
+from flask import Blueprint, current_app, jsonify, request, send_file, url_for
+from sqlalchemy import select, update, func, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from .app import (
+    db, Athlete, Swimmers, DOCS_DIR, RECOMPUTE_CHUNK_SIZE, EXPORT_BATCH_SIZE, _EXPORT_COLUMNS, login_required,
+    recompute_points, result_filters, apply_result_filters, for_seasons,
+)
+from .cache import shared_dir
+from .export import format_export_rows, write_xlsx, iter_csv
+
+jobs_bp = Blueprint("jobs", __name__, cli_group=None)
+
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 2))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 60))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+# How long a stopping worker waits for its running jobs to reach a progress report and requeue
+JOB_STOP_SECONDS = float(os.environ.get("JOB_STOP_SECONDS", 10))
+JOB_ARTIFACT_TTL_SECONDS = float(os.environ.get("JOB_ARTIFACT_TTL_SECONDS", 7 * 24 * 3600))
+# Each dispatcher looks for expired artifacts at most this often
+_ARTIFACT_SWEEP_INTERVAL = 3600
+# Progress is written at most this often (each write also renews the lease)
+_PROGRESS_INTERVAL = 0.5
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    params = db.Column(db.Text, nullable=False, default="{}")  # JSON
+    status = db.Column(db.String(12), nullable=False, default="queued")
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    message = db.Column(db.String(200), nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    artifact_path = db.Column(db.String(500), nullable=True)
+    artifact_name = db.Column(db.String(100), nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    owner = db.Column(db.String(100), nullable=True)  # host:pid of the worker running it
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    __table_args__ = (
+        db.CheckConstraint(
+            "status in ('queued','running','succeeded','failed','cancelled')", name="ck_job_status"
+        ),
+        # One running job per kind, across all workers and hosts
+        db.Index("ux_job_running_kind", "kind", unique=True,
+                 sqlite_where=text("status = 'running'"), postgresql_where=text("status = 'running'")),
+        db.Index("ix_job_status", "status", "id"),
+    )
+
+
+def job_dict(job: Job) -> dict:
+    body = {
+        "id": job.id,
+        "kind": job.kind,
+        "params": json.loads(job.params or "{}"),
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 4),
+        "message": job.message,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at.isoformat() + "Z",
+        "started_at": job.started_at.isoformat() + "Z" if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() + "Z" if job.finished_at else None,
+    }
+    if job.status == "succeeded" and job.artifact_path:
+        body["artifact_url"] = url_for("jobs.job_artifact", job_id=job.id)
+    return body
+
+
+# ---------- Job kinds ----------
+# kind -> (validate(params) -> normalized params, run(ctx, params) -> result dict)
+JOB_KINDS = {}
+
+
+def job_kind(name: str, validate):
+    def decorator(run):
+        JOB_KINDS[name] = (validate, run)
+        return run
+    return decorator
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStopped(Exception):
+    pass
+
+
+class JobContext:
+    """Handed to a running job: progress reporting, cancellation checks and artifact paths."""
+
+    def __init__(self, job_id: int, owner: str, artifact_dir: Path, stopping: threading.Event = None):
+        self.job_id = job_id
+        self.owner = owner
+        self.artifact_dir = artifact_dir
+        self.stopping = stopping
+        self.artifact = None  # (path, download name) once the job has one
+        self._last_write = 0.0
+
+    def progress(self, done: float, total: float = None, message: str = None, force: bool = False) -> None:
+        """Record progress (done/total) and renew the lease; raises JobCancelled if the job was cancelled
+        and JobStopped if its worker is shutting down."""
+        if self.stopping is not None and self.stopping.is_set():
+            raise JobStopped("worker shutting down")
+        now = time.monotonic()
+        if not force and now - self._last_write < _PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        values = {"heartbeat_at": _now()}
+        if total:
+            values["progress"] = min(float(done) / float(total), 1.0)
+        if message is not None:
+            values["message"] = message[:200]
+        # Own connection/transaction: never commits (or rolls back) the job's own work
+        try:
+            with db.engine.begin() as conn:
+                held = conn.execute(
+                    update(Job.__table__)
+                    .where(Job.id == self.job_id, Job.owner == self.owner, Job.status == "running")
+                    .values(**values)
+                ).rowcount
+                cancel = conn.execute(select(Job.cancel_requested).where(Job.id == self.job_id)).scalar()
+        except OperationalError:
+            # SQLite: locked while a long read (e.g. the export cursor) is open; report next time
+            return
+        if not held:
+            raise JobCancelled("lease lost")
+        if cancel:
+            raise JobCancelled("cancelled")
+
+    def artifact_path(self, suffix: str, download_name: str) -> Path:
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        path = self.artifact_dir / f"job-{self.job_id}{suffix}"
+        self.artifact = (path, download_name)
+        return path
+
+
+def _validate_export(params: dict) -> dict:
+    fmt = str(params.get("format", "xlsx")).lower()
+    if fmt not in {"xlsx", "csv"}:
+        raise ValueError(f"Unsupported format: {fmt}")
+    filters = params.get("filters") or {}
+    result_filters(filters)  # raises on bad values
+    return {"format": fmt, "filters": filters, "format_times": bool(params.get("format_times", False))}
+
+
+def _export_batches(filters: dict, format_times: bool):
+    """Formatted export rows in id-keyset batches, one short query each.
+
+    Unlike export_rows() no cursor stays open between batches, so on SQLite the job's
+    progress writes (and everyone else's writes) never wait on the export's read lock.
+    """
+    stmt = apply_result_filters(
+        select(Swimmers.id, *_EXPORT_COLUMNS).select_from(Swimmers).join(Athlete, Swimmers.athlete_id == Athlete.id),
+        filters,
+    ).order_by(Swimmers.id).limit(EXPORT_BATCH_SIZE)
+    last_id = 0
+    while True:
+        batch = db.session.execute(for_seasons(stmt.where(Swimmers.id > last_id), filters.get("seasons"))).all()
+        db.session.rollback()
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        yield format_export_rows([row[1:] for row in batch], format_times)
+
+
+@job_kind("export", _validate_export)
+def run_export(ctx: JobContext, params: dict) -> dict:
+    filters = result_filters(params["filters"])
+    total = db.session.scalar(for_seasons(
+        apply_result_filters(select(func.count()).select_from(Swimmers), filters), filters.get("seasons"),
+    ))
+    if not total:
+        raise LookupError("No data to export")
+
+    def rows():
+        done = 0
+        for batch in _export_batches(filters, params["format_times"]):
+            ctx.progress(done, total)
+            yield from batch
+            done += len(batch)
+
+    fmt = params["format"]
+    path = ctx.artifact_path(f".{fmt}", f"Swimmers_Data.{fmt}")
+    if fmt == "xlsx":
+        count = write_xlsx(rows(), path)
+    else:
+        with open(path, "wb") as fh:
+            fh.writelines(iter_csv(rows()))
+        count = total
+    return {"rows": count, "format": fmt}
+
+
+def _validate_recompute(params: dict) -> dict:
+    chunk_size = int(params.get("chunk_size", RECOMPUTE_CHUNK_SIZE))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    return {"chunk_size": chunk_size}
+
+
+@job_kind("recompute_points", _validate_recompute)
+def run_recompute(ctx: JobContext, params: dict) -> dict:
+    total = db.session.scalar(select(func.count()).select_from(Swimmers))
+    return recompute_points(params["chunk_size"], on_chunk=lambda rows: ctx.progress(rows, total, force=True))
+
+
+def _validate_extract(params: dict) -> dict:
+    year = int(params.get("year", 2025))
+    if not (DOCS_DIR / f"rudolph-{year}.pdf").exists():
+        raise ValueError(f"docs/rudolph-{year}.pdf not found")
+    # One process by default: the job already runs beside the web worker
+    return {"year": year, "workers": max(1, int(params.get("workers", 1)))}
+
+
+@job_kind("extract_rudolph", _validate_extract)
+def run_extract(ctx: JobContext, params: dict) -> dict:
+    from PyPDF2 import PdfReader
+    from .rudolph_pdf_extractor import iter_rudolph_points_from_pdf, write_rudolph_csv
+    pdf_path = DOCS_DIR / f"rudolph-{params['year']}.pdf"
+    pages = len(PdfReader(pdf_path).pages)
+    path = ctx.artifact_path(".csv", f"rudolph_points_{params['year']}.csv")
+    records = iter_rudolph_points_from_pdf(pdf_path, params["workers"], on_page=lambda done: ctx.progress(done, pages))
+    return {"rows": write_rudolph_csv(records, path), "pages": pages}
+
+
+# ---------- Queue operations ----------
+
+def submit_job(kind: str, params: dict = None):
+    """Queue a job; returns (job, created). An identical queued/running job is returned instead of a new one."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    params = JOB_KINDS[kind][0](params or {})
+    encoded = json.dumps(params, sort_keys=True)
+    existing = db.session.scalar(
+        select(Job).where(Job.kind == kind, Job.params == encoded, Job.status.in_(ACTIVE_STATUSES)).order_by(Job.id)
+    )
+    if existing is not None:
+        return existing, False
+    job = Job(kind=kind, params=encoded, status="queued", created_at=_now())
+    db.session.add(job)
+    db.session.commit()
+    if _runner is not None:
+        _runner.wake.set()
+    return job, True
+
+
+def cancel_job(job: Job) -> Job:
+    """Cancel a queued job outright; ask a running job to stop at its next progress report."""
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(Job.__table__).where(Job.id == job.id, Job.status == "queued")
+            .values(status="cancelled", finished_at=_now())
+        )
+        conn.execute(
+            update(Job.__table__).where(Job.id == job.id, Job.status == "running").values(cancel_requested=True)
+        )
+    db.session.refresh(job)
+    return job
+
+
+def _claim(owner: str, exclude_kinds=()):
+    """Atomically move the oldest claimable queued job to running for owner; returns its id or None."""
+    candidates = db.session.execute(
+        select(Job.id, Job.kind).where(Job.status == "queued", Job.kind.not_in(exclude_kinds)).order_by(Job.id).limit(20)
+    ).all()
+    db.session.rollback()
+    for job_id, kind in candidates:
+        now = _now()
+        try:
+            with db.engine.begin() as conn:
+                claimed = conn.execute(
+                    update(Job.__table__)
+                    .where(Job.id == job_id, Job.status == "queued")
+                    .values(status="running", owner=owner, heartbeat_at=now, started_at=now, attempts=Job.attempts + 1)
+                ).rowcount
+        except IntegrityError:
+            continue  # another job of this kind is running
+        if claimed:
+            return job_id
+    return None
+
+
+def _reap_expired() -> None:
+    """Requeue (or fail) running jobs whose worker stopped renewing the lease."""
+    expired = _now() - timedelta(seconds=JOB_LEASE_SECONDS)
+    stale = Job.status == "running", Job.heartbeat_at < expired
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(Job.__table__).where(*stale, Job.cancel_requested.is_(True))
+            .values(status="cancelled", owner=None, finished_at=_now(), message="worker stopped")
+        )
+        conn.execute(
+            update(Job.__table__).where(*stale, Job.attempts >= JOB_MAX_ATTEMPTS)
+            .values(status="failed", owner=None, finished_at=_now(), error="worker stopped too many times")
+        )
+        conn.execute(
+            update(Job.__table__).where(*stale)
+            .values(status="queued", owner=None, message="requeued after worker stopped")
+        )
+
+
+def _expire_artifacts(artifact_dir: Path) -> None:
+    """Delete artifacts (and leftovers of failed jobs) older than JOB_ARTIFACT_TTL_SECONDS."""
+    expired = time.time() - JOB_ARTIFACT_TTL_SECONDS
+    for path in artifact_dir.glob("job-*"):
+        try:
+            if path.stat().st_mtime < expired:
+                path.unlink()
+        except OSError:
+            pass  # removed by another worker meanwhile
+
+
+def _finish(job_id: int, owner: str, **values) -> None:
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(Job.__table__).where(Job.id == job_id, Job.owner == owner, Job.status == "running")
+            .values(owner=None, finished_at=_now(), **values)
+        )
+
+
+def run_job(job_id: int, owner: str, artifact_dir: Path, stopping: threading.Event = None) -> None:
+    """Run a claimed job to completion, recording the outcome. Needs an app context.
+
+    Once `stopping` is set the job stops at its next progress report and goes back to the queue.
+    """
+    job = db.session.get(Job, job_id)
+    kind, params = job.kind, json.loads(job.params)
+    db.session.rollback()
+    ctx = JobContext(job_id, owner, artifact_dir, stopping)
+    try:
+        result = JOB_KINDS[kind][1](ctx, params)
+        db.session.rollback()  # release the read cursor/locks before recording the outcome
+    except JobStopped:
+        db.session.rollback()
+        # Only now that it has stopped running here may another worker claim it
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(Job.__table__).where(Job.id == job_id, Job.owner == owner, Job.status == "running")
+                .values(status="queued", owner=None, message="requeued after worker shutdown")
+            )
+    except JobCancelled as e:
+        db.session.rollback()
+        _finish(job_id, owner, status="cancelled", message=str(e))
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("job %s (%s) failed", job_id, kind)
+        _finish(job_id, owner, status="failed", error=str(e))
+    else:
+        path, name = ctx.artifact or (None, None)
+        _finish(job_id, owner, status="succeeded", progress=1.0, message=None,
+                result=json.dumps(result, default=str), artifact_path=str(path) if path else None,
+                artifact_name=name)
+
+
+# ---------- Runner ----------
+
+class JobRunner:
+    """Per-process dispatcher: claims queued jobs and runs up to `workers` of them in daemon threads."""
+
+    def __init__(self, app, workers: int):
+        self.app = app
+        self.workers = workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.active = {}  # job id -> thread
+        self.dispatcher = None
+        self.swept_at = float("-inf")
+
+    def start(self) -> "JobRunner":
+        self.dispatcher = threading.Thread(target=self._loop, name="job-dispatcher", daemon=True)
+        self.dispatcher.start()
+        return self
+
+    def _loop(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                with self.app.app_context():
+                    self.tick()
+            except Exception:
+                self.app.logger.exception("job dispatcher error")
+            self.wake.wait(JOB_POLL_SECONDS)
+            self.wake.clear()
+
+    def tick(self) -> None:
+        for job_id, thread in list(self.active.items()):
+            if not thread.is_alive():
+                del self.active[job_id]
+        if self.active:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(Job.__table__)
+                    .where(Job.id.in_(list(self.active)), Job.owner == self.owner, Job.status == "running")
+                    .values(heartbeat_at=_now())
+                )
+        _reap_expired()
+        now = time.monotonic()
+        if now - self.swept_at >= _ARTIFACT_SWEEP_INTERVAL:
+            self.swept_at = now
+            _expire_artifacts(Path(self.app.config["JOB_ARTIFACT_DIR"]))
+        while len(self.active) < self.workers and not self.stopping.is_set():
+            job_id = _claim(self.owner)
+            if job_id is None:
+                break
+            thread = threading.Thread(target=self._run, args=(job_id,), name=f"job-{job_id}", daemon=True)
+            self.active[job_id] = thread
+            thread.start()
+
+    def _run(self, job_id: int) -> None:
+        with self.app.app_context():
+            run_job(job_id, self.owner, Path(self.app.config["JOB_ARTIFACT_DIR"]), self.stopping)
+        self.wake.set()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop claiming and wait up to `timeout` (JOB_STOP_SECONDS) for the running jobs.
+
+        Each running job requeues itself at its next progress report. A job still running after the
+        timeout keeps its lease, which nothing renews any more, so it is requeued once the lease
+        expires; never while its thread may still be working on it.
+        """
+        self.stopping.set()
+        self.wake.set()
+        deadline = time.monotonic() + (JOB_STOP_SECONDS if timeout is None else timeout)
+        if self.dispatcher is not None:
+            self.dispatcher.join(max(deadline - time.monotonic(), 0))  # no claims after this
+        for thread in list(self.active.values()):
+            thread.join(max(deadline - time.monotonic(), 0))
+
+
+_runner = None
+
+
+def start_job_runner(app, workers: int = None) -> JobRunner:
+    """Start this process's dispatcher (once); gunicorn.conf.py calls it in every worker."""
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(app, workers or app.config["JOB_WORKERS"]).start()
+    return _runner
+
+
+def stop_job_runner() -> None:
+    global _runner
+    if _runner is not None:
+        _runner.stop()
+        _runner = None
+
+
+# ---------- Routes ----------
+
+@jobs_bp.route("/api/jobs", methods=["POST"])
+@login_required
+def create_job():
+    data = request.get_json(silent=True) or {}
+    try:
+        job, created = submit_job(str(data.get("kind", "")), data.get("params") or {})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify(job_dict(job)), 202 if created else 200
+
+
+@jobs_bp.route("/api/jobs", methods=["GET"])
+@login_required
+def list_jobs():
+    limit = request.args.get("limit", type=int)
+    if "limit" in request.args and (limit is None or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    stmt = select(Job).order_by(Job.id.desc()).limit(min(limit or 20, 200))
+    if request.args.get("status"):
+        stmt = stmt.where(Job.status == request.args["status"])
+    if request.args.get("kind"):
+        stmt = stmt.where(Job.kind == request.args["kind"])
+    return jsonify([job_dict(j) for j in db.session.scalars(stmt)])
+
+
+@jobs_bp.route("/api/jobs/<int:job_id>", methods=["GET"])
+@login_required
+def get_job(job_id: int):
+    return jsonify(job_dict(db.get_or_404(Job, job_id)))
+
+
+@jobs_bp.route("/api/jobs/<int:job_id>/cancel", methods=["POST"])
+@login_required
+def cancel_job_endpoint(job_id: int):
+    job = db.get_or_404(Job, job_id)
+    if job.status not in ACTIVE_STATUSES:
+        return jsonify({"error": f"Job is already {job.status}"}), 409
+    return jsonify(job_dict(cancel_job(job)))
+
+
+@jobs_bp.route("/api/jobs/<int:job_id>/artifact", methods=["GET"])
+@login_required
+def job_artifact(job_id: int):
+    job = db.get_or_404(Job, job_id)
+    if job.status != "succeeded" or not job.artifact_path:
+        return jsonify({"error": "Job has no artifact"}), 404
+    if not os.path.exists(job.artifact_path):
+        return jsonify({"error": "Artifact is no longer available"}), 410
+    return send_file(job.artifact_path, as_attachment=True, download_name=job.artifact_name)
+
+
+@jobs_bp.cli.command("run-jobs")
+@click.option("--workers", default=None, type=int, help="concurrent jobs (default: JOB_WORKERS)")
+def run_jobs_command(workers):
+    """Run the job dispatcher in the foreground (e.g. as a separate worker process)."""
+    runner = start_job_runner(current_app._get_current_object(), workers)
+    print(f"Running jobs as {runner.owner} with {runner.workers} worker(s); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop_job_runner()
+
+
+def init_app(app) -> None:
+    app.config.setdefault("JOB_WORKERS", int(os.environ.get("JOB_WORKERS", 1)))
+    app.config.setdefault("JOB_ARTIFACT_DIR", os.environ.get("JOB_ARTIFACT_DIR") or str(shared_dir(app, "swimming-jobs")))
+    app.register_blueprint(jobs_bp)
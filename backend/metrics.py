@@ -0,0 +1,317 @@
+# backend/metrics.py
+# Hot-path instrumentation exposed as Prometheus text at /metrics. Each process keeps its
+# histograms in memory and periodically writes them to <METRICS_DIR>/<pid>.json; /metrics
+# sums every file in the directory, so one scrape covers all gunicorn workers on the host.
+# The file of a worker that exited is folded into dead.json (gunicorn's child_exit hook, or the
+# next process that gets the same pid), so the totals never go backwards and pids can be reused.
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from flask import Blueprint, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from .app import db
+from .cache import shared_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the single-process dev server
+    fcntl = None
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# Set by init_app() from the app's database URI (or $METRICS_DIR)
+METRICS_DIR = None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 2))
+# Requests slower than this are logged with their SQL counts; 0 disables the log
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 0))
+# If set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500, 1000)
+# Scoring is timed per batch (an import chunk, a recompute), not per row; table loads take seconds
+SCORING_BUCKETS = (1e-4, 1e-3, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0)
+
+# name -> (help, buckets)
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Request latency by route, method and status.", REQUEST_BUCKETS),
+    "db_query_duration_seconds": ("SQL statement execution time by statement type.", QUERY_BUCKETS),
+    "db_queries_per_request": ("SQL statements executed per request.", QUERY_COUNT_BUCKETS),
+    "db_seconds_per_request": ("Time spent in SQL per request.", REQUEST_BUCKETS),
+    "scoring_duration_seconds": ("Points calculations by function.", SCORING_BUCKETS),
+    "table_load_duration_seconds": ("Base-time and points-table loads by table.", SCORING_BUCKETS),
+    "export_duration_seconds": ("Export generation by format.", SCORING_BUCKETS),
+}
+
+_lock = threading.Lock()
+# name -> {label string: [bucket counts..., +Inf count, sum]}
+_series = {name: {} for name in HISTOGRAMS}
+_last_flush = 0.0
+_dirty = False
+_file_pid = None  # pid whose leftover file this process has already folded away
+DEAD_FILE = "dead.json"
+
+
+def _labels(**labels) -> str:
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+
+
+def observe(name: str, label_string: str, value: float) -> None:
+    global _dirty
+    buckets = HISTOGRAMS[name][1]
+    with _lock:
+        counts = _series[name].get(label_string)
+        if counts is None:
+            counts = _series[name][label_string] = [0] * (len(buckets) + 1) + [0.0]
+        counts[bisect_left(buckets, value)] += 1  # per-bucket; made cumulative on output
+        counts[-1] += value
+        _dirty = True
+
+
+class timed:
+    """Context manager / decorator recording elapsed seconds into a histogram."""
+    __slots__ = ("name", "label_string", "started")
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.label_string = _labels(**labels)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, self.label_string, time.perf_counter() - self.started)
+        return False
+
+    def __call__(self, fn):
+        name, label_string = self.name, self.label_string
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, label_string, time.perf_counter() - started)
+        return wrapper
+
+
+def timed_iter(iterable, name: str, **labels):
+    """Yield from iterable, recording the time until it is exhausted (or closed)."""
+    label_string = _labels(**labels)
+    started = time.perf_counter()
+    try:
+        yield from iterable
+    finally:
+        observe(name, label_string, time.perf_counter() - started)
+
+
+# ---------- Cross-worker aggregation ----------
+
+@contextmanager
+def _dir_lock(shared: bool = False):
+    # Folding a file into dead.json and summing the directory must not interleave
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(METRICS_DIR / ".lock", "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None  # missing, or being replaced right now
+
+
+def _write(path, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def _add(merged: dict, data: dict) -> None:
+    for name, series in data.items():
+        if name not in merged:
+            continue
+        for label_string, counts in series.items():
+            total = merged[name].get(label_string)
+            if total is None or len(total) != len(counts):
+                merged[name][label_string] = list(counts)
+            else:
+                merged[name][label_string] = [a + b for a, b in zip(total, counts)]
+
+
+def mark_process_dead(pid: int) -> None:
+    """Fold the file of a process that exited into dead.json and remove it."""
+    if METRICS_DIR is None:
+        return
+    path = METRICS_DIR / f"{pid}.json"
+    with _dir_lock():
+        data = _read(path)
+        if data is None:
+            path.unlink(missing_ok=True)  # unreadable: nothing to keep
+            return
+        dead = {name: {} for name in HISTOGRAMS}
+        _add(dead, _read(METRICS_DIR / DEAD_FILE) or {})
+        _add(dead, data)
+        _write(METRICS_DIR / DEAD_FILE, json.dumps(dead))
+        path.unlink()
+
+
+def flush(force: bool = False) -> None:
+    """Write this process's series to METRICS_DIR/<pid>.json (at most every METRICS_FLUSH_SECONDS)."""
+    global _last_flush, _dirty, _file_pid
+    now = time.monotonic()
+    if not _dirty or (not force and now - _last_flush < METRICS_FLUSH_SECONDS):
+        return
+    with _lock:
+        snapshot = json.dumps(_series)
+        _dirty = False
+    if METRICS_DIR is None:
+        return
+    _last_flush = now
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    pid = os.getpid()
+    if _file_pid != pid:
+        # A file under our pid was left by an earlier process: keep its counts, not its file
+        mark_process_dead(pid)
+        _file_pid = pid
+    _write(METRICS_DIR / f"{pid}.json", snapshot)
+
+
+def collect() -> dict:
+    """Sum the series of every process that has written to METRICS_DIR."""
+    merged = {name: {} for name in HISTOGRAMS}
+    if METRICS_DIR is None:
+        return merged
+    with _dir_lock(shared=True):
+        for path in METRICS_DIR.glob("*.json"):
+            _add(merged, _read(path) or {})  # a file being replaced is picked up on the next scrape
+    return merged
+
+
+def render(merged: dict) -> str:
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP swimming_{name} {help_text}")
+        lines.append(f"# TYPE swimming_{name} histogram")
+        for label_string, counts in sorted(merged[name].items()):
+            sep = "," if label_string else ""
+            cumulative = 0
+            for le, count in zip([*map(str, buckets), "+Inf"], counts):
+                cumulative += count
+                lines.append(f'swimming_{name}_bucket{{{label_string}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"swimming_{name}_sum{{{label_string}}} {counts[-1]}")
+            lines.append(f"swimming_{name}_count{{{label_string}}} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _flush_at_exit():
+    if not _last_flush:
+        return  # never served a request (CLI commands, scripts)
+    try:
+        flush(force=True)
+    except OSError:
+        pass
+
+
+def _reset_after_fork():
+    # Workers forked from a preloaded master must not re-report the master's startup queries
+    global _last_flush, _dirty
+    for series in _series.values():
+        series.clear()
+    _last_flush, _dirty = 0.0, False
+
+
+# ---------- SQL instrumentation ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    observe("db_query_duration_seconds", _labels(statement=verb), elapsed)
+    if has_request_context() and "metrics_started" in g:
+        g.metrics_queries += 1
+        g.metrics_query_seconds += elapsed
+
+
+def _handle_error(context):
+    # after_cursor_execute does not fire for failed statements
+    starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+# ---------- Request instrumentation ----------
+
+@metrics_bp.before_app_request
+def _start_request_timer():
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_query_seconds = 0.0
+
+
+@metrics_bp.after_app_request
+def _record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    observe("http_request_duration_seconds",
+            _labels(route=route, method=request.method, status=response.status_code), elapsed)
+    route_labels = _labels(route=route)
+    observe("db_queries_per_request", route_labels, g.metrics_queries)
+    observe("db_seconds_per_request", route_labels, g.metrics_query_seconds)
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        current_app.logger.warning(
+            "slow request: %s %s -> %s in %.1f ms (%d queries, %.1f ms in SQL)",
+            request.method, request.full_path.rstrip("?"), response.status_code,
+            elapsed * 1000, g.metrics_queries, g.metrics_query_seconds * 1000,
+        )
+    try:
+        flush()
+    except OSError as e:
+        current_app.logger.warning("could not write metrics to %s: %s", METRICS_DIR, e)
+    return response
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    flush(force=True)
+    return Response(render(collect()), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app) -> None:
+    global METRICS_DIR
+    METRICS_DIR = Path(os.environ.get("METRICS_DIR") or shared_dir(app, "swimming-metrics"))
+    with app.app_context():
+        for engine in db.engines.values():  # the primary and any read replica
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+    app.register_blueprint(metrics_bp)
+
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_after_fork)
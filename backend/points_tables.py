@@ -0,0 +1,293 @@
+# backend/points_tables.py
+# Versioned points tables. base_times.json and every data/rudolph_points_<year>.csv are
+# published: a fingerprint of each cell goes into points_table. A corrected or new file
+# dropped in later is diffed against those fingerprints, and only results in the changed
+# cells ((event, gender, pool) for base times, (event, gender, age) per season for Rudolph)
+# are rescored, with their leaderboard partitions. Workers compare the published digests
+# with the tables they have loaded before every write and at most every
+# POINTS_TABLES_CHECK_SECONDS otherwise, and reload from disk when they moved on; a worker
+# that finds unpublished files on disk queues the publish job.
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+import click
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import select, delete, insert, func, and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from .app import (
+    db, Swimmers, BASE_TIMES_PATH, RECOMPUTE_CHUNK_SIZE, login_required,
+    rudolph_table_years, rudolph_table_year, rudolph_table_path, reload_reference_tables, recompute_points,
+)
+from .cache import bump_data_version
+from .jobs import job_kind, submit_job, job_dict, JobContext
+from .scoring import rudolph_cell_key, RUDOLPH_MAX_AGE
+from .seasons import season_condition
+
+points_tables_bp = Blueprint("points_tables", __name__, cli_group=None)
+
+BASE_TIMES_TABLE = "base_times"
+
+
+class PointsTable(db.Model):
+    name = db.Column(db.String(30), primary_key=True)  # "base_times" or "rudolph_<year>"
+    digest = db.Column(db.String(40), nullable=False)  # sha1 of the published file
+    cells = db.Column(db.Text, nullable=False)  # JSON {cell: fingerprint}
+    published_at = db.Column(db.DateTime, nullable=False)
+
+
+def rudolph_table_name(year: int) -> str:
+    return f"rudolph_{year}"
+
+
+def table_files() -> dict:
+    """Points table name -> file, for the files present on disk."""
+    files = {BASE_TIMES_TABLE: BASE_TIMES_PATH} if BASE_TIMES_PATH.exists() else {}
+    files.update({rudolph_table_name(y): rudolph_table_path(y) for y in rudolph_table_years()})
+    return files
+
+
+_FILE_DIGESTS = {}  # path -> ((mtime_ns, size), sha1); files are only hashed again when they change
+
+
+def file_digest(path) -> str:
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_DIGESTS.get(path)
+    if cached is None or cached[0] != key:
+        cached = _FILE_DIGESTS[path] = (key, hashlib.sha1(path.read_bytes()).hexdigest())
+    return cached[1]
+
+
+def disk_digests() -> dict:
+    return {name: file_digest(path) for name, path in table_files().items()}
+
+
+def published_digests() -> dict:
+    return dict(db.session.execute(select(PointsTable.name, PointsTable.digest)).all())
+
+
+# ---------- Fingerprints / diff ----------
+
+def _base_time_cells(base_times: tuple) -> dict:
+    # "slot:code" -> base time; slot as in scoring.base_time_slot
+    return {f"{slot}:{code}": t for slot, times in enumerate(base_times) for code, t in enumerate(times) if t}
+
+
+def _rudolph_cells(index: list) -> dict:
+    # cell (scoring.rudolph_cell) -> digest of its thresholds and points
+    return {
+        str(cell): hashlib.sha1(repr(entry).encode("utf-8")).hexdigest()[:16]
+        for cell, entry in enumerate(index) if entry is not None
+    }
+
+
+def _changed_cells(old: dict, new: dict) -> list:
+    return [cell for cell in old.keys() | new.keys() if old.get(cell) != new.get(cell)]
+
+
+def _base_time_condition(changed: list):
+    by_slot = {}
+    for key in changed:
+        slot, code = map(int, key.split(":"))
+        by_slot.setdefault(slot, set()).add(code)
+    return [
+        and_(
+            Swimmers.gender == ("F" if slot % 2 else "M"),
+            Swimmers.pool_length == 50 if slot >= 2 else Swimmers.pool_length != 50,
+            Swimmers.event_code.in_(sorted(codes)),
+        )
+        for slot, codes in sorted(by_slot.items())
+    ]
+
+
+def _rudolph_condition(old: dict, new: dict):
+    """Rows whose Rudolph cell differs between the published and the new tables, season by season
+    (a new table year also moves seasons from one table to another)."""
+    first, last = db.session.execute(select(func.min(Swimmers.date_of_competition), func.max(Swimmers.date_of_competition))).one()
+    if first is None:
+        return []
+    old_years = sorted(int(name.rsplit("_", 1)[1]) for name in old)
+    new_years = sorted(int(name.rsplit("_", 1)[1]) for name in new)
+    conditions = []
+    for season in range(first.year, last.year + 1):
+        old_year, new_year = rudolph_table_year(season, old_years), rudolph_table_year(season, new_years)
+        changed = _changed_cells(
+            old.get(rudolph_table_name(old_year), {}) if old_year is not None else {},
+            new.get(rudolph_table_name(new_year), {}) if new_year is not None else {},
+        )
+        by_gender = {}
+        for cell in changed:
+            code, gender, age = rudolph_cell_key(int(cell))
+            by_gender.setdefault(gender, {}).setdefault(code, set()).add(age)
+        for gender, codes in sorted(by_gender.items()):
+            for code, ages in sorted(codes.items()):
+                births = sorted(season - a for a in ages if a < RUDOLPH_MAX_AGE)
+                born = [Swimmers.year_of_birth.in_(births)] if births else []
+                if RUDOLPH_MAX_AGE in ages:
+                    born.append(Swimmers.year_of_birth <= season - RUDOLPH_MAX_AGE)
+                conditions.append(and_(
+                    Swimmers.event_code == code, Swimmers.gender == gender,
+                    season_condition(Swimmers.date_of_competition, (season,)), or_(*born),
+                ))
+    return conditions
+
+
+# ---------- Publishing ----------
+
+def publish_points_tables(full: bool = False, chunk_size: int = RECOMPUTE_CHUNK_SIZE, on_chunk=None) -> dict:
+    """Publish the points tables on disk: rescore the results in cells that changed since the last
+    publish (every result with full=True) and record the new fingerprints.
+
+    The first publish only records the tables on disk as the baseline (unless full=True): a
+    table corrected before it is not rescored, so that publish is logged and flagged "baseline".
+    """
+    global _loaded
+    published = {t.name: t for t in db.session.scalars(select(PointsTable))}
+    digests = disk_digests()  # before compiling: a file replaced meanwhile just gets published again
+    if not full and digests == {name: t.digest for name, t in published.items()}:
+        return {"tables": [], "cells": 0, "rows": 0, "updated": 0}
+    base_times, rudolph_tables = reload_reference_tables()
+    cells = {rudolph_table_name(y): _rudolph_cells(index) for y, index in rudolph_tables.items()}
+    if BASE_TIMES_TABLE in digests:
+        cells[BASE_TIMES_TABLE] = _base_time_cells(base_times)
+    old = {name: json.loads(t.cells) for name, t in published.items()}
+    changed_tables = sorted(n for n in digests.keys() | published.keys()
+                            if n not in published or digests.get(n) != published[n].digest)
+    changed_cells = sum(len(_changed_cells(old.get(n, {}), cells.get(n, {}))) for n in changed_tables)
+    if full:
+        stats = recompute_points(chunk_size, on_chunk)
+    elif not published:
+        current_app.logger.warning(
+            "first points-table publish: recording %s as the baseline without rescoring; "
+            "publish with --full if they changed since the results were scored", ", ".join(changed_tables))
+        stats = {"rows": 0, "updated": 0, "baseline": True}
+    else:
+        base_changed = _changed_cells(old.get(BASE_TIMES_TABLE, {}), cells.get(BASE_TIMES_TABLE, {}))
+        conditions = _rudolph_condition(
+            {n: c for n, c in old.items() if n != BASE_TIMES_TABLE},
+            {n: c for n, c in cells.items() if n != BASE_TIMES_TABLE},
+        )
+        conditions += _base_time_condition(base_changed)
+        stats = recompute_points(chunk_size, on_chunk, where=or_(*conditions)) if conditions else {"rows": 0, "updated": 0}
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    conn = db.session.connection()
+    conn.execute(delete(PointsTable.__table__))
+    conn.execute(insert(PointsTable.__table__), [
+        {"name": name, "digest": digests[name], "cells": json.dumps(cells[name], sort_keys=True), "published_at": now}
+        for name in sorted(digests)
+    ])
+    bump_data_version()  # responses derived from the tables themselves
+    db.session.commit()
+    _loaded = dict(digests)
+    return {"tables": changed_tables, "cells": changed_cells, **stats}
+
+
+def _validate_publish(params: dict) -> dict:
+    return {"full": bool(params.get("full", False))}
+
+
+@job_kind("publish_points_tables", _validate_publish)
+def run_publish(ctx: JobContext, params: dict) -> dict:
+    return publish_points_tables(params["full"], on_chunk=lambda rows: ctx.progress(rows, message=f"{rows} rows rescored", force=True))
+
+
+# ---------- Hot swap ----------
+_loaded = None  # published digests the tables of this process correspond to
+_checked_at = float("-inf")
+_queued_for = None  # disk digests a publish job was queued for
+
+
+def sync_points_tables(force: bool = False) -> None:
+    """Reload the tables if another process published new ones; queue a publish for unpublished files.
+
+    Without force at most once every POINTS_TABLES_CHECK_SECONDS.
+    """
+    global _loaded, _checked_at, _queued_for
+    now = time.monotonic()
+    due = now - _checked_at >= current_app.config["POINTS_TABLES_CHECK_SECONDS"]
+    if not (force or due):
+        return
+    try:
+        published = published_digests()
+    except SQLAlchemyError:
+        db.session.rollback()  # no points_table yet (init-db not run)
+        return
+    if _loaded is None:
+        _loaded = published  # loaded from disk at startup
+    elif published != _loaded:
+        _loaded = published
+        try:
+            reload_reference_tables()
+        except Exception:
+            current_app.logger.exception("reloading the points tables failed; keeping the loaded ones")
+    if not due:
+        return
+    _checked_at = now
+    if current_app.config["POINTS_TABLES_AUTO_PUBLISH"]:
+        digests = disk_digests()
+        if digests != published and digests != _queued_for:
+            submit_job("publish_points_tables")
+            _queued_for = digests
+
+
+def _sync_before_request():
+    if request.endpoint in (None, "static", "main.healthz"):
+        return
+    sync_points_tables(force=request.method not in ("GET", "HEAD", "OPTIONS"))
+
+
+# ---------- Routes / CLI ----------
+
+@points_tables_bp.route("/api/admin/points-tables", methods=["GET"])
+@login_required
+def points_tables_status():
+    published = {t.name: t for t in db.session.scalars(select(PointsTable))}
+    digests = disk_digests()
+    return jsonify({
+        "published": [
+            {"name": t.name, "digest": t.digest, "cells": len(json.loads(t.cells)), "published_at": t.published_at.isoformat()}
+            for t in sorted(published.values(), key=lambda t: t.name)
+        ],
+        "on_disk": digests,
+        "unpublished": sorted(n for n in digests.keys() | published.keys()
+                              if n not in published or digests.get(n) != published[n].digest),
+    })
+
+
+@points_tables_bp.route("/api/admin/points-tables/publish", methods=["POST"])
+@login_required
+def publish_points_tables_endpoint():
+    # Runs as a background job; poll /api/jobs/<id> for progress
+    try:
+        job, created = submit_job("publish_points_tables", {"full": request.args.get("full", "false").lower() == "true"})
+        return jsonify(job_dict(job)), 202 if created else 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+
+@points_tables_bp.cli.command("publish-points-tables")
+@click.option("--full", is_flag=True, help="Rescore every result, not only those in changed cells.")
+@click.option("--chunk-size", default=RECOMPUTE_CHUNK_SIZE, show_default=True)
+def publish_points_tables_command(full, chunk_size):
+    """Publish base_times.json and data/rudolph_points_<year>.csv after they changed."""
+    stats = publish_points_tables(full, chunk_size)
+    if not stats["tables"] and not full:
+        print("Points tables are already published")
+        return
+    if stats.get("baseline"):
+        print(f"Recorded {', '.join(stats['tables'])} as the baseline without rescoring; "
+              "run with --full if they changed since the results were scored")
+        return
+    print(f"Published {', '.join(stats['tables']) or 'unchanged tables'}: {stats['cells']} changed cells, "
+          f"{stats['rows']} results rescored ({stats['updated']} updated)")
+
+
+def init_app(app) -> None:
+    app.config.setdefault("POINTS_TABLES_CHECK_SECONDS", float(os.environ.get("POINTS_TABLES_CHECK_SECONDS", 5)))
+    app.config.setdefault("POINTS_TABLES_AUTO_PUBLISH",
+                          os.environ.get("POINTS_TABLES_AUTO_PUBLISH", "true").lower() == "true")
+    app.before_request(_sync_before_request)
+    app.register_blueprint(points_tables_bp)
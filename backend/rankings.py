@@ -0,0 +1,214 @@
+# backend/rankings.py
+# Materialized leaderboard: one row per athlete per (season, event, gender, pool_length,
+# age_group) partition holding their personal best and its rank within the partition.
+# Write paths call refresh_partitions() with the partitions they touched; nothing else
+# is recomputed. rebuild_rankings() recomputes every live season from Swimmers; rows of
+# archived seasons are frozen with them.
+from datetime import date
+import click
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select, delete, insert
+from .app import db, Athlete, Swimmers, YEAR, normalize_gender
+from .events import require_event_code
+from .cache import cached_response, bump_data_version
+from .database import read_replica
+from .scoring import rudolph_age, RUDOLPH_MAX_AGE
+from .seasons import archived_seasons
+
+rankings_bp = Blueprint("rankings", __name__, cli_group=None)
+
+
+class Leaderboard(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    season = db.Column(db.Integer, nullable=False)
+    event_code = db.Column(db.SmallInteger, nullable=False)
+    gender = db.Column(db.String(10), nullable=False)
+    pool_length = db.Column(db.Integer, nullable=False)
+    age_group = db.Column(db.Integer, nullable=False)
+    athlete_id = db.Column(db.Integer, db.ForeignKey("athlete.id"), nullable=False)
+    swimmer_id = db.Column(db.Integer, nullable=False)  # swimmers.id, or swimmers_archive.id once archived
+    result = db.Column(db.Float, nullable=False)
+    name_of_competition = db.Column(db.String(100), nullable=False)
+    date_of_competition = db.Column(db.Date, nullable=False)
+    fina_points = db.Column(db.Integer, nullable=True)
+    rudolph_points = db.Column(db.Integer, nullable=True)
+    rank = db.Column(db.Integer, nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("season", "event_code", "gender", "pool_length", "age_group", "athlete_id",
+                            name="uq_leaderboard_athlete"),
+        db.Index("ix_leaderboard_partition_rank", "season", "event_code", "gender", "pool_length", "age_group", "rank"),
+        db.Index("ix_leaderboard_event_result", "season", "event_code", "gender", "pool_length", "result"),
+    )
+
+
+_RESULT_COLUMNS = (
+    Swimmers.id, Swimmers.athlete_id, Swimmers.year_of_birth, Swimmers.result,
+    Swimmers.name_of_competition, Swimmers.date_of_competition,
+    Swimmers.fina_points, Swimmers.rudolph_points,
+)
+
+
+def partition_key(event_code: int, gender: str, pool_length: int, date_of_competition: date, year_of_birth: int) -> tuple:
+    season = date_of_competition.year
+    return (season, event_code, gender, pool_length, rudolph_age(season - year_of_birth))
+
+
+def _ranked(partition: tuple, rows) -> list:
+    """Personal best per athlete from result rows, ranked by time (ties share a rank)."""
+    season, event_code, gender, pool_length, age_group = partition
+    best = {}
+    for row in rows:
+        current = best.get(row.athlete_id)
+        if current is None or (row.result, row.id) < (current.result, current.id):
+            best[row.athlete_id] = row
+    ordered = sorted(best.values(), key=lambda r: (r.result, r.id))
+    entries, rank, previous = [], 0, None
+    for position, row in enumerate(ordered, start=1):
+        if row.result != previous:
+            rank, previous = position, row.result
+        entries.append(dict(
+            season=season, event_code=event_code, gender=gender, pool_length=pool_length, age_group=age_group,
+            athlete_id=row.athlete_id, swimmer_id=row.id,
+            result=row.result, name_of_competition=row.name_of_competition,
+            date_of_competition=row.date_of_competition,
+            fina_points=row.fina_points, rudolph_points=row.rudolph_points, rank=rank,
+        ))
+    return entries
+
+
+def refresh_partitions(partitions) -> None:
+    """Recompute the given partitions inside the caller's transaction (the caller commits)."""
+    conn = db.session.connection()
+    table = Leaderboard.__table__
+    for partition in set(partitions):
+        season, event_code, gender, pool_length, age_group = partition
+        stmt = select(*_RESULT_COLUMNS).where(
+            Swimmers.event_code == event_code,
+            Swimmers.gender == gender,
+            Swimmers.pool_length == pool_length,
+            Swimmers.date_of_competition >= date(season, 1, 1),
+            Swimmers.date_of_competition < date(season + 1, 1, 1),
+        )
+        if age_group == RUDOLPH_MAX_AGE:
+            stmt = stmt.where(Swimmers.year_of_birth <= season - RUDOLPH_MAX_AGE)
+        else:
+            stmt = stmt.where(Swimmers.year_of_birth == season - age_group)
+        entries = _ranked(partition, conn.execute(stmt))
+        conn.execute(delete(table).where(
+            table.c.season == season, table.c.event_code == event_code, table.c.gender == gender,
+            table.c.pool_length == pool_length, table.c.age_group == age_group,
+        ))
+        if entries:
+            conn.execute(insert(table), entries)
+
+
+def compute_all_rankings() -> list:
+    """Every leaderboard row, computed from scratch in one pass over Swimmers."""
+    partitions = {}
+    rows = db.session.connection().execution_options(yield_per=5000).execute(
+        select(*_RESULT_COLUMNS, Swimmers.event_code, Swimmers.gender, Swimmers.pool_length)
+    )
+    for row in rows:
+        key = partition_key(row.event_code, row.gender, row.pool_length, row.date_of_competition, row.year_of_birth)
+        partitions.setdefault(key, []).append(row)
+    entries = []
+    for key, part_rows in partitions.items():
+        entries.extend(_ranked(key, part_rows))
+    return entries
+
+
+def _live_rows():
+    return Leaderboard.__table__.c.season.notin_(sorted(archived_seasons()))
+
+
+def rebuild_rankings() -> int:
+    entries = compute_all_rankings()
+    conn = db.session.connection()
+    conn.execute(delete(Leaderboard.__table__).where(_live_rows()))
+    for start in range(0, len(entries), 5000):
+        conn.execute(insert(Leaderboard.__table__), entries[start:start + 5000])
+    bump_data_version()
+    db.session.commit()
+    return len(entries)
+
+
+def check_rankings() -> list:
+    """Differences between the materialized table and a fresh computation (empty when consistent)."""
+    def keyed(entries):
+        return {
+            (e["season"], e["event_code"], e["gender"], e["pool_length"], e["age_group"], e["athlete_id"]):
+            (e["swimmer_id"], e["result"], e["rank"], e["fina_points"], e["rudolph_points"])
+            for e in entries
+        }
+    expected = keyed(compute_all_rankings())
+    stored = keyed(r._asdict() for r in db.session.connection().execute(
+        select(*Leaderboard.__table__.c).where(_live_rows())
+    ))
+    problems = []
+    for key in expected.keys() | stored.keys():
+        if expected.get(key) != stored.get(key):
+            problems.append({"key": key, "expected": expected.get(key), "stored": stored.get(key)})
+    return problems
+
+
+@rankings_bp.cli.command("rebuild-rankings")
+@click.option("--check", is_flag=True, help="Only compare the leaderboard with a fresh computation.")
+def rebuild_rankings_command(check):
+    """Recompute the whole leaderboard table from Swimmers."""
+    if check:
+        problems = check_rankings()
+        for p in problems[:50]:
+            print(f"MISMATCH {p['key']}: stored={p['stored']} expected={p['expected']}")
+        print(f"{len(problems)} inconsistent leaderboard rows")
+        raise SystemExit(1 if problems else 0)
+    print(f"Rebuilt leaderboard: {rebuild_rankings()} rows")
+
+
+# ---------- Routes ----------
+RANKINGS_MAX_LIMIT = 200
+
+@rankings_bp.route("/api/rankings", methods=["GET"])
+@read_replica
+@cached_response(public=True)
+def list_rankings():
+    """Personal bests for one event/gender/pool, ranked within each age group.
+
+    Without age_group the whole season is returned ordered by time (rank stays per age group).
+    """
+    try:
+        event_code = require_event_code(request.args["event"])
+        gender = normalize_gender(request.args["gender"]) or request.args["gender"]
+        pool_length = int(request.args["pool_length"])
+        season = int(request.args.get("season", YEAR))
+        limit = min(int(request.args.get("limit", 50)), RANKINGS_MAX_LIMIT)
+        offset = int(request.args.get("offset", 0))
+        stmt = select(Leaderboard, Athlete).join(Athlete, Leaderboard.athlete_id == Athlete.id).where(
+            Leaderboard.season == season, Leaderboard.event_code == event_code,
+            Leaderboard.gender == gender, Leaderboard.pool_length == pool_length,
+        )
+        if request.args.get("age_group"):
+            stmt = stmt.where(Leaderboard.age_group == int(request.args["age_group"]))
+            stmt = stmt.order_by(Leaderboard.rank, Leaderboard.result, Leaderboard.id)
+        else:
+            stmt = stmt.order_by(Leaderboard.result, Leaderboard.id)
+        entries = db.session.execute(stmt.limit(limit).offset(offset)).all()
+        return jsonify([
+            {
+                "rank": e.rank,
+                "age_group": e.age_group,
+                "athlete_id": a.id,
+                "full_name": a.full_name,
+                "year_of_birth": a.year_of_birth,
+                "result": e.result,
+                "result_id": e.swimmer_id,
+                "name_of_competition": e.name_of_competition,
+                "date_of_competition": e.date_of_competition.isoformat(),
+                "fina_points": e.fina_points or 0,
+                "rudolph_points": e.rudolph_points or 0,
+            }
+            for e, a in entries
+        ])
+    except KeyError as e:
+        return jsonify({"error": f"missing parameter '{e.args[0]}'"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
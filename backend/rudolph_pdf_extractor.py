@@ -1,72 +1,143 @@
-from PyPDF2 import PdfReader
+import argparse
+import csv
+import os
 import re
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+PUNKTTABELLE_PATTERN = re.compile(
+    r"Punkttabelle\s+(?P<gender>\w+),\s+Altersklasse\s+(?P<age>\d+|offen)[\s\S]+?"
+    r"Pkt[\s\S]+?(?P<data>(?:\d+\s+[\d:.,\s]+)+)",
+    re.MULTILINE
+)
+
+def _records_from_match(match):
+    age_group = match.group("age")
+    if age_group == 'offen':
+        age_group = '19'
+    elif(int(age_group) > 18):
+        age_group = age_group[:-1]
+    gender = match.group("gender")
+    if gender == "männlich":
+        gender = "M"
+    else:
+        gender = "F"
+    results = match.group("data")
+
+
+    lines = results.strip().split("\n")
+    for line in lines:
+        events = []
+        elements = line.split()
+        points = elements[0]
+
+        if points == "50":
+            continue
+
+        freestyle = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200, 400, 800, 1500], elements[1:7])]
+        breaststroke = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[7:10])]
+        butterfly = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[10:13])]
+        backstroke = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[13:16])]
+        medley = [{"distance": dist, "time": time} for dist, time in zip([200, 400], elements[16:18])]
+
+        events.append({
+            "Freestyle": freestyle,
+            "Breaststroke": breaststroke,
+            "Butterfly": butterfly,
+            "Backstroke": backstroke,
+            "Medley": medley
+        })
+
+        yield {
+            "age": age_group,
+            "gender": gender,
+            "point": points,
+            "events": events
+        }
+
 def extract_rudolph_points_from_pdf(pdf_path):
+    from PyPDF2 import PdfReader
     data = []
 
     reader = PdfReader(pdf_path)
     text = "\n".join(page.extract_text() for page in reader.pages)
 
-    pattern = re.compile(
-        r"Punkttabelle\s+(?P<gender>\w+),\s+Altersklasse\s+(?P<age>\d+|offen)[\s\S]+?" 
-        r"Pkt[\s\S]+?(?P<data>(?:\d+\s+[\d:.,\s]+)+)", 
-        re.MULTILINE
-    )
-
-    for match in pattern.finditer(text):
-        age_group = match.group("age")
-        if age_group == 'offen':
-            age_group = '19'
-        elif(int(age_group) > 18):
-            age_group = age_group[:-1]
-        gender = match.group("gender")
-        if gender == "männlich":
-            gender = "M"
-        else:
-            gender = "F"
-        results = match.group("data")
-
-
-        lines = results.strip().split("\n")
-        for line in lines:
-            events = []
-            elements = line.split()
-            points = elements[0]
-            
-            if points == "50":
-                continue
-
-            freestyle = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200, 400, 800, 1500], elements[1:7])]
-            breaststroke = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[7:10])]
-            butterfly = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[10:13])]
-            backstroke = [{"distance": dist, "time": time} for dist, time in zip([50, 100, 200], elements[13:16])]
-            medley = [{"distance": dist, "time": time} for dist, time in zip([200, 400], elements[16:18])]
-
-            events.append({
-                "Freestyle": freestyle,
-                "Breaststroke": breaststroke,
-                "Butterfly": butterfly,
-                "Backstroke": backstroke,
-                "Medley": medley
-            })
-
-            data.append({
-                "age": age_group,
-                "gender": gender,
-                "point": points,
-                "events": events
-            })
+    for match in PUNKTTABELLE_PATTERN.finditer(text):
+        data.extend(_records_from_match(match))
 
     return data
-    
+
+# ---------- Page-parallel streaming extraction ----------
+_WORKER_READER = None
+
+def _init_page_worker(pdf_path):
+    global _WORKER_READER
+    from PyPDF2 import PdfReader
+    _WORKER_READER = PdfReader(pdf_path)
+
+def _extract_page_text(page_number):
+    return _WORKER_READER.pages[page_number].extract_text()
+
+def _iter_page_texts(pdf_path, workers):
+    from PyPDF2 import PdfReader
+    if workers <= 1:
+        for page in PdfReader(pdf_path).pages:
+            yield page.extract_text()
+        return
+    page_count = len(PdfReader(pdf_path).pages)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=(str(pdf_path),)) as pool:
+        # map() yields in page order as soon as each page (and all before it) is done
+        yield from pool.map(_extract_page_text, range(page_count))
+
+def iter_rudolph_points_from_pdf(pdf_path, workers=None, on_page=None):
+    """Yield the same records as extract_rudolph_points_from_pdf, parsing blocks as pages arrive.
+
+    Page text is extracted in a process pool. A "Punkttabelle" block is only parsed once it is
+    known to be complete: it matched and ended before the end of the text received so far
+    (a block that fails to match or runs to the end may still continue on the next page).
+    on_page(pages_done) is called as each page arrives.
+    """
+    workers = workers or os.cpu_count() or 1
+    text, pos = "", 0
+    for page_number, page_text in enumerate(_iter_page_texts(pdf_path, workers)):
+        if on_page is not None:
+            on_page(page_number + 1)
+        text = page_text if page_number == 0 else text + "\n" + page_text
+        while True:
+            start = text.find("Punkttabelle", pos)
+            if start < 0:
+                break
+            match = PUNKTTABELLE_PATTERN.match(text, start)
+            if match is None or match.end() >= len(text):
+                break
+            yield from _records_from_match(match)
+            pos = match.end()
+        # Drop what has been consumed so the buffer stays about one page long
+        text, pos = text[pos:], 0
+    for match in PUNKTTABELLE_PATTERN.finditer(text, pos):
+        yield from _records_from_match(match)
+
+RUDOLPH_CSV_FIELDS = ["age", "gender", "point", "events"]
+
+def write_rudolph_csv(records, path):
+    """Write extracted records in the layout of backend/data/rudolph_points_<year>.csv; returns the row count."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=RUDOLPH_CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract a Rudolph points table from docs/rudolph-<year>.pdf")
     # YEAR OF THE RUDOLPH PDF
-    year = 2025
+    parser.add_argument("year", nargs="?", type=int, default=2025)
+    parser.add_argument("--workers", type=int, default=None, help="page extraction processes (default: CPU count)")
+    args = parser.parse_args()
     ##############################################################
     PROJECT_ROOT = Path(__file__).resolve().parent.parent
     DOCS_DIR = PROJECT_ROOT / "docs"
-    data = pd.DataFrame(extract_rudolph_points_from_pdf(DOCS_DIR / f'rudolph-{year}.pdf'))
-    csv_path = f'data/rudolph_points_{year}.csv'
-    data.to_csv(csv_path, index=False)
\ No newline at end of file
+    csv_path = f'data/rudolph_points_{args.year}.csv'
+    write_rudolph_csv(iter_rudolph_points_from_pdf(DOCS_DIR / f'rudolph-{args.year}.pdf', args.workers), csv_path)
@@ -0,0 +1,192 @@
+# backend/scoring.py
+import ast
+import csv
+import math
+from bisect import bisect_left
+from pathlib import Path
+from .events import MAX_EVENT_CODE, code_for, event_code
+from .utils import time_to_seconds, times_to_seconds
+
+RUDOLPH_MAX_AGE = 19  # "offen" class; every age above 18 is scored against it
+
+
+def rudolph_age(age: int) -> int:
+    return RUDOLPH_MAX_AGE if age > 18 else age
+
+
+# ---------- FINA base times ----------
+# One tuple per (pool, gender) slot, indexed by event code; 0.0 where FINA has no base time
+
+def base_time_slot(gender: str, pool_length: int) -> int:
+    return (2 if pool_length == 50 else 0) + (1 if gender == "F" else 0)
+
+
+def compile_base_times(raw: dict) -> tuple:
+    """Turn base_times.json ({"fina_base_times_scm_male": {"50M Freestyle": 20.16, ...}, ...})
+    into base_time_slot-indexed tuples of per-code times."""
+    slots = []
+    for pool in ("scm", "lcm"):
+        for gender in ("male", "female"):
+            times = [0.0] * (MAX_EVENT_CODE + 1)
+            for name, seconds in raw.get(f"fina_base_times_{pool}_{gender}", {}).items():
+                code = event_code(name)
+                if code:
+                    times[code] = float(seconds)
+            slots.append(tuple(times))
+    return tuple(slots)
+
+
+# ---------- Compiled Rudolph index ----------
+# A flat list with one cell per (event code, gender, age), at rudolph_cell(...):
+#   cell = (thresholds, best) or None
+#   thresholds: threshold times in seconds, ascending
+#   best[i]:    highest point value whose threshold is >= thresholds[i]
+# A swimmer time t earns best[bisect_left(thresholds, t)], or 0 past the end.
+_N_AGES = RUDOLPH_MAX_AGE + 1
+RUDOLPH_CELLS = (MAX_EVENT_CODE + 1) * 2 * _N_AGES
+
+
+def rudolph_cell(code: int, gender: str, age: int) -> int:
+    return (code * 2 + (gender == "F")) * _N_AGES + rudolph_age(age)
+
+
+def rudolph_cell_key(cell: int) -> tuple:
+    """Inverse of rudolph_cell: (code, gender, age)."""
+    return cell // _N_AGES // 2, "FM"[cell // _N_AGES % 2 == 0], cell % _N_AGES
+
+
+def compile_rudolph_index(csv_path: Path) -> list:
+    entries, times = [], []  # (cell, point) per threshold time
+    with open(csv_path, "r", encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            try:
+                events = ast.literal_eval(row["events"])
+                age = int(row["age"])
+                point = int(row["point"])
+            except Exception:
+                continue
+            if not 0 <= age <= RUDOLPH_MAX_AGE or row["gender"] not in ("M", "F"):
+                continue
+            bucket = events[0] if events else {}
+            for stroke, results in bucket.items():
+                for result in results:
+                    code = code_for(result.get("distance"), stroke)
+                    if code:
+                        entries.append((rudolph_cell(code, row["gender"], age), point))
+                        times.append(result.get("time", "0"))
+    # Parse every threshold in one pass; a bad cell fails the whole table, as before
+    seconds, invalid = times_to_seconds(times)
+    if invalid:
+        time_to_seconds(times[invalid[0]])
+    cells = {}
+    for (cell, point), threshold in zip(entries, seconds.tolist()):
+        if not threshold:
+            continue
+        cells.setdefault(cell, []).append((threshold, point))
+    index = [None] * RUDOLPH_CELLS
+    for cell, pairs in cells.items():
+        pairs.sort()
+        thresholds = tuple(t for t, _ in pairs)
+        best = [0] * len(pairs)
+        running = 0
+        for i in range(len(pairs) - 1, -1, -1):
+            running = max(running, pairs[i][1])
+            best[i] = running
+        index[cell] = (thresholds, tuple(best))
+    return index
+
+
+def lookup_rudolph_points(index: list, code: int, gender: str, age: int, swimmer_seconds: float) -> int:
+    if not code or age < 0:
+        return 0
+    cell = index[rudolph_cell(code, gender, age)]
+    if cell is None:
+        return 0
+    thresholds, best = cell
+    i = bisect_left(thresholds, swimmer_seconds)
+    return best[i] if i < len(best) else 0
+
+
+# ---------- Reverse lookups ----------
+# A curve lists a cell's point levels, ascending, with the slowest time that still earns each
+# (best[] never increases along thresholds, so level L is earned up to the last threshold
+# whose best is >= L).
+
+def rudolph_curve(cell) -> tuple:
+    """(points, times) of a compiled index cell."""
+    thresholds, best = cell
+    points, times = [], []
+    for i in range(len(best) - 1, -1, -1):
+        if best[i] > (points[-1] if points else 0):
+            points.append(best[i])
+            times.append(thresholds[i])
+    return tuple(points), tuple(times)
+
+
+def compile_rudolph_curves(index: list) -> list:
+    """rudolph_curve of every cell, at the same positions as the index (None where it has none)."""
+    return [rudolph_curve(cell) if cell is not None else None for cell in index]
+
+
+def rudolph_time_for(curve, target: int):
+    """(points, time) of the lowest level worth at least target points; None if no level is."""
+    if curve is None:
+        return None
+    i = bisect_left(curve[0], target)
+    return (curve[0][i], curve[1][i]) if i < len(curve[0]) else None
+
+
+def _fina_points(base_time: float, seconds: float) -> int:
+    # int(calculate_fina_points(base_time, seconds)) for a positive time
+    return int(round(1000.0 * (base_time / seconds) ** 3, 2))
+
+
+def fina_time_for(base_time: float, target: int) -> float:
+    """Slowest time, in hundredths, that earns at least target FINA points."""
+    t = math.floor(base_time * (1000.0 / target) ** (1.0 / 3.0) * 100) / 100
+    while t > 0.01 and _fina_points(base_time, t) < target:
+        t = round(t - 0.01, 2)
+    while _fina_points(base_time, round(t + 0.01, 2)) >= target:
+        t = round(t + 0.01, 2)
+    return t
+
+
+# ---------- Vectorized scoring ----------
+
+def fina_points_array(base_times, seconds):
+    """Vectorized int(calculate_fina_points(base, t)); 0 where base or t is missing/non-positive."""
+    import numpy as np
+    base = np.asarray(base_times, dtype=float)
+    t = np.asarray(seconds, dtype=float)
+    ok = (base > 0) & (t > 0)
+    out = np.zeros(t.shape, dtype=np.int64)
+    pts = np.round(1000.0 * (base[ok] / t[ok]) ** 3, 2)
+    out[ok] = np.floor(pts).astype(np.int64)
+    return out
+
+
+def rudolph_points_array(index: list, codes, genders, ages, seconds):
+    """Vectorized lookup_rudolph_points over parallel arrays, one searchsorted per index cell."""
+    import numpy as np
+    t = np.asarray(seconds, dtype=float)
+    out = np.zeros(t.shape, dtype=np.int64)
+    if not len(t) or not index:
+        return out
+    codes = np.asarray(codes, dtype=np.int64)
+    ages = np.asarray(ages, dtype=np.int64)
+    female = np.asarray(genders, dtype=object) == "F"
+    cells = (codes * 2 + female) * _N_AGES + np.minimum(ages, RUDOLPH_MAX_AGE)
+    valid = np.flatnonzero((codes > 0) & (codes <= MAX_EVENT_CODE) & (ages >= 0))
+    order = valid[np.argsort(cells[valid], kind="stable")]
+    cells_sorted = cells[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(cells_sorted)) + 1, [len(cells_sorted)]))
+    for start, end in zip(starts[:-1], starts[1:]):
+        if start == end:
+            continue
+        cell = index[int(cells_sorted[start])]
+        if cell is None:
+            continue
+        rows = order[start:end]
+        best = np.append(np.asarray(cell[1], dtype=np.int64), 0)
+        out[rows] = best[np.searchsorted(cell[0], t[rows], side="left")]
+    return out
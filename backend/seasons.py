@@ -0,0 +1,248 @@
+# backend/seasons.py
+# Season-aware storage. Results of the live seasons sit in `swimmers`, which every write
+# path and index is tuned for. A past season is archived by moving its rows, ids unchanged,
+# into `swimmers_archive` (read-only: writes dated in it are rejected); its leaderboard
+# rows stay as they are. Reads cover the live table by default; ?seasons= selects one or
+# more seasons (or "all"), and for_seasons() then reads from the live table plus the
+# archived seasons asked for.
+from datetime import date, datetime, timezone
+import click
+from flask import Blueprint, g, jsonify
+from sqlalchemy import MetaData, select, insert, delete, func, extract, and_, or_, literal, union_all, inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.util import ClauseAdapter
+from .app import db, Athlete, Swimmers, YEAR, login_required
+from .cache import bump_data_version
+from .database import read_replica
+
+seasons_bp = Blueprint("seasons", __name__, cli_group=None)
+
+ALL_SEASONS = "all"
+# Seasons accepted in ?seasons= (up to YEAR + 1)
+FIRST_SEASON = 1900
+
+
+class SwimmersArchive(db.Model):
+    __tablename__ = "swimmers_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # the id it had in swimmers
+    season = db.Column(db.Integer, nullable=False)
+    athlete_id = db.Column(db.Integer, db.ForeignKey("athlete.id"), nullable=False)
+    year_of_birth = db.Column(db.Integer, nullable=False)
+    gender = db.Column(db.String(10), nullable=False)
+    event_code = db.Column(db.SmallInteger, nullable=False)
+    result = db.Column(db.Float, nullable=False)
+    name_of_competition = db.Column(db.String(100), nullable=False)
+    date_of_competition = db.Column(db.Date, nullable=False)
+    pool_length = db.Column(db.Integer, nullable=False)
+    place_taken = db.Column(db.Integer, nullable=False)
+    fina_points = db.Column(db.Integer, nullable=True)
+    rudolph_points = db.Column(db.Integer, nullable=True)
+    # Read-only, so only the read paths are indexed
+    __table_args__ = (
+        db.Index("ix_swimmers_archive_season_event", "season", "event_code", "gender", "pool_length", "result"),
+        db.Index("ix_swimmers_archive_athlete_event", "athlete_id", "event_code", "pool_length", "result"),
+    )
+
+
+class ArchivedSeason(db.Model):
+    season = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    results = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+def archived_seasons() -> frozenset:
+    """Archived seasons, read once per request (or app context)."""
+    if "archived_seasons" not in g:
+        g.archived_seasons = frozenset(db.session.scalars(select(ArchivedSeason.season)))
+    return g.archived_seasons
+
+
+def require_live_season(day: date) -> None:
+    if day.year in archived_seasons():
+        raise ValueError(f"Season {day.year} is archived and read-only")
+
+
+def parse_seasons(value: str):
+    """"2024", "2023,2025", "2022-2024" or "all" -> sorted tuple of seasons (or ALL_SEASONS)."""
+    value = value.strip().lower()
+    if value == ALL_SEASONS:
+        return ALL_SEASONS
+    seasons = set()
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        first, last = int(first), int(last or first)
+        # Checked before the range is built: "1-3000000" must not allocate millions of seasons
+        for season in (first, last):
+            if not FIRST_SEASON <= season <= YEAR + 1:
+                raise ValueError(f"season {season} is out of range ({FIRST_SEASON}-{YEAR + 1})")
+        seasons.update(range(first, last + 1))
+    if not seasons:
+        raise ValueError("seasons is empty")
+    return tuple(sorted(seasons))
+
+
+def season_condition(column, seasons: tuple):
+    """Date-range condition on column for the seasons (one range per run of consecutive years)."""
+    runs, start = [], seasons[0]
+    for previous, season in zip(seasons, seasons[1:] + (None,)):
+        if season != previous + 1:
+            runs.append(and_(column >= date(start, 1, 1), column < date(previous + 1, 1, 1)))
+            start = season
+    return runs[0] if len(runs) == 1 else or_(*runs)
+
+
+def results_source(seasons, flag: bool = False):
+    """swimmers plus the archived rows of the seasons (ALL_SEASONS: every archived row) as one subquery.
+
+    Columns are those of swimmers (and with flag=True an `archived` boolean).
+    """
+    live = Swimmers.__table__
+    archive = SwimmersArchive.__table__
+    live_part = select(*live.c, *([literal(False).label("archived")] if flag else []))
+    archive_part = select(*(archive.c[c.name] for c in live.c), *([literal(True).label("archived")] if flag else []))
+    if seasons != ALL_SEASONS:
+        archive_part = archive_part.where(archive.c.season.in_(seasons))
+    return union_all(live_part, archive_part).subquery("swimmers_all")
+
+
+def for_seasons(stmt, seasons):
+    """stmt re-targeted from swimmers to results_source() when the seasons include archived ones."""
+    if seasons is None:
+        return stmt
+    if seasons != ALL_SEASONS and not archived_seasons().intersection(seasons):
+        return stmt
+    return ClauseAdapter(results_source(seasons)).traverse(stmt)
+
+
+# ---------- Archiving ----------
+
+def migrate_swimmers_autoincrement() -> bool:
+    """SQLite: rebuild swimmers with AUTOINCREMENT (idempotent); True if the table was rebuilt.
+
+    Without it SQLite hands out max(id) + 1, which reuses the ids of archived (or deleted)
+    newest rows. The id counter starts above every live and archived id.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name != "sqlite":
+        return False
+    ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'swimmers'")).scalar()
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return False
+    # Same columns and constraints under a temporary name; the indexes are created by init_db
+    metadata = MetaData()
+    Athlete.__table__.to_metadata(metadata)
+    rebuilt = Swimmers.__table__.to_metadata(metadata, name="swimmers_rebuilt")
+    conn.execute(CreateTable(rebuilt))
+    columns = ", ".join(c.name for c in Swimmers.__table__.c)
+    conn.execute(text(f"INSERT INTO swimmers_rebuilt ({columns}) SELECT {columns} FROM swimmers"))
+    conn.execute(text("DROP TABLE swimmers"))
+    conn.execute(text("ALTER TABLE swimmers_rebuilt RENAME TO swimmers"))
+    top = max(
+        conn.execute(select(func.max(Swimmers.__table__.c.id))).scalar() or 0,
+        conn.execute(select(func.max(SwimmersArchive.__table__.c.id))).scalar() or 0,
+    )
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'swimmers'"))
+    conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('swimmers', :seq)"), {"seq": top})
+    db.session.commit()
+    return True
+
+
+def _drop_leaderboard_swimmer_fk() -> None:
+    # Older schemas tie leaderboard.swimmer_id to swimmers with ON DELETE CASCADE, which would
+    # wipe an archived season's rankings; the column may point into swimmers_archive now
+    conn = db.session.connection()
+    if conn.dialect.name == "sqlite":
+        return  # foreign keys are not enforced
+    for fk in inspect(conn).get_foreign_keys("leaderboard"):
+        if fk["referred_table"] == "swimmers" and fk.get("name"):
+            conn.execute(text(f'ALTER TABLE leaderboard DROP CONSTRAINT "{fk["name"]}"'))
+
+
+def archive_season(season: int) -> int:
+    """Move a past season's results into swimmers_archive; returns the number of rows moved."""
+    if season >= YEAR:
+        raise ValueError(f"Only seasons before the current one ({YEAR}) can be archived")
+    if season in archived_seasons():
+        raise ValueError(f"Season {season} is already archived")
+    live = Swimmers.__table__
+    in_season = season_condition(live.c.date_of_competition, (season,))
+    conn = db.session.connection()
+    if conn.execute(select(live.c.id).where(in_season).limit(1)).first() is None:
+        raise LookupError(f"No live results in season {season}")
+    _drop_leaderboard_swimmer_fk()
+    columns = [c.name for c in live.c]
+    moved = conn.execute(insert(SwimmersArchive.__table__).from_select(
+        columns + ["season"], select(*live.c, literal(season)).where(in_season),
+    )).rowcount
+    conn.execute(delete(live).where(in_season))
+    db.session.add(ArchivedSeason(season=season, results=moved, archived_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+    bump_data_version(rewrite=True)
+    db.session.commit()
+    g.pop("archived_seasons", None)
+    return moved
+
+
+def restore_season(season: int) -> int:
+    """Move an archived season back into the live table; returns the number of rows moved."""
+    if season not in archived_seasons():
+        raise ValueError(f"Season {season} is not archived")
+    archive = SwimmersArchive.__table__
+    conn = db.session.connection()
+    columns = [c.name for c in Swimmers.__table__.c]
+    moved = conn.execute(insert(Swimmers.__table__).from_select(
+        columns, select(*(archive.c[c] for c in columns)).where(archive.c.season == season),
+    )).rowcount
+    conn.execute(delete(archive).where(archive.c.season == season))
+    conn.execute(delete(ArchivedSeason.__table__).where(ArchivedSeason.season == season))
+    bump_data_version(rewrite=True)
+    db.session.commit()
+    g.pop("archived_seasons", None)
+    return moved
+
+
+def compact() -> None:
+    """Give the space freed by archiving back and refresh planner statistics."""
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("VACUUM")
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            conn.exec_driver_sql("VACUUM ANALYZE swimmers")
+            conn.exec_driver_sql("VACUUM ANALYZE swimmers_archive")
+
+
+def season_summary() -> list:
+    """Every season with results: whether it is live or archived, and its result count."""
+    live = Swimmers.__table__
+    year = extract("year", live.c.date_of_competition)
+    counts = {int(y): n for y, n in db.session.execute(select(year, func.count()).group_by(year))}
+    seasons = [{"season": y, "status": "live", "results": n} for y, n in counts.items()]
+    seasons += [
+        {"season": a.season, "status": "archived", "results": a.results, "archived_at": a.archived_at.isoformat()}
+        for a in db.session.scalars(select(ArchivedSeason))
+    ]
+    return sorted(seasons, key=lambda s: s["season"])
+
+
+@seasons_bp.cli.command("archive-season")
+@click.argument("season", type=int)
+@click.option("--restore", is_flag=True, help="Move an archived season back into the live table.")
+@click.option("--compact/--no-compact", "do_compact", default=True, show_default=True,
+              help="VACUUM/ANALYZE afterwards.")
+def archive_season_command(season, restore, do_compact):
+    """Archive a past season (read-only from then on), or --restore it. Run while no one is entering results."""
+    moved = restore_season(season) if restore else archive_season(season)
+    if do_compact:
+        compact()
+    print(f"{'Restored' if restore else 'Archived'} {moved} results of season {season}")
+
+
+@seasons_bp.route("/api/seasons", methods=["GET"])
+@login_required
+@read_replica
+def list_seasons():
+    return jsonify({"current": YEAR, "seasons": season_summary()})
+
+
+def init_app(app) -> None:
+    app.register_blueprint(seasons_bp)
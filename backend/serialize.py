@@ -0,0 +1,44 @@
+# backend/serialize.py
+# JSON encoding for streamed responses: orjson when it is installed, the standard library
+# otherwise. Both produce compact UTF-8 with dates as ISO strings.
+import json
+from datetime import date
+
+try:
+    import orjson
+except ImportError:  # optional; only speed differs
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def dumps(value) -> bytes:
+        return _encoder.encode(value).encode("utf-8")
+
+
+def ndjson_chunk(objects) -> bytes:
+    """One newline-terminated JSON document per object."""
+    return b"".join(dumps(o) + b"\n" for o in objects)
+
+
+def json_array_chunks(batches):
+    """Yield one JSON array across many batches of objects, a chunk per batch."""
+    yield b"["
+    first = True
+    for objects in batches:
+        if not objects:
+            continue
+        body = b",".join(dumps(o) for o in objects)
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
@@ -0,0 +1,484 @@
+# backend/stats.py
+# Aggregate statistics over a columnar snapshot of Swimmers: one NumPy array per column,
+# kept in memory by each worker and saved as an .npz file shared by every worker on the
+# host. The snapshot is labelled with the data version it reflects. While only inserts have
+# happened since (rewrite_version unchanged), refreshing reads just the rows past its last
+# id; updates, deletes and recomputes trigger a full rebuild. /api/stats/* then filter and
+# group with array operations, so analytics never scan the OLTP tables per request.
+# Archived seasons are part of the snapshot; like every read, stats cover them on request.
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import NamedTuple
+import click
+import numpy as np
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import select, func
+from .app import db, Athlete, login_required, result_filters
+from .cache import DataVersion, cached_response, shared_dir
+from .database import read_replica
+from .events import event_name
+from .scoring import RUDOLPH_MAX_AGE
+from .seasons import ALL_SEASONS, results_source
+
+stats_bp = Blueprint("stats", __name__, cli_group=None)
+
+SNAPSHOT_BATCH_SIZE = int(os.environ.get("SNAPSHOT_BATCH_SIZE", 20000))
+# Bumped when the snapshot columns change; older files are rebuilt
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_FILE = "swimmers.npz"
+
+
+def _snapshot_select(after_id: int):
+    rows = results_source(ALL_SEASONS, flag=True).c
+    return select(
+        rows.id, rows.athlete_id, rows.event_code, rows.gender, rows.pool_length,
+        rows.year_of_birth, rows.date_of_competition, rows.result,
+        func.coalesce(rows.fina_points, 0), func.coalesce(rows.rudolph_points, 0),
+        rows.place_taken, rows.name_of_competition, rows.archived,
+    ).where(rows.id > after_id).order_by(rows.id)
+
+_COLUMN_TYPES = {
+    "id": np.int64,
+    "athlete_id": np.int64,
+    "event_code": np.int16,
+    "female": np.bool_,
+    "pool_length": np.int16,
+    "year_of_birth": np.int16,
+    "date": "datetime64[D]",
+    "result": np.float64,
+    "fina_points": np.int32,
+    "rudolph_points": np.int32,
+    "place_taken": np.int32,
+    "competition": np.int32,  # index into Snapshot.competitions
+    "archived": np.bool_,
+}
+
+
+class Snapshot(NamedTuple):
+    columns: dict
+    competitions: np.ndarray
+    version: int
+    rewrite_version: int
+    max_id: int
+
+    @property
+    def rows(self) -> int:
+        return len(self.columns["id"])
+
+
+_lock = threading.Lock()
+_snapshot = None
+_last_refresh = {}
+
+
+# ---------- Building and refreshing ----------
+
+def _empty_columns() -> dict:
+    return {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMN_TYPES.items()}
+
+
+def _read_rows(after_id: int, competition_codes: dict) -> dict:
+    """Columns of every row with id > after_id; new competition names are added to competition_codes."""
+    parts = []
+    result = db.session.connection().execution_options(yield_per=SNAPSHOT_BATCH_SIZE).execute(_snapshot_select(after_id))
+    for batch in result.partitions():
+        ids, athletes, codes, genders, pools, births, dates, results, fina, rudolph, places, names, archived = zip(*batch)
+        parts.append({
+            "id": np.array(ids, dtype=np.int64),
+            "athlete_id": np.array(athletes, dtype=np.int64),
+            "event_code": np.array(codes, dtype=np.int16),
+            "female": np.array(genders) == "F",
+            "pool_length": np.array(pools, dtype=np.int16),
+            "year_of_birth": np.array(births, dtype=np.int16),
+            "date": np.array(dates, dtype="datetime64[D]"),
+            "result": np.array(results, dtype=np.float64),
+            "fina_points": np.array(fina, dtype=np.int32),
+            "rudolph_points": np.array(rudolph, dtype=np.int32),
+            "place_taken": np.array(places, dtype=np.int32),
+            "competition": np.fromiter(
+                (competition_codes.setdefault(n, len(competition_codes)) for n in names),
+                dtype=np.int32, count=len(names),
+            ),
+            "archived": np.array(archived, dtype=bool),
+        })
+    if not parts:
+        return _empty_columns()
+    return {name: np.concatenate([p[name] for p in parts]) for name in _COLUMN_TYPES}
+
+
+def _data_versions():
+    row = db.session.execute(
+        select(DataVersion.version, DataVersion.rewrite_version).where(DataVersion.id == 1)
+    ).first()
+    return (row.version, row.rewrite_version) if row is not None else (0, 0)
+
+
+def build_snapshot(version: int, rewrite_version: int) -> Snapshot:
+    codes = {}
+    columns = _read_rows(0, codes)
+    max_id = int(columns["id"][-1]) if len(columns["id"]) else 0
+    return Snapshot(columns, np.array(list(codes), dtype=str), version, rewrite_version, max_id)
+
+
+def extend_snapshot(snapshot: Snapshot, version: int) -> Snapshot:
+    """The snapshot plus the rows added after it; None if rows appeared below its last id.
+
+    That happens when transactions commit out of id order (server databases), so the
+    row count is compared with the table instead of trusting the ids alone.
+    """
+    codes = {name: i for i, name in enumerate(snapshot.competitions.tolist())}
+    added = _read_rows(snapshot.max_id, codes)
+    columns = {name: np.concatenate([snapshot.columns[name], added[name]]) for name in _COLUMN_TYPES}
+    if db.session.execute(select(func.count()).select_from(results_source(ALL_SEASONS))).scalar() != len(columns["id"]):
+        return None
+    max_id = int(added["id"][-1]) if len(added["id"]) else snapshot.max_id
+    return Snapshot(columns, np.array(list(codes), dtype=str), version, snapshot.rewrite_version, max_id)
+
+
+def _snapshot_path() -> Path:
+    return Path(current_app.config["SNAPSHOT_DIR"]) / SNAPSHOT_FILE
+
+
+def save_snapshot(snapshot: Snapshot, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    meta = np.array([SNAPSHOT_FORMAT, snapshot.version, snapshot.rewrite_version, snapshot.max_id], dtype=np.int64)
+    try:
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, meta=meta, competitions=snapshot.competitions, **snapshot.columns)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def load_snapshot(path: Path):
+    """The snapshot saved at path, or None if there is none in the current format."""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            fmt, version, rewrite_version, max_id = data["meta"].tolist()
+            if fmt != SNAPSHOT_FORMAT:
+                return None
+            columns = {name: data[name] for name in _COLUMN_TYPES}
+            return Snapshot(columns, data["competitions"], version, rewrite_version, max_id)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def refresh_snapshot(full: bool = False) -> Snapshot:
+    """The snapshot for the current data version, catching up from this worker's copy or the shared file."""
+    global _snapshot
+    with _lock:
+        version, rewrite_version = _data_versions()
+        snapshot = None if full else _snapshot
+        if snapshot is None or snapshot.version != version:
+            on_disk = None if full else load_snapshot(_snapshot_path())
+            if on_disk is not None and (snapshot is None or on_disk.version > snapshot.version):
+                snapshot = on_disk
+        if snapshot is not None and snapshot.version == version and snapshot.rewrite_version == rewrite_version:
+            _snapshot = snapshot
+            return snapshot
+        started = time.perf_counter()
+        mode = "append"
+        if snapshot is not None and snapshot.rewrite_version == rewrite_version and snapshot.version < version:
+            snapshot = extend_snapshot(snapshot, version)
+        else:
+            snapshot = None
+        if snapshot is None:
+            mode = "full"
+            snapshot = build_snapshot(version, rewrite_version)
+        save_snapshot(snapshot, _snapshot_path())
+        _last_refresh.update(
+            mode=mode, seconds=round(time.perf_counter() - started, 3),
+            at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        _snapshot = snapshot
+        return snapshot
+
+
+# ---------- Filtering and grouping ----------
+
+def _seasons(snapshot: Snapshot) -> np.ndarray:
+    return snapshot.columns["date"].astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+def _age_groups(snapshot: Snapshot) -> np.ndarray:
+    ages = _seasons(snapshot) - snapshot.columns["year_of_birth"]
+    return np.where(ages > 18, RUDOLPH_MAX_AGE, ages)
+
+
+# name -> (key column, key -> JSON value)
+GROUP_FIELDS = {
+    "event": (lambda s: s.columns["event_code"], event_name),
+    "gender": (lambda s: s.columns["female"], lambda v: "F" if v else "M"),
+    "pool_length": (lambda s: s.columns["pool_length"], int),
+    "competition": (lambda s: s.columns["competition"], None),  # decoded through s.competitions
+    "season": (_seasons, int),
+    "age_group": (_age_groups, int),
+    "year_of_birth": (lambda s: s.columns["year_of_birth"], int),
+    "athlete": (lambda s: s.columns["athlete_id"], int),
+}
+
+
+def filter_mask(snapshot: Snapshot, args) -> np.ndarray:
+    """Rows matching the /api/swimmers filters; live seasons unless seasons= asks for others."""
+    columns = snapshot.columns
+    filters = result_filters(args)
+    mask = np.ones(snapshot.rows, dtype=bool)
+    if "event_code" in filters:
+        mask &= columns["event_code"] == filters["event_code"]
+    if "gender" in filters:
+        mask &= columns["female"] == (filters["gender"] == "F")
+    if "pool_length" in filters:
+        mask &= columns["pool_length"] == filters["pool_length"]
+    if "competition" in filters:
+        codes = np.flatnonzero(snapshot.competitions == filters["competition"])
+        mask &= (columns["competition"] == codes[0]) if len(codes) else False
+    if "year_of_birth" in filters:
+        mask &= columns["year_of_birth"] == filters["year_of_birth"]
+    if "athlete_id" in filters:
+        mask &= columns["athlete_id"] == filters["athlete_id"]
+    if "date_from" in filters:
+        mask &= columns["date"] >= np.datetime64(filters["date_from"], "D")
+    if "date_to" in filters:
+        mask &= columns["date"] <= np.datetime64(filters["date_to"], "D")
+    seasons = filters.get("seasons")
+    if seasons is None:
+        mask &= ~columns["archived"]
+    elif seasons != ALL_SEASONS:
+        mask &= np.isin(_seasons(snapshot), seasons)
+    return mask
+
+
+def group_by_args(args, default: str) -> list:
+    fields = [f.strip() for f in args.get("group_by", default).split(",") if f.strip()]
+    unknown = [f for f in fields if f not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown group_by field(s): {', '.join(unknown)}; use {', '.join(GROUP_FIELDS)}")
+    return fields
+
+
+class Groups(NamedTuple):
+    order: np.ndarray  # sorts the selected rows by group (then by the sort values)
+    starts: np.ndarray  # first sorted position of each group
+    counts: np.ndarray
+    ids: np.ndarray  # group number of each sorted row
+    keys: list  # per group field, the key of each group
+
+
+def make_groups(keys: list, n: int, sort_values=None) -> Groups:
+    """Group n rows by the key arrays with one lexsort; rows within a group ordered by sort_values."""
+    sort_keys = ([sort_values] if sort_values is not None else []) + keys[::-1]
+    order = np.lexsort(sort_keys) if sort_keys else np.arange(n)
+    change = np.zeros(n, dtype=bool)
+    if n:
+        change[0] = True
+    sorted_keys = [k[order] for k in keys]
+    for k in sorted_keys:
+        change[1:] |= k[1:] != k[:-1]
+    starts = np.flatnonzero(change)
+    counts = np.diff(np.append(starts, n))
+    return Groups(order, starts, counts, np.cumsum(change) - 1, [k[starts] for k in sorted_keys])
+
+
+def group_quantiles(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Quantile (linear interpolation, as np.quantile) of each sorted run sorted_values[start:start+count]."""
+    if not len(sorted_values):
+        return np.zeros(len(starts))
+    position = starts + q * (np.maximum(counts, 1) - 1)
+    lower = np.minimum(np.floor(position).astype(np.int64), len(sorted_values) - 1)
+    upper = np.minimum(np.ceil(position).astype(np.int64), len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def group_distinct(values: np.ndarray, groups: Groups) -> np.ndarray:
+    """Number of distinct values (non-negative ints, in sorted row order) per group."""
+    if not len(values):
+        return np.zeros(len(groups.starts), dtype=np.int64)
+    span = int(values.max()) + 1
+    return np.bincount(np.unique(groups.ids * span + values) // span, minlength=len(groups.starts))
+
+
+def group_labels(snapshot: Snapshot, fields: list, groups: Groups) -> list:
+    labels = [{} for _ in range(len(groups.starts))]
+    for field, keys in zip(fields, groups.keys):
+        decode = GROUP_FIELDS[field][1]
+        values = snapshot.competitions[keys].tolist() if field == "competition" else [decode(k) for k in keys.tolist()]
+        for label, value in zip(labels, values):
+            label[field] = value
+    if "athlete" in fields and labels:
+        names = dict(db.session.execute(
+            select(Athlete.id, Athlete.full_name).where(Athlete.id.in_({label["athlete"] for label in labels}))
+        ).all())
+        for label in labels:
+            label["full_name"] = names.get(label["athlete"])
+    return labels
+
+
+def _selected(snapshot: Snapshot, fields: list, mask: np.ndarray) -> list:
+    return [GROUP_FIELDS[f][0](snapshot)[mask] for f in fields]
+
+
+# ---------- Routes ----------
+STATS_PERCENTILES = (10, 25, 50, 75, 90)
+STATS_MAX_GROUPS = 5000
+
+
+def _percentile_args(args) -> list:
+    if not args.get("percentiles"):
+        return list(STATS_PERCENTILES)
+    values = [float(p) for p in args["percentiles"].split(",")]
+    if any(not 0 <= p <= 100 for p in values):
+        raise ValueError("percentiles must be between 0 and 100")
+    return values
+
+
+def _limit_groups(rows: list, args) -> list:
+    limit = args.get("limit", type=int)
+    if "limit" in args and (limit is None or limit < 1):
+        raise ValueError("limit must be a positive integer")
+    return rows[:min(limit or STATS_MAX_GROUPS, STATS_MAX_GROUPS)]
+
+
+def _stats_errors(view):
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return decorated
+
+
+@stats_bp.route("/api/stats/results", methods=["GET"])
+@login_required
+@read_replica
+@cached_response()
+@_stats_errors
+def results_stats():
+    """Result counts, time percentiles and mean points per group (default: event, gender, pool)."""
+    fields = group_by_args(request.args, "event,gender,pool_length")
+    percentiles = _percentile_args(request.args)
+    snapshot = refresh_snapshot()
+    mask = filter_mask(snapshot, request.args)
+    columns = {name: snapshot.columns[name][mask] for name in ("result", "athlete_id", "fina_points", "rudolph_points")}
+    groups = make_groups(_selected(snapshot, fields, mask), len(columns["result"]), columns["result"])
+    n_groups = len(groups.starts)
+    times = columns["result"][groups.order]
+    athletes = group_distinct(columns["athlete_id"][groups.order], groups)
+    fina = np.bincount(groups.ids, weights=columns["fina_points"][groups.order], minlength=n_groups)
+    rudolph = np.bincount(groups.ids, weights=columns["rudolph_points"][groups.order], minlength=n_groups)
+    quantiles = {p: group_quantiles(times, groups.starts, groups.counts, p / 100) for p in percentiles}
+    rows = []
+    for i, label in enumerate(group_labels(snapshot, fields, groups)):
+        count = int(groups.counts[i])
+        rows.append({
+            **label,
+            "results": count,
+            "athletes": int(athletes[i]),
+            "best": float(times[groups.starts[i]]),
+            "percentiles": {f"p{p:g}": round(float(quantiles[p][i]), 2) for p in percentiles},
+            "mean_fina_points": round(float(fina[i]) / count, 1),
+            "mean_rudolph_points": round(float(rudolph[i]) / count, 2),
+        })
+    return jsonify(_limit_groups(rows, request.args))
+
+
+@stats_bp.route("/api/stats/points", methods=["GET"])
+@login_required
+@read_replica
+@cached_response()
+@_stats_errors
+def points_stats():
+    """Histogram of FINA or Rudolph points per group; unscored (0-point) results are counted apart."""
+    metric = request.args.get("metric", "fina")
+    if metric not in ("fina", "rudolph"):
+        raise ValueError("metric must be 'fina' or 'rudolph'")
+    width = int(request.args.get("width", 50 if metric == "fina" else 1))
+    if width < 1:
+        raise ValueError("width must be positive")
+    fields = group_by_args(request.args, "event")
+    snapshot = refresh_snapshot()
+    mask = filter_mask(snapshot, request.args)
+    points = snapshot.columns[f"{metric}_points"][mask]
+    groups = make_groups(_selected(snapshot, fields, mask), len(points), points)
+    points = points[groups.order]
+    scored = points > 0
+    n_groups = len(groups.starts)
+    unscored = np.bincount(groups.ids[~scored], minlength=n_groups)
+    bins = points[scored] // width
+    n_bins = int(bins.max()) + 1 if len(bins) else 0
+    histogram = np.bincount(groups.ids[scored] * n_bins + bins, minlength=n_groups * n_bins).reshape(n_groups, n_bins)
+    # Within each group the unscored zeros sort first; the scored run follows them
+    scored_counts = groups.counts - unscored
+    medians = group_quantiles(points, groups.starts + unscored, scored_counts, 0.5)
+    totals = np.bincount(groups.ids[scored], weights=points[scored], minlength=n_groups)
+    rows = []
+    for i, label in enumerate(group_labels(snapshot, fields, groups)):
+        count = int(scored_counts[i])
+        rows.append({
+            **label,
+            "scored": count,
+            "unscored": int(unscored[i]),
+            "mean": round(float(totals[i]) / count, 2) if count else None,
+            "median": float(medians[i]) if count else None,
+            "width": width,
+            "histogram": histogram[i].tolist(),  # counts of [k*width, (k+1)*width)
+        })
+    return jsonify(_limit_groups(rows, request.args))
+
+
+@stats_bp.route("/api/stats/medals", methods=["GET"])
+@login_required
+@read_replica
+@cached_response()
+@_stats_errors
+def medal_stats():
+    """Gold/silver/bronze tallies (place_taken 1-3) per group, best first (default: per competition)."""
+    fields = group_by_args(request.args, "competition")
+    snapshot = refresh_snapshot()
+    places = snapshot.columns["place_taken"]
+    mask = filter_mask(snapshot, request.args) & (places >= 1) & (places <= 3)
+    groups = make_groups(_selected(snapshot, fields, mask), int(mask.sum()))
+    tally = np.bincount(
+        groups.ids * 3 + places[mask][groups.order] - 1, minlength=len(groups.starts) * 3,
+    ).reshape(-1, 3)
+    labels = group_labels(snapshot, fields, groups)
+    ranked = np.lexsort((-tally[:, 2], -tally[:, 1], -tally[:, 0]))
+    rows = [
+        {**labels[i], "gold": int(tally[i, 0]), "silver": int(tally[i, 1]), "bronze": int(tally[i, 2]),
+         "total": int(tally[i].sum())}
+        for i in ranked
+    ]
+    return jsonify(_limit_groups(rows, request.args))
+
+
+@stats_bp.route("/api/stats/snapshot", methods=["GET"])
+@login_required
+@read_replica
+def snapshot_info():
+    snapshot = refresh_snapshot()
+    return jsonify({
+        "rows": snapshot.rows,
+        "competitions": len(snapshot.competitions),
+        "data_version": snapshot.version,
+        "max_id": snapshot.max_id,
+        "last_refresh": dict(_last_refresh) or None,  # this worker's last catch-up
+    })
+
+
+@stats_bp.cli.command("stats-snapshot")
+@click.option("--full", is_flag=True, help="Rebuild from scratch instead of catching up.")
+def stats_snapshot_command(full):
+    """Bring the /api/stats snapshot up to date."""
+    snapshot = refresh_snapshot(full=full)
+    print(f"Snapshot of {snapshot.rows} rows at data version {snapshot.version}: {dict(_last_refresh) or 'up to date'}")
+
+
+def init_app(app) -> None:
+    app.config.setdefault("SNAPSHOT_DIR", os.environ.get("SNAPSHOT_DIR") or str(shared_dir(app, "swimming-stats")))
+    app.register_blueprint(stats_bp)
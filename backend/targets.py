@@ -0,0 +1,222 @@
+# backend/targets.py
+# Reverse scoring for planning: the Rudolph point curve of an (event, gender, age) cell, the
+# time needed for a Rudolph level or a FINA score, and next-level targets for a whole squad
+# in one call. Everything is answered from the loaded tables (per-cell curves precomputed
+# with the Rudolph index, FINA base times solved in closed form); only the batch form reads
+# the database, for birth years and personal bests.
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select, func
+from .app import (
+    db, Athlete, Swimmers, YEAR, login_required, normalize_gender, get_base_time, rudolph_curves_for,
+    calculate_rudolph_points, calculate_fina_points,
+)
+from .cache import cached_response
+from .database import read_replica
+from .events import require_event_code, event_name
+from .scoring import rudolph_age, rudolph_cell, rudolph_time_for, fina_time_for
+from .seasons import season_condition, for_seasons
+from .utils import time_to_seconds
+
+targets_bp = Blueprint("targets", __name__, cli_group=None)
+
+TARGETS_MAX_BATCH = 1000
+FINA_CURVE_MAX = 1000
+
+
+def _gender(value) -> str:
+    gender = normalize_gender(value)
+    if not gender:
+        raise ValueError(f"Unknown gender: {value}")
+    return gender
+
+
+def _cell_args(args) -> dict:
+    event_code = require_event_code(args["event"])
+    gender = _gender(args["gender"])
+    season = int(args.get("season", YEAR))
+    age = int(args["age"]) if args.get("age") not in (None, "") else season - int(args["year_of_birth"])
+    if age < 0:
+        raise ValueError("age must not be negative")
+    pool_length = int(args["pool_length"]) if args.get("pool_length") not in (None, "") else None
+    return {"event_code": event_code, "gender": gender, "season": season, "age": age, "pool_length": pool_length}
+
+
+def _rudolph_curve(cell: dict) -> tuple:
+    year, curves = rudolph_curves_for(cell["season"])
+    return year, curves[rudolph_cell(cell["event_code"], cell["gender"], cell["age"])] if curves else None
+
+
+def _cell_dict(cell: dict, table_year) -> dict:
+    return {
+        "event": event_name(cell["event_code"]), "gender": cell["gender"], "season": cell["season"],
+        "age_group": rudolph_age(cell["age"]), "pool_length": cell["pool_length"], "rudolph_table": table_year,
+    }
+
+
+def _target(points_time) -> dict:
+    return {"points": points_time[0], "time": points_time[1]} if points_time is not None else None
+
+
+@targets_bp.route("/api/points/curve", methods=["GET"])
+@read_replica
+@cached_response(public=True)
+def points_curve():
+    """Every Rudolph level of a cell with the slowest time that earns it; with pool_length also the
+    time for every fina_step (default 100) FINA points up to 1000."""
+    try:
+        cell = _cell_args(request.args)
+        table_year, curve = _rudolph_curve(cell)
+        body = _cell_dict(cell, table_year)
+        body["rudolph"] = [{"points": p, "time": t} for p, t in zip(*curve)] if curve else []
+        if cell["pool_length"] is not None:
+            base_time = get_base_time(cell["event_code"], cell["gender"], cell["pool_length"])
+            step = int(request.args.get("fina_step", 100))
+            if step < 1:
+                raise ValueError("fina_step must be positive")
+            body["fina_base_time"] = base_time
+            body["fina"] = [
+                {"points": p, "time": fina_time_for(base_time, p)} for p in range(step, FINA_CURVE_MAX + 1, step)
+            ] if base_time else []
+        return jsonify(body)
+    except KeyError as e:
+        return jsonify({"error": f"missing parameter '{e.args[0]}'"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@targets_bp.route("/api/points/target", methods=["GET"])
+@read_replica
+@cached_response(public=True)
+def points_target():
+    """Time needed for ?rudolph=N points (the lowest level worth at least N) and/or ?fina=N points (needs pool_length)."""
+    try:
+        cell = _cell_args(request.args)
+        if not request.args.get("rudolph") and not request.args.get("fina"):
+            raise ValueError("give a rudolph and/or fina target")
+        table_year, curve = _rudolph_curve(cell)
+        body = _cell_dict(cell, table_year)
+        if request.args.get("rudolph"):
+            target = int(request.args["rudolph"])
+            body["rudolph"] = {"target": target, **(_target(rudolph_time_for(curve, target)) or {"points": None, "time": None})}
+        if request.args.get("fina"):
+            target = int(request.args["fina"])
+            if target < 1:
+                raise ValueError("fina must be positive")
+            if cell["pool_length"] is None:
+                raise KeyError("pool_length")
+            base_time = get_base_time(cell["event_code"], cell["gender"], cell["pool_length"])
+            body["fina"] = {"target": target, "time": fina_time_for(base_time, target) if base_time else None}
+        return jsonify(body)
+    except KeyError as e:
+        return jsonify({"error": f"missing parameter '{e.args[0]}'"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# ---------- Batch ----------
+
+def _personal_bests(keys: set, season: int) -> dict:
+    """{(athlete_id, event_code, pool_length): best result} in a season, for the keys asked for."""
+    if not keys:
+        return {}
+    stmt = (
+        select(Swimmers.athlete_id, Swimmers.event_code, Swimmers.pool_length, func.min(Swimmers.result))
+        .where(
+            Swimmers.athlete_id.in_(sorted({k[0] for k in keys})),
+            Swimmers.event_code.in_(sorted({k[1] for k in keys})),
+            season_condition(Swimmers.date_of_competition, (season,)),
+        )
+        .group_by(Swimmers.athlete_id, Swimmers.event_code, Swimmers.pool_length)
+    )
+    return {(a, e, p): best for a, e, p, best in db.session.execute(for_seasons(stmt, (season,))) if (a, e, p) in keys}
+
+
+def _next_targets(item: dict, athletes: dict, bests: dict, season: int, fina_step: int) -> dict:
+    out = {k: item[k] for k in ("ref", "athlete_id", "event", "pool_length") if k in item}
+    try:
+        event_code = require_event_code(item["event"])
+        pool_length = int(item["pool_length"])
+        if item.get("athlete_id") is not None:
+            athlete = athletes.get(int(item["athlete_id"]))
+            if athlete is None:
+                raise LookupError(f"Athlete {item['athlete_id']} not found")
+            gender, year_of_birth = athlete
+        else:
+            gender = _gender(item["gender"])
+            year_of_birth = int(item["year_of_birth"])
+        age = season - year_of_birth
+        if item.get("result") not in (None, ""):
+            result = time_to_seconds(item["result"])
+        else:
+            result = bests.get((int(item.get("athlete_id") or 0), event_code, pool_length))
+            if result is None:
+                raise LookupError(f"No {season} result in {event_name(event_code)} ({pool_length}m)")
+        if age < 0:
+            raise ValueError("age must not be negative")
+        # Current points exactly as a stored result would get them
+        rudolph = calculate_rudolph_points(event_code, gender, age, result, season)
+        base_time = get_base_time(event_code, gender, pool_length)
+        fina = int(calculate_fina_points(base_time, result)) if base_time else 0
+        table_year, curves = rudolph_curves_for(season)
+        next_rudolph = rudolph_time_for(curves[rudolph_cell(event_code, gender, age)], rudolph + 1) if curves else None
+        out.update(
+            event=event_name(event_code), gender=gender, age_group=rudolph_age(age), result=result,
+            rudolph_points=rudolph, fina_points=fina, rudolph_table=table_year, next_rudolph=None, next_fina=None,
+        )
+        if next_rudolph is not None:
+            points, time = next_rudolph
+            out["next_rudolph"] = {"points": points, "time": time, "gap": round(result - time, 2)}
+        if base_time:
+            points = (fina // fina_step + 1) * fina_step
+            time = fina_time_for(base_time, points)
+            out["next_fina"] = {"points": points, "time": time, "gap": round(result - time, 2)}
+    except KeyError as e:
+        out["error"] = f"missing field '{e.args[0]}'"
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+@targets_bp.route("/api/points/targets", methods=["POST"])
+@login_required
+@read_replica
+def points_targets():
+    """Next Rudolph level and next FINA step (fina_step, default 50) for a list of swimmers.
+
+    Body: {"season": 2025, "fina_step": 50, "swimmers": [{"athlete_id": 12, "event": "100M Freestyle",
+    "pool_length": 25}, {"gender": "F", "year_of_birth": 2011, "event": "...", "pool_length": 50,
+    "result": "1:05,30"}, ...]}. Without a result the athlete's best of the season is used. Items
+    that cannot be answered carry an "error" instead of failing the batch.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        season = int(data.get("season", YEAR))
+        fina_step = int(data.get("fina_step", 50))
+        items = data.get("swimmers")
+        if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+            raise ValueError("swimmers must be a list of objects")
+        if len(items) > TARGETS_MAX_BATCH:
+            raise ValueError(f"at most {TARGETS_MAX_BATCH} swimmers per request")
+        if fina_step < 1:
+            raise ValueError("fina_step must be positive")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    athlete_ids = set()
+    for item in items:
+        try:
+            athlete_ids.add(int(item["athlete_id"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+    athletes = {
+        a.id: (a.gender, a.year_of_birth)
+        for a in db.session.execute(select(Athlete.id, Athlete.gender, Athlete.year_of_birth).where(Athlete.id.in_(sorted(athlete_ids))))
+    } if athlete_ids else {}
+    wanted = set()
+    for item in items:
+        if item.get("result") in (None, "") and item.get("athlete_id") is not None:
+            try:
+                wanted.add((int(item["athlete_id"]), require_event_code(item["event"]), int(item["pool_length"])))
+            except Exception:
+                pass  # reported per item
+    bests = _personal_bests(wanted, season)
+    return jsonify({"season": season, "swimmers": [_next_targets(i, athletes, bests, season, fina_step) for i in items]})
@@ -27,4 +27,167 @@ def time_to_seconds(time_str):
     seconds = int(seconds_str)
     digits = ''.join(ch for ch in frac_str if ch.isdigit()) or '0'
     frac = int(digits) / (10 ** len(digits))
-    return minutes * 60 + seconds + frac
\ No newline at end of file
+    return minutes * 60 + seconds + frac
+
+# ---------- Array versions ----------
+# Element-for-element identical to time_to_seconds / export.seconds_to_time. Strings in the
+# common "ss,cc" / "mm:ss,cc" shapes are parsed with NumPy on the code points; anything else
+# (signs, exponents, non-ASCII digits, ...) goes through the scalar function. NumPy string
+# arrays cannot hold trailing NUL characters, so those are ignored.
+
+_PARSE_BATCH = 65536
+_MAX_FAST_DIGITS = 14  # keeps every intermediate integer exactly representable as a float
+
+
+def _as_array(values):
+    """(ndarray, pandas index or None) for a list/tuple/ndarray/Series."""
+    import numpy as np
+    if hasattr(values, "iloc"):  # pandas Series
+        return values.to_numpy(), values.index
+    if isinstance(values, np.ndarray):
+        return values, None
+    # Plain sequences stay object arrays so every element is seen exactly as the scalar sees it
+    values = list(values)
+    return np.fromiter(values, dtype=object, count=len(values)), None
+
+
+def _with_index(out, invalid, index):
+    if index is None:
+        return out, invalid
+    import pandas as pd
+    return pd.Series(out, index=index), index[invalid].tolist()
+
+
+def _parse_clock_batch(strings):
+    """Fast-path parse of a 1-D unicode array; returns (seconds, ok) with ok False where unsupported."""
+    import numpy as np
+    n = len(strings)
+    width = strings.dtype.itemsize // 4
+    if width == 0:
+        return np.full(n, np.nan), np.zeros(n, dtype=bool)
+    chars = np.ascontiguousarray(strings).view(np.uint32).reshape(n, width).astype(np.int64)
+    pos = np.arange(width)
+    is_digit = (chars >= 48) & (chars <= 57)
+    is_colon = chars == 58
+    is_sep = (chars == 44) | (chars == 46)
+    length = np.count_nonzero(chars, axis=1)
+    inside = pos < length[:, None]
+    has_colon = is_colon.any(axis=1)
+    has_sep = is_sep.any(axis=1)
+    colon_at = np.where(has_colon, is_colon.argmax(axis=1), -1)
+    sep_at = np.where(has_sep, is_sep.argmax(axis=1), length)
+    ok = (
+        ((chars != 0) == inside).all(axis=1)  # no embedded NULs
+        & (length > 0)
+        & ((is_digit | is_colon | is_sep) == inside).all(axis=1)
+        & (is_colon.sum(axis=1) <= 1)
+        & (is_sep.sum(axis=1) <= 1)
+        & (colon_at != 0)  # minutes present
+        & (sep_at - colon_at > 1)  # seconds present (and the colon comes first)
+        & (~has_sep | (length - sep_at > 1))  # fraction present after a separator
+        & (is_digit.sum(axis=1) <= _MAX_FAST_DIGITS)
+    )
+    digits = np.where(is_digit & ok[:, None], chars - 48, 0)
+    pow10 = 10 ** np.arange(width, dtype=np.int64)
+
+    def segment(start, end):
+        # Integer value of the digits in [start, end) of every row
+        mask = (pos >= start[:, None]) & (pos < end[:, None])
+        exponent = np.clip(end[:, None] - 1 - pos, 0, width - 1)
+        return (digits * pow10[exponent] * mask).sum(axis=1)
+
+    minutes = segment(np.zeros(n, dtype=np.int64), np.maximum(colon_at, 0))
+    seconds = segment(colon_at + 1, sep_at)
+    frac_len = np.where(has_sep, length - sep_at - 1, 0)
+    frac = segment(sep_at + 1, length)
+    scale = 10.0 ** frac_len
+    out = np.where(
+        has_colon,
+        # time_to_seconds: minutes * 60 + seconds + int(digits) / 10 ** len(digits)
+        (minutes * 60 + seconds).astype(float) + frac / scale,
+        # float("ss.cc") is the correctly rounded value of sscc / 10 ** len(cc)
+        (seconds * pow10[frac_len] + frac) / scale,
+    )
+    return out, ok
+
+
+def times_to_seconds(values):
+    """Vectorized time_to_seconds over a sequence, NumPy array or pandas Series.
+
+    Returns (seconds, invalid): float seconds (NaN where invalid; a Series with the same index
+    for Series input) and the indices (Series labels) of entries time_to_seconds rejects.
+    """
+    import numpy as np
+    arr, index = _as_array(values)
+    arr = arr.ravel()
+    n = len(arr)
+    if arr.dtype.kind in "iu" or arr.dtype == np.float64:
+        return _with_index(arr.astype(float), [], index)  # float(str(x)) == x for these
+    if arr.dtype.kind == "U":
+        strings = arr
+    elif arr.dtype == object:
+        strings = np.array([str(v) for v in arr.tolist()], dtype=str)
+    else:
+        strings = arr.astype(str)
+    out = np.empty(n, dtype=float)
+    ok = np.empty(n, dtype=bool)
+    for start in range(0, n, _PARSE_BATCH):
+        stripped = np.char.strip(strings[start:start + _PARSE_BATCH])
+        out[start:start + _PARSE_BATCH], ok[start:start + _PARSE_BATCH] = _parse_clock_batch(stripped)
+    invalid = []
+    for i in np.flatnonzero(~ok).tolist():
+        try:
+            out[i] = time_to_seconds(arr[i])
+        except Exception:
+            out[i] = np.nan
+            invalid.append(i)
+    return _with_index(out, invalid, index)
+
+
+def seconds_to_times(values):
+    """Vectorized export.seconds_to_time: "mm:ss,cc" strings for an array of seconds.
+
+    Returns (times, invalid) like times_to_seconds; invalid entries (not numbers, NaN,
+    infinite) are empty strings.
+    """
+    import numpy as np
+    from .export import seconds_to_time
+    arr, index = _as_array(values)
+    arr = arr.ravel()
+    n = len(arr)
+    invalid = []
+    if arr.dtype.kind in "iuf":
+        x = arr.astype(float)
+    else:
+        x = np.empty(n, dtype=float)
+        for i, v in enumerate(arr.tolist()):
+            try:
+                x[i] = float(v)
+            except (TypeError, ValueError):
+                x[i] = np.nan
+                invalid.append(i)
+    safe = np.where(np.isfinite(x), x, 0.0)
+    minutes = np.floor_divide(safe, 60)
+    seconds = np.mod(safe, 60).astype(np.int64)
+    hundredths = (np.mod(safe, 1) * 100).astype(np.int64)
+    # Two digits per field covers everything below 100 minutes; the rest goes through the scalar
+    fast = np.isfinite(x) & (minutes >= 0) & (minutes < 100) & (hundredths < 100)
+    minutes = np.where(fast, minutes, 0).astype(np.int64)
+    buf = np.empty((n, 8), dtype=np.uint8)
+    for col, field in ((0, minutes), (3, seconds), (6, hundredths)):
+        buf[:, col] = 48 + field // 10
+        buf[:, col + 1] = 48 + field % 10
+    buf[:, 2] = ord(":")
+    buf[:, 5] = ord(",")
+    out = buf.view("S8").ravel().astype("U8").astype(object)
+    bad = set(invalid)
+    for i in np.flatnonzero(~fast).tolist():
+        if i in bad:
+            out[i] = ""
+            continue
+        try:
+            out[i] = seconds_to_time(x[i])
+        except (ValueError, OverflowError):
+            out[i] = ""
+            invalid.append(i)
+    return _with_index(out, sorted(invalid), index)
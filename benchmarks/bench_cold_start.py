@@ -0,0 +1,110 @@
+"""Cold-start cost: import, create_app(), reference tables and the first request, in fresh processes.
+
+    python benchmarks/bench_cold_start.py [--repeat 5] [--gunicorn]
+
+Each sample runs in a new interpreter against a throwaway SQLite database, so nothing is
+warm except the OS page cache. --gunicorn also times `gunicorn` (gunicorn.conf.py, preload)
+from launch until /healthz answers, which is what a spun-down free-tier instance pays.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import backend.app as A
+t1 = time.perf_counter()
+app = A.create_app()
+t2 = time.perf_counter()
+with app.app_context():
+    A.init_db()
+preload = sys.argv[1] == "preload"
+t3 = time.perf_counter()
+if preload:
+    A.load_reference_tables()
+t4 = time.perf_counter()
+client = app.test_client()
+client.post("/login", data={"username": A.ADMIN_USERNAME, "password": A.ADMIN_PASSWORD})
+t5 = time.perf_counter()
+r = client.post("/api/data", data={
+    "full_name": "Cold Start", "year_of_birth": 2010, "gender": "M", "event": "50M Freestyle",
+    "result": "30,50", "name_of_competition": "Bench", "date_of_competition": "2025-03-01",
+    "pool_length": 25, "place_taken": 1,
+})
+t6 = time.perf_counter()
+assert r.status_code == 201, r.get_data(as_text=True)
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "reference_tables_ms": (t4 - t3) * 1000,
+    "first_post_ms": (t6 - t5) * 1000,
+    "heavy_modules_after_first_post": sorted(m for m in ("pandas", "openpyxl", "PyPDF2") if m in sys.modules),
+}))
+"""
+
+
+def probe(mode: str) -> dict:
+    workdir = tempfile.mkdtemp(prefix="swimming-cold-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(workdir) / 'cold.db'}", PYTHONPATH=str(PROJECT_ROOT))
+    out = subprocess.run([sys.executable, "-c", _PROBE, mode], env=env, cwd=workdir,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def gunicorn_boot() -> float:
+    """Seconds from launching gunicorn until /healthz answers 200."""
+    workdir = tempfile.mkdtemp(prefix="swimming-cold-")
+    db_url = f"sqlite:///{Path(workdir) / 'cold.db'}"
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, DATABASE_URL=db_url, PORT=str(port))
+    subprocess.run([sys.executable, "-m", "flask", "--app", "backend.app", "init-db"],
+                   env=env, cwd=PROJECT_ROOT, capture_output=True, check=True)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"],
+                              env=env, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < 60:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError("gunicorn did not become healthy within 60s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gunicorn", action="store_true", help="also time gunicorn launch to first /healthz")
+    args = parser.parse_args()
+
+    for mode in ("lazy", "preload"):
+        samples = [probe(mode) for _ in range(args.repeat)]
+        print(f"{mode} (median of {args.repeat}):")
+        for key in ("import_ms", "create_app_ms", "reference_tables_ms", "first_post_ms"):
+            print(f"  {key:<22}{statistics.median(s[key] for s in samples):>9.1f}")
+        print(f"  heavy modules loaded: {', '.join(samples[-1]['heavy_modules_after_first_post']) or 'none'}")
+    if args.gunicorn:
+        boots = [gunicorn_boot() for _ in range(args.repeat)]
+        print(f"gunicorn launch -> /healthz: median {statistics.median(boots) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Throughput of the database engine configurations under concurrent reads and writes.
+
+    python benchmarks/bench_db_engine.py [--rows 20000] [--seconds 15] [--clients 8]
+        [--postgres-url postgresql://...] [--replica-url postgresql://...]
+
+Each configuration gets a fresh database, served by `gunicorn` (gunicorn.conf.py, 2 workers).
+Client threads each log in and loop over a write-heavy mix: POST /api/data, GET /api/swimmers
+and GET /api/rankings. Per-route requests/sec, latency percentiles and errors are reported;
+"database is locked" failures show up as errors.
+
+Configurations: sqlite-rollback (SQLite defaults: rollback journal, synchronous=FULL, 2 MB
+cache), sqlite-wal (the app defaults), and with --postgres-url also postgres, plus
+postgres-replica when --replica-url is given (list and rankings reads go to the replica).
+The Postgres database must be a scratch one: its tables are created and filled.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+SQLITE_ROLLBACK = {"SQLITE_JOURNAL_MODE": "default", "SQLITE_SYNCHRONOUS": "default", "SQLITE_CACHE_SIZE_KB": "2000"}
+
+_POPULATE = r"""
+import sys
+import backend.app as A
+from benchmarks.datagen import populate
+app = A.create_app()
+with app.app_context():
+    A.init_db()
+    if not A.db.session.query(A.Swimmers.id).limit(1).first():
+        populate(A, int(sys.argv[1]), seed=7)
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _client(base: str):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    opener.open(base + "/login", urllib.parse.urlencode({"username": "admin", "password": "admin2025"}).encode())
+    return opener
+
+
+def _worker(base: str, payloads: list, deadline: float, rng: random.Random, samples: dict, lock):
+    opener = _client(base)
+    local = {}
+    while time.perf_counter() < deadline:
+        pick = rng.random()
+        if pick < 0.4:
+            route, req = "POST /api/data", urllib.request.Request(
+                base + "/api/data", urllib.parse.urlencode(rng.choice(payloads)).encode())
+        elif pick < 0.8:
+            route, req = "GET /api/swimmers", base + f"/api/swimmers?limit=50&after_id={rng.randint(50, 20000)}"
+        else:
+            event = rng.choice(["50 free", "100 free", "50 breast", "100 back"])
+            route, req = "GET /api/rankings", (
+                base + f"/api/rankings?event={urllib.parse.quote(event)}&gender={rng.choice('MF')}"
+                f"&pool_length={rng.choice([25, 50])}&limit=50")
+        started = time.perf_counter()
+        try:
+            with opener.open(req, timeout=30) as r:
+                r.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        latencies, errors = local.setdefault(route, ([], [0]))
+        latencies.append(time.perf_counter() - started)
+        errors[0] += not ok
+    with lock:
+        for route, (latencies, errors) in local.items():
+            total = samples.setdefault(route, ([], [0]))
+            total[0].extend(latencies)
+            total[1][0] += errors[0]
+
+
+def run_config(name: str, env_overrides: dict, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="swimming-engine-")
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port), PYTHONPATH=str(PROJECT_ROOT),
+               EXPORT_CACHE_DIR=str(Path(workdir) / "cache"), METRICS_DIR=str(Path(workdir) / "metrics"),
+               JOB_ARTIFACT_DIR=str(Path(workdir) / "jobs"))
+    env.setdefault("DATABASE_URL", f"sqlite:///{Path(workdir) / 'engine.db'}")
+    env.update(env_overrides)
+    subprocess.run([sys.executable, "-c", _POPULATE, str(args.rows)], env=env, cwd=PROJECT_ROOT, check=True)
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", "2"],
+                              env=env, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(600):
+            try:
+                urllib.request.urlopen(base + "/healthz", timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        from benchmarks.datagen import generate_results
+        payloads = list(generate_results(2000, seed=11))
+        samples, lock = {}, threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=_worker, args=(base, payloads, deadline, random.Random(i), samples, lock))
+            for i in range(args.clients)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {}
+    for route, (latencies, errors) in sorted(samples.items()):
+        ordered = sorted(latencies)
+        report[route] = {
+            "requests": len(ordered),
+            "req_per_sec": round(len(ordered) / args.seconds, 1),
+            "p50_ms": round(statistics.median(ordered) * 1000, 1),
+            "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+            "errors": errors[0],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--postgres-url", default=None)
+    parser.add_argument("--replica-url", default=None)
+    parser.add_argument("--out", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    configs = [("sqlite-rollback", SQLITE_ROLLBACK), ("sqlite-wal", {})]
+    if args.postgres_url:
+        configs.append(("postgres", {"DATABASE_URL": args.postgres_url}))
+        if args.replica_url:
+            configs.append(("postgres-replica",
+                            {"DATABASE_URL": args.postgres_url, "DATABASE_REPLICA_URL": args.replica_url}))
+    results = {}
+    for name, overrides in configs:
+        results[name] = run_config(name, overrides, args)
+        print(f"== {name}")
+        for route, s in results[name].items():
+            print(f"  {route:<20}{s['req_per_sec']:>9.1f} req/s  p50 {s['p50_ms']:>8.1f}ms"
+                  f"  p95 {s['p95_ms']:>8.1f}ms  errors {s['errors']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Wall time per page of the Rudolph PDF extraction, serial vs. page-parallel.
+
+    python benchmarks/bench_pdf_extract.py [--years 2023 2025] [--workers 1 2 4] [--repeat 3]
+
+Every parallel run is checked against extract_rudolph_points_from_pdf for identical output.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from PyPDF2 import PdfReader  # noqa: E402
+from backend.rudolph_pdf_extractor import extract_rudolph_points_from_pdf, iter_rudolph_points_from_pdf  # noqa: E402
+
+
+def best_of(repeat, fn):
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", nargs="+", type=int, default=[2023, 2025])
+    parser.add_argument("--workers", nargs="+", type=int, default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pdf':<18}{'mode':<14}{'pages':>6}{'wall s':>10}{'ms/page':>10}{'speedup':>9}  identical")
+    for year in args.years:
+        pdf_path = PROJECT_ROOT / "docs" / f"rudolph-{year}.pdf"
+        pages = len(PdfReader(pdf_path).pages)
+        serial, reference = best_of(args.repeat, lambda: extract_rudolph_points_from_pdf(pdf_path))
+        print(f"{pdf_path.name:<18}{'serial':<14}{pages:>6}{serial:>10.2f}{serial / pages * 1000:>10.1f}{1.0:>9.2f}  -")
+        for workers in args.workers:
+            wall, records = best_of(args.repeat, lambda: list(iter_rudolph_points_from_pdf(pdf_path, workers)))
+            print(f"{pdf_path.name:<18}{f'workers={workers}':<14}{pages:>6}{wall:>10.2f}"
+                  f"{wall / pages * 1000:>10.1f}{serial / wall:>9.2f}  {records == reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Synthetic swimming results for benchmarks and load tests.
+
+Names, birth years, events, pools, dates and times are drawn so the data looks like a
+national season: a few thousand athletes with several results each, times scattered around
+age-appropriate fractions of the FINA base times. Everything is seeded and offline.
+"""
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+FIRST_NAMES_M = ["Алихан", "Нурсултан", "Ерлан", "Данияр", "Арман", "Тимур", "Иван", "Дмитрий", "Максим",
+                 "Санжар", "Бекзат", "Адиль", "Руслан", "Артём", "Ильяс", "Мирас", "Айдос", "Егор"]
+FIRST_NAMES_F = ["Айгерим", "Дана", "Алина", "Мадина", "Камила", "Асель", "Анна", "Мария", "София",
+                 "Жанель", "Томирис", "Аяулым", "Дарья", "Виктория", "Амина", "Арина", "Сабина", "Инкар"]
+LAST_NAMES = ["Ахметов", "Нурланов", "Искаков", "Сериков", "Жумабаев", "Иванов", "Ким", "Смагулов",
+              "Касымов", "Абдрахманов", "Омаров", "Петров", "Тулегенов", "Бекова", "Сапаров", "Ермеков",
+              "Мусин", "Байжанов", "Кузнецов", "Оспанов", "Есенов", "Калиев", "Токтаров", "Рахимов"]
+COMPETITIONS = ["ЧРК по плаванию Костанай", "РТ Жемчужина бурабая", "РТ по плаванию Веселый дельфин",
+                "ЧРК Астана", "РТ Семей", "ЛЧРК", "ЧРК Шымкент", "РТ Жібек жолы", "МЧРК", "ЗЧРК",
+                "Кубок РК", "РТ Astana Open"]
+EVENTS = ["50M Freestyle", "100M Freestyle", "200M Freestyle", "400M Freestyle", "800M Freestyle",
+          "1500M Freestyle", "50M Breaststroke", "100M Breaststroke", "200M Breaststroke",
+          "50M Butterfly", "100M Butterfly", "200M Butterfly", "50M Backstroke", "100M Backstroke",
+          "200M Backstroke", "200M Medley", "400M Medley"]
+# Sprint events are entered far more often than distance events
+EVENT_WEIGHTS = [10, 10, 6, 4, 2, 1, 6, 6, 3, 6, 5, 2, 6, 5, 3, 5, 2]
+
+
+def _base_times() -> dict:
+    with open(PROJECT_ROOT / "backend" / "base_times.json", "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _format_time(seconds: float) -> str:
+    minutes, rest = divmod(seconds, 60)
+    if minutes:
+        return f"{int(minutes)}:{rest:05.2f}".replace(".", ",")
+    return f"{rest:.2f}".replace(".", ",")
+
+
+def generate_athletes(n: int, rng: random.Random, season: int = 2025) -> list:
+    athletes = []
+    for _ in range(n):
+        gender = rng.choice("MF")
+        first = rng.choice(FIRST_NAMES_M if gender == "M" else FIRST_NAMES_F)
+        last = rng.choice(LAST_NAMES)
+        if gender == "F" and not last.endswith(("а", "Ким")):
+            last += "а"
+        athletes.append({
+            "full_name": f"{last} {first} {rng.randint(1, 99):02d}",  # suffix keeps names distinct
+            "year_of_birth": season - int(rng.triangular(8, 25, 13)),
+            "gender": gender,
+            "skill": rng.uniform(0.0, 1.0),
+        })
+    return athletes
+
+
+def generate_results(n: int, seed: int = 42, season: int = 2025, results_per_athlete: int = 8):
+    """Yield n result dicts in the shape accepted by POST /api/data (times as "m:ss,cc" strings)."""
+    rng = random.Random(seed)
+    base_times = _base_times()
+    athletes = generate_athletes(max(1, n // results_per_athlete), rng, season)
+    season_start = date(season, 1, 10)
+    for _ in range(n):
+        a = rng.choice(athletes)
+        event = rng.choices(EVENTS, EVENT_WEIGHTS)[0]
+        pool = rng.choice((25, 50))
+        table = base_times[f"fina_base_times_{'scm' if pool == 25 else 'lcm'}_{'male' if a['gender'] == 'M' else 'female'}"]
+        base = table[event]
+        age = season - a["year_of_birth"]
+        # Youngsters are much slower; skill spreads athletes of the same age
+        factor = 1.12 + max(0, 18 - age) * 0.045 + (1 - a["skill"]) * 0.25 + rng.gauss(0, 0.02)
+        yield {
+            "full_name": a["full_name"],
+            "year_of_birth": a["year_of_birth"],
+            "gender": a["gender"],
+            "event": event,
+            "result": _format_time(base * max(factor, 1.01)),
+            "name_of_competition": rng.choice(COMPETITIONS),
+            "date_of_competition": (season_start + timedelta(days=rng.randint(0, 330))).isoformat(),
+            "pool_length": pool,
+            "place_taken": rng.randint(1, 8),
+        }
+
+
+def populate(app_module, n: int, seed: int = 42, chunk_size: int = 5000) -> int:
+    """Insert n generated results through the app's own normalization/scoring path.
+
+    Uses the bulk-import building blocks (one executemany per chunk), then rebuilds the
+    leaderboard once. Must run inside an app context.
+    """
+    from itertools import islice
+    from sqlalchemy import insert
+    db = app_module.db
+    table = app_module.Swimmers.__table__
+    rows = generate_results(n, seed)
+    inserted = 0
+    while True:
+        chunk = [app_module._result_values(r) for r in islice(rows, chunk_size)]
+        if not chunk:
+            break
+        app_module.attach_athletes(chunk)
+        db.session.connection().execute(insert(table), chunk)
+        db.session.commit()
+        inserted += len(chunk)
+    app_module.rebuild_rankings()
+    return inserted
@@ -0,0 +1,304 @@
+"""Meet-day load test: many concurrent clients against a local gunicorn.
+
+    python benchmarks/load_meet_day.py [--workers 1 2 4] [--clients 16] [--seconds 30]
+        [--mix post=35,list=30,put=10,delete=5,export=5,rankings=10,stats=5]
+        [--rows 20000] [--database-url postgresql://...] [--think-ms 0]
+        [--out results.json] [--baseline old.json --tolerance 0.25]
+
+Each worker count gets its own gunicorn (gunicorn.conf.py, the production settings) over a
+freshly populated SQLite database, or over --database-url (a scratch Postgres database: its
+tables are created and filled, and rows are updated and deleted). Every client logs in
+through /login and loops over the weighted mix:
+
+  post      POST /api/data with a generated result (what the clerks do all day)
+  list      GET /api/swimmers, a random page
+  put       PUT /api/swimmers/<id>, a corrected time and place
+  delete    DELETE /api/swimmers/<id>, each client deleting its own rows
+  export    GET /api/export?format=csv for one competition
+  rankings  GET /api/rankings for a random event
+  stats     GET /api/stats/results for a random competition
+
+Per route it reports requests, throughput, p50/p95/p99 latency and the error rate (network
+errors and non-2xx/304 responses). The first --warmup seconds are not measured. With
+--baseline, throughput, p95 and error rate are compared route by route against an earlier
+--out file and the exit status is 1 if any got worse by more than --tolerance.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_MIX = "post=35,list=30,put=10,delete=5,export=5,rankings=10,stats=5"
+ROUTES = {
+    "post": "POST /api/data",
+    "list": "GET /api/swimmers",
+    "put": "PUT /api/swimmers/<id>",
+    "delete": "DELETE /api/swimmers/<id>",
+    "export": "GET /api/export",
+    "rankings": "GET /api/rankings",
+    "stats": "GET /api/stats/results",
+}
+RANKING_EVENTS = ["50 free", "100 free", "200 free", "50 breast", "100 breast", "50 fly", "100 back", "200 im"]
+
+# Ensures the table is populated and prints the ids the clients may update or delete
+_PREPARE = r"""
+import json, sys
+import backend.app as A
+from benchmarks.datagen import populate
+app = A.create_app()
+with app.app_context():
+    A.init_db()
+    have = A.db.session.query(A.Swimmers.id).count()
+    if have < int(sys.argv[1]):
+        populate(A, int(sys.argv[1]) - have, seed=have + 7)
+    ids = A.db.session.execute(A.select(A.Swimmers.id).order_by(A.Swimmers.id)).scalars().all()
+    json.dump(ids, sys.stdout)
+"""
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise SystemExit(f"unknown mix entry {name!r}; use {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _login(base: str, username: str, password: str):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    with opener.open(base + "/login", urllib.parse.urlencode({"username": username, "password": password}).encode()) as r:
+        r.read()
+    # A failed login renders the form again instead of redirecting; an API call tells them apart
+    try:
+        opener.open(base + "/api/swimmers?limit=1", timeout=30).close()
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"login as {username!r} failed ({e.code})")
+    return opener
+
+
+class Client(threading.Thread):
+    def __init__(self, index: int, base: str, args, mix: dict, put_ids: list, delete_ids: list,
+                 payloads: list, competitions: list, start_at: float, measure_from: float, deadline: float):
+        super().__init__(daemon=True)
+        self.rng = random.Random(index)
+        self.base, self.args, self.put_ids, self.delete_ids = base, args, put_ids, delete_ids
+        self.payloads, self.competitions = payloads, competitions
+        self.names, self.weights = list(mix), list(mix.values())
+        self.start_at, self.measure_from, self.deadline = start_at, measure_from, deadline
+        self.samples = {}  # route -> ([latency seconds], [error count], {status: count})
+
+    def _request(self, op: str):
+        rng, base = self.rng, self.base
+        if op == "post":
+            return urllib.request.Request(base + "/api/data", urllib.parse.urlencode(rng.choice(self.payloads)).encode())
+        if op == "list":
+            return base + f"/api/swimmers?limit=50&after_id={rng.randint(50, max(51, self.put_ids[-1]))}"
+        if op == "put":
+            body = {"result": f"{rng.uniform(25, 90):.2f}".replace(".", ","), "place_taken": rng.randint(1, 8)}
+            return urllib.request.Request(base + f"/api/swimmers/{rng.choice(self.put_ids)}", json.dumps(body).encode(),
+                                          headers={"Content-Type": "application/json"}, method="PUT")
+        if op == "delete":
+            if not self.delete_ids:
+                return None
+            return urllib.request.Request(base + f"/api/swimmers/{self.delete_ids.pop()}", method="DELETE")
+        if op == "export":
+            return base + "/api/export?format=csv&competition=" + urllib.parse.quote(rng.choice(self.competitions))
+        if op == "rankings":
+            return base + (f"/api/rankings?event={urllib.parse.quote(rng.choice(RANKING_EVENTS))}"
+                           f"&gender={rng.choice('MF')}&pool_length={rng.choice([25, 50])}&limit=50")
+        return base + "/api/stats/results?group_by=event,gender&competition=" + urllib.parse.quote(rng.choice(self.competitions))
+
+    def run(self):
+        opener = _login(self.base, self.args.username, self.args.password)
+        while time.perf_counter() < self.start_at:
+            time.sleep(0.01)
+        while time.perf_counter() < self.deadline:
+            op = self.rng.choices(self.names, self.weights)[0]
+            req = self._request(op)
+            if req is None:
+                continue
+            started = time.perf_counter()
+            try:
+                with opener.open(req, timeout=60) as r:
+                    r.read()
+                    status = r.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except (urllib.error.URLError, OSError):
+                status = 0  # connection refused/reset or timed out
+            finished = time.perf_counter()
+            if started >= self.measure_from and finished <= self.deadline:
+                latencies, errors, statuses = self.samples.setdefault(ROUTES[op], ([], [0], {}))
+                latencies.append(finished - started)
+                errors[0] += not (200 <= status < 300 or status == 304)
+                statuses[status] = statuses.get(status, 0) + 1
+            if self.args.think_ms:
+                time.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+
+
+def run(workers: int, args, mix: dict) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="swimming-load-"))
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port), PYTHONPATH=str(PROJECT_ROOT), WEB_CONCURRENCY=str(workers),
+               EXPORT_CACHE_DIR=str(workdir / "cache"), METRICS_DIR=str(workdir / "metrics"),
+               JOB_ARTIFACT_DIR=str(workdir / "jobs"), SNAPSHOT_DIR=str(workdir / "stats"),
+               DATABASE_URL=args.database_url or f"sqlite:///{workdir / 'load.db'}")
+    prepared = subprocess.run([sys.executable, "-c", _PREPARE, str(args.rows)], env=env, cwd=PROJECT_ROOT,
+                              check=True, capture_output=True, text=True)
+    ids = json.loads(prepared.stdout)
+    rng = random.Random(workers)
+    rng.shuffle(ids)
+    # A quarter of the rows can be deleted, split between the clients; the rest are updated
+    split = len(ids) // 4
+    delete_ids, put_ids = ids[:split], sorted(ids[split:])
+    from benchmarks.datagen import COMPETITIONS, generate_results
+    payloads = list(generate_results(2000, seed=11))
+
+    log_path = workdir / "gunicorn.log"
+    with open(log_path, "wb") as log:
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"],
+                                  env=env, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(1200):
+                try:
+                    urllib.request.urlopen(base + "/healthz", timeout=1).close()
+                    break
+                except OSError:
+                    if server.poll() is not None:
+                        raise SystemExit(f"gunicorn exited; see {log_path}")
+                    time.sleep(0.05)
+            _login(base, args.username, args.password)  # fail fast on bad credentials
+            start_at = time.perf_counter() + 1.0 + args.clients * 0.05  # time for every client to log in
+            measure_from = start_at + args.warmup
+            deadline = measure_from + args.seconds
+            clients = [
+                Client(i, base, args, mix, put_ids, delete_ids[i::args.clients], payloads, COMPETITIONS,
+                       start_at, measure_from, deadline)
+                for i in range(args.clients)
+            ]
+            for c in clients:
+                c.start()
+            for c in clients:
+                c.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+    merged = {}
+    for c in clients:
+        for route, (latencies, errors, statuses) in c.samples.items():
+            total = merged.setdefault(route, ([], [0], {}))
+            total[0].extend(latencies)
+            total[1][0] += errors[0]
+            for status, count in statuses.items():
+                total[2][status] = total[2].get(status, 0) + count
+    report = {}
+    for route, (latencies, errors, statuses) in sorted(merged.items()):
+        ordered = sorted(latencies)
+        report[route] = {
+            "requests": len(ordered),
+            "req_per_sec": round(len(ordered) / args.seconds, 1),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+            "error_rate": round(errors[0] / len(ordered), 4),
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        }
+    every = sorted(x for latencies, _, _ in merged.values() for x in latencies)
+    if every:
+        report["ALL"] = {
+            "requests": len(every),
+            "req_per_sec": round(len(every) / args.seconds, 1),
+            "p50_ms": round(percentile(every, 50) * 1000, 1),
+            "p95_ms": round(percentile(every, 95) * 1000, 1),
+            "p99_ms": round(percentile(every, 99) * 1000, 1),
+            "error_rate": round(sum(e[0] for _, e, _ in merged.values()) / len(every), 4),
+        }
+    return report
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for config, routes in results.items():
+        for route, now in routes.items():
+            before = baseline.get(config, {}).get(route)
+            if not before:
+                continue
+            if now["req_per_sec"] < before["req_per_sec"] * (1 - tolerance):
+                found.append(f"{config} {route}: {before['req_per_sec']} -> {now['req_per_sec']} req/s")
+            if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                found.append(f"{config} {route}: p95 {before['p95_ms']} -> {now['p95_ms']} ms")
+            if now["error_rate"] > before["error_rate"] + 0.01:
+                found.append(f"{config} {route}: error rate {before['error_rate']:.2%} -> {now['error_rate']:.2%}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2], help="gunicorn worker counts to compare")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a client's requests")
+    parser.add_argument("--rows", type=int, default=20000, help="results in the table before the run")
+    parser.add_argument("--database-url", default=None, help="scratch Postgres database instead of SQLite")
+    parser.add_argument("--username", default=os.environ.get("ADMIN_USERNAME", "admin"))
+    parser.add_argument("--password", default=os.environ.get("ADMIN_PASSWORD", "admin2025"))
+    parser.add_argument("--out", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    results = {}
+    for workers in args.workers:
+        name = f"workers={workers}"
+        results[name] = run(workers, args, mix)
+        print(f"== {name}, {args.clients} clients, {args.seconds:g}s")
+        print(f"  {'route':<28}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+        for route, s in results[name].items():
+            print(f"  {route:<28}{s['req_per_sec']:>9.1f}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+                  f"{s['p99_ms']:>10.1f}{s['error_rate']:>9.2%}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            found = regressions(results, json.load(fh), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        raise SystemExit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Micro and macro benchmarks for the scoring and request hot paths.
+
+    python benchmarks/run_benchmarks.py --sizes 10000 100000 [--out results.json] [--compare old.json]
+
+Runs against a throwaway local SQLite database (no network). For every table size it reports
+ops/sec, latency percentiles and peak traced memory for:
+
+  micro: time parsing/formatting (scalar and per 1000-element array), get_base_time,
+         calculate_fina_points, calculate_rudolph_points
+  macro: POST /api/data, GET /api/swimmers, GET /api/export (xlsx and csv)
+
+Results are written as JSON (default benchmarks/results/bench-<timestamp>.json); --compare
+prints the ops/sec ratio against an earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def summarize(latencies_ns: list, wall_s: float, peak_bytes: int = None) -> dict:
+    ordered = sorted(latencies_ns)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] / 1000.0
+
+    return {
+        "ops": len(ordered),
+        "ops_per_sec": round(len(ordered) / wall_s, 1) if wall_s > 0 else None,
+        "p50_us": round(pct(50), 2),
+        "p95_us": round(pct(95), 2),
+        "p99_us": round(pct(99), 2),
+        "max_us": round(ordered[-1] / 1000.0, 2),
+        "peak_mem_kb": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+    }
+
+
+def measure(fn, args_list: list, mem_sample: int = 50) -> dict:
+    """Time fn(*args) for every args tuple, then re-run a sample under tracemalloc for peak memory."""
+    latencies = []
+    perf = time.perf_counter_ns
+    started = time.perf_counter()
+    for args in args_list:
+        t0 = perf()
+        fn(*args)
+        latencies.append(perf() - t0)
+    wall = time.perf_counter() - started
+    tracemalloc.start()
+    for args in args_list[:mem_sample]:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(latencies, wall, peak)
+
+
+def micro_benchmarks(A, rng: random.Random, n: int) -> dict:
+    from backend.utils import time_to_seconds, times_to_seconds, seconds_to_times
+    from backend.export import seconds_to_time
+    from benchmarks.datagen import generate_results
+    samples = list(generate_results(n, seed=rng.randint(0, 10**6)))
+    times = [(s["result"],) for s in samples]
+    seconds = [time_to_seconds(s["result"]) for s in samples]
+    base_args = [(A.event_code(s["event"]), s["gender"], s["pool_length"]) for s in samples]
+    bases = [A.get_base_time(*a) for a in base_args]
+    rudolph_args = [
+        (A.event_code(s["event"]), s["gender"], 2025 - s["year_of_birth"], t)
+        for s, t in zip(samples, seconds)
+    ]
+    A.calculate_rudolph_points(*rudolph_args[0])  # load the points table outside the timings
+    # Array versions are timed per 1000-element batch
+    time_batches = [([t for (t,) in times[i:i + 1000]],) for i in range(0, len(times), 1000)]
+    second_batches = [(seconds[i:i + 1000],) for i in range(0, len(seconds), 1000)]
+    return {
+        "time_to_seconds": measure(time_to_seconds, times),
+        "times_to_seconds_x1000": measure(times_to_seconds, time_batches, mem_sample=5),
+        "seconds_to_time": measure(seconds_to_time, [(t,) for t in seconds]),
+        "seconds_to_times_x1000": measure(seconds_to_times, second_batches, mem_sample=5),
+        "get_base_time": measure(A.get_base_time, base_args),
+        "calculate_fina_points": measure(A.calculate_fina_points, list(zip(bases, seconds))),
+        "calculate_rudolph_points": measure(A.calculate_rudolph_points, rudolph_args),
+    }
+
+
+def macro_benchmarks(A, app, client, rng: random.Random, rows: int, requests: int, export_runs: int) -> dict:
+    from benchmarks.datagen import generate_results
+    from backend.cache import bump_data_version
+    results = {}
+
+    payloads = list(generate_results(requests, seed=rng.randint(0, 10**6)))
+
+    def post(payload):
+        r = client.post("/api/data", data=payload)
+        assert r.status_code == 201, r.get_data(as_text=True)
+    results["add_data"] = measure(post, [(p,) for p in payloads], mem_sample=20)
+
+    # Random cursors and filters so pages mostly miss the read cache
+    def get(url):
+        r = client.get(url)
+        assert r.status_code == 200, r.get_data(as_text=True)
+    max_id = rows + requests
+    list_urls = [(f"/api/swimmers?limit=50&after_id={rng.randint(50, max_id)}",) for _ in range(requests)]
+    results["list_swimmers"] = measure(get, list_urls, mem_sample=20)
+    filtered = [
+        (f"/api/swimmers?limit=50&sort=result&event={rng.choice(['50m freestyle', '100m breaststroke'])}"
+         f"&gender={rng.choice('MF')}&pool_length={rng.choice([25, 50])}&after_id={rng.randint(1, max_id)}"
+         f"&after_value={rng.uniform(25, 90):.2f}",)
+        for _ in range(requests)
+    ]
+    results["list_swimmers_filtered"] = measure(get, filtered, mem_sample=20)
+
+    # Bump the data version before each export so the file cache is always cold
+    def export(fmt):
+        with app.app_context():
+            bump_data_version()
+            A.db.session.commit()
+        r = client.get(f"/api/export?format={fmt}")
+        assert r.status_code == 200, r.get_data(as_text=True)
+        r.get_data()
+        r.close()
+    results["export_xlsx"] = measure(export, [("xlsx",)] * export_runs, mem_sample=1)
+    results["export_csv"] = measure(export, [("csv",)] * export_runs, mem_sample=1)
+    return results
+
+
+def compare(current: dict, previous_path: str) -> None:
+    with open(previous_path, "r", encoding="utf-8") as fh:
+        previous = json.load(fh)
+    old_runs = {run["rows"]: run for run in previous["runs"]}
+    print(f"\nops/sec vs {previous_path}")
+    for run in current["runs"]:
+        old = old_runs.get(run["rows"])
+        if old is None:
+            continue
+        for group in ("micro", "macro"):
+            for name, stats in run[group].items():
+                before = old.get(group, {}).get(name, {}).get("ops_per_sec")
+                if before and stats["ops_per_sec"]:
+                    print(f"  {run['rows']:>9} {name:<26}{before:>12.1f} -> {stats['ops_per_sec']:>12.1f}"
+                          f"  x{stats['ops_per_sec'] / before:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000],
+                        help="table sizes to benchmark at (grown incrementally, ascending)")
+    parser.add_argument("--micro-ops", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--export-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="swimming-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+    os.environ.setdefault("EXPORT_CACHE_DIR", str(Path(workdir) / "export-cache"))
+    import backend.app as A
+    from benchmarks.datagen import populate
+
+    app = A.create_app()
+    with app.app_context():
+        A.init_db()
+    client = app.test_client()
+    client.post("/login", data={"username": A.ADMIN_USERNAME, "password": A.ADMIN_PASSWORD})
+    rng = random.Random(args.seed)
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "sqlite",
+        "runs": [],
+    }
+    rows = 0
+    for size in sorted(args.sizes):
+        with app.app_context():
+            started = time.perf_counter()
+            rows += populate(A, size - rows, seed=args.seed + size)
+            load_s = time.perf_counter() - started
+        print(f"== {rows} rows (loaded in {load_s:.1f}s)")
+        with app.app_context():
+            micro = micro_benchmarks(A, rng, args.micro_ops)
+        macro = macro_benchmarks(A, app, client, rng, rows, args.requests, args.export_runs)
+        rows += args.requests  # add_data inserted these
+        for group, stats in (("micro", micro), ("macro", macro)):
+            for name, s in stats.items():
+                print(f"  {group:<6}{name:<26}{s['ops_per_sec']:>12.1f} ops/s  p50 {s['p50_us']:>10.1f}us"
+                      f"  p95 {s['p95_us']:>10.1f}us  p99 {s['p99_us']:>10.1f}us  peak {s['peak_mem_kb']:>9.1f}KiB")
+        report["runs"].append({"rows": size, "load_seconds": round(load_s, 2), "micro": micro, "macro": macro})
+
+    out = Path(args.out) if args.out else (
+        PROJECT_ROOT / "benchmarks" / "results" / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nSaved {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
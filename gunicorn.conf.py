@@ -0,0 +1,47 @@
+# gunicorn.conf.py (picked up automatically when gunicorn starts from the project root)
+# The app is built once in the master (--preload) and the FINA/Rudolph reference tables are
+# loaded there before the workers fork, so every worker shares them copy-on-write and no
+# worker pays for them on its first request.
+import gc
+import os
+
+wsgi_app = "backend.app:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def _load_reference_tables(log):
+    from backend.app import load_reference_tables
+    seconds = load_reference_tables()
+    log.info("Reference tables loaded in %.0f ms", seconds * 1000)
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        _load_reference_tables(server.log)
+        # Keep the collector from touching (and so copying) the shared objects in each worker
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        _load_reference_tables(worker.log)
+    # Every worker also runs queued background jobs (see backend/jobs.py)
+    from backend.jobs import start_job_runner
+    start_job_runner(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    # Let this worker's running jobs stop and requeue themselves instead of waiting out their lease
+    from backend.jobs import stop_job_runner
+    stop_job_runner()
+
+
+def child_exit(server, worker):
+    # Runs in the master: fold the exited worker's metrics file into the totals (see
+    # backend/metrics.py). Without --preload the master has no app; the next worker that gets
+    # the same pid folds it instead.
+    if server.cfg.preload_app:
+        from backend.metrics import mark_process_dead
+        mark_process_dead(worker.pid)
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+import pytest
+from backend.app import create_app, init_db, db
+from backend import cache, stats
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path / "metrics"))
+    # Per-process caches are keyed by data version, which starts over with every test database
+    monkeypatch.setattr(cache, "_entries", OrderedDict())
+    monkeypatch.setattr(stats, "_snapshot", None)
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "EXPORT_CACHE_DIR": str(tmp_path / "exports"),
+        "SNAPSHOT_DIR": str(tmp_path / "snapshot"),
+        "JOB_ARTIFACT_DIR": str(tmp_path / "jobs"),
+        "POINTS_TABLES_AUTO_PUBLISH": False,
+    })
+    with app.app_context():
+        init_db()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "admin2025"})
+    return client
+
+
+def result_row(**overrides) -> dict:
+    row = {
+        "full_name": "Anna Ivanova", "year_of_birth": 2011, "gender": "F", "event": "100M Freestyle",
+        "result": "1:05,30", "name_of_competition": "City Cup", "date_of_competition": "2025-03-01",
+        "pool_length": 25, "place_taken": 1,
+    }
+    row.update(overrides)
+    return row
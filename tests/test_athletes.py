@@ -0,0 +1,23 @@
+import pytest
+from conftest import result_row
+
+
+@pytest.mark.parametrize("query, error", [
+    ("limit=abc", "limit must be a positive integer"),
+    ("limit=0", "limit must be a positive integer"),
+    ("limit=", "limit must be a positive integer"),
+    ("year_of_birth=20x1", "year_of_birth must be an integer"),
+])
+def test_search_rejects_bad_parameters(client, query, error):
+    response = client.get(f"/api/athletes?{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_search_filters_and_limits(client):
+    rows = [result_row(), result_row(full_name="Anna Petrova", year_of_birth=2012)]
+    assert client.post("/api/data/bulk", json=rows).status_code == 201
+    names = [a["full_name"] for a in client.get("/api/athletes?q=anna&year_of_birth=2012").get_json()]
+    assert names == ["Anna Petrova"]
+    assert len(client.get("/api/athletes?q=anna&limit=1").get_json()) == 1
+    assert len(client.get("/api/athletes?q=anna").get_json()) == 2
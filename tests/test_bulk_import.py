@@ -0,0 +1,72 @@
+import io
+import json
+from sqlalchemy import select, func
+from backend.app import db, Swimmers
+from backend.rankings import Leaderboard
+from conftest import result_row
+
+
+def _count(app) -> int:
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(Swimmers))
+
+
+def test_json_file_upload(app, client):
+    rows = [result_row(), result_row(full_name="Maria Petrova", result="1:07,10")]
+    response = client.post("/api/data/bulk", data={
+        "file": (io.BytesIO(json.dumps(rows).encode("utf-8")), "results.json", "application/json"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201, response.json
+    assert response.json["accepted"] == 2
+    assert _count(app) == 2
+
+
+def test_json_file_upload_rejects_non_array(client):
+    response = client.post("/api/data/bulk", data={
+        "file": (io.BytesIO(b'{"full_name": "x"}'), "results.json", "application/json"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 400
+
+
+def test_atomic_report_matches_rollback(app, client):
+    rows = [result_row(), result_row(full_name="B"), result_row(full_name="C", event="Bogus"),
+            result_row(full_name="D"), result_row(full_name="E")]
+    response = client.post("/api/data/bulk?atomic=true&chunk_size=2", json=rows)
+    assert response.status_code == 400
+    body = response.json
+    statuses = [r["status"] for r in body["rows"]]
+    assert statuses == ["not_inserted", "not_inserted", "rejected", "not_inserted", "not_inserted"]
+    assert body["accepted"] == 0
+    assert body["rejected"] == 1
+    assert _count(app) == 0
+
+
+def test_partial_report_counts(app, client):
+    rows = [result_row(), result_row(full_name="B", event="Bogus"), result_row(full_name="C")]
+    body = client.post("/api/data/bulk", json=rows).json
+    assert [r["status"] for r in body["rows"]] == ["accepted", "rejected", "accepted"]
+    assert (body["accepted"], body["rejected"]) == (2, 1)
+    assert _count(app) == 2
+
+
+def test_committed_chunks_are_ranked_when_a_later_chunk_fails(app, client):
+    # Large enough that the undecodable byte is only read after the first chunks were committed
+    header = "full_name,year_of_birth,gender,event,result,name_of_competition,date_of_competition,pool_length,place_taken\n"
+    lines = "".join(f"Swimmer {i},2011,F,100M Freestyle,1:05.30,City Cup,2025-03-01,25,1\n" for i in range(2999))
+    data = (header + lines).encode("utf-8") + b"Swimmer \xff,2011,F,100M Freestyle,1:05.30,City Cup,2025-03-01,25,1\n"
+    response = client.post("/api/data/bulk?chunk_size=500", data={
+        "file": (io.BytesIO(data), "results.csv", "text/csv"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 400
+    accepted = response.json["accepted"]
+    assert 0 < accepted < 3000
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Leaderboard)) == accepted == _count(app)
+
+
+def test_bad_chunk_size_is_rejected(app, client):
+    for chunk_size in ("0", "-1", "abc"):
+        response = client.post(f"/api/data/bulk?chunk_size={chunk_size}", json=[result_row()])
+        assert response.status_code == 400
+        assert response.json == {"error": "chunk_size must be a positive integer"}
+    assert _count(app) == 0
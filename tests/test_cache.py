@@ -0,0 +1,20 @@
+import os
+import time
+from pathlib import Path
+from backend.cache import EXPORT_CACHE_GRACE_SECONDS, cached_export_path
+
+
+def test_export_cleanup_keeps_newer_and_recent_files(app):
+    with app.app_context():
+        export_dir = Path(app.config["EXPORT_CACHE_DIR"])
+        export_dir.mkdir(parents=True)
+        stale = time.time() - EXPORT_CACHE_GRACE_SECONDS - 10
+        for name in ("v1.0-old.xlsx", "v1.0-recent.xlsx", "v3.0-newer.xlsx", "v3.0-newer-stale.xlsx"):
+            (export_dir / name).write_bytes(b"x")
+        for name in ("v1.0-old.xlsx", "v3.0-newer-stale.xlsx"):
+            os.utime(export_dir / name, (stale, stale))
+        path = cached_export_path(2, None, "key", ".xlsx", lambda tmp: Path(tmp).write_bytes(b"y"))
+        assert path.name == "v2.0-key.xlsx"
+        assert sorted(p.name for p in export_dir.iterdir()) == [
+            "v1.0-recent.xlsx", "v2.0-key.xlsx", "v3.0-newer-stale.xlsx", "v3.0-newer.xlsx",
+        ]
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from backend.app import db
+from backend.jobs import JOB_ARTIFACT_TTL_SECONDS, JOB_KINDS, Job, JobRunner, _expire_artifacts, submit_job
+
+
+def _job(app, job_id) -> Job:
+    with app.app_context():
+        return db.session.get(Job, job_id)
+
+
+def _start(app, monkeypatch, run):
+    monkeypatch.setitem(JOB_KINDS, "test", (lambda params: params, run))
+    with app.app_context():
+        job_id = submit_job("test")[0].id
+    return JobRunner(app, 1).start(), job_id
+
+
+def test_stop_requeues_a_job_once_it_stopped(app, monkeypatch):
+    started = threading.Event()
+
+    def run(ctx, params):
+        started.set()
+        while True:
+            ctx.progress(1, 2, force=True)
+            time.sleep(0.01)
+
+    runner, job_id = _start(app, monkeypatch, run)
+    assert started.wait(5)
+    runner.stop(timeout=5)
+    assert not any(t.is_alive() for t in runner.active.values())
+    job = _job(app, job_id)
+    assert (job.status, job.owner, job.message) == ("queued", None, "requeued after worker shutdown")
+
+
+def test_stop_leaves_a_job_still_running_to_its_lease(app, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def run(ctx, params):
+        started.set()
+        release.wait(5)  # never reports progress
+        return {}
+
+    runner, job_id = _start(app, monkeypatch, run)
+    assert started.wait(5)
+    runner.stop(timeout=0.1)
+    job = _job(app, job_id)
+    assert (job.status, job.owner) == ("running", runner.owner)  # not claimable by another worker
+    release.set()
+    for thread in runner.active.values():
+        thread.join(5)
+    assert _job(app, job_id).status == "succeeded"
+
+
+def test_expired_artifacts_are_deleted(app, tmp_path):
+    artifact_dir = tmp_path / "artifacts"
+    artifact_dir.mkdir()
+    old, recent = artifact_dir / "job-1.xlsx", artifact_dir / "job-2.csv"
+    old.write_bytes(b"x")
+    recent.write_bytes(b"x")
+    stale = time.time() - JOB_ARTIFACT_TTL_SECONDS - 10
+    os.utime(old, (stale, stale))
+    _expire_artifacts(artifact_dir)
+    assert [p.name for p in artifact_dir.iterdir()] == ["job-2.csv"]
+
+
+def test_list_rejects_bad_limit(client):
+    for limit in ("abc", "0", "-3"):
+        response = client.get(f"/api/jobs?limit={limit}")
+        assert response.status_code == 400
+        assert response.json == {"error": "limit must be a positive integer"}
+    assert client.get("/api/jobs?limit=5").status_code == 200
@@ -0,0 +1,54 @@
+import json
+import os
+from backend import metrics
+
+
+def _file(pid, count):
+    return {"http_request_duration_seconds": {'route="/x"': [count] + [0] * len(metrics.REQUEST_BUCKETS) + [0.5 * count]}}
+
+
+def _requests(merged):
+    return merged["http_request_duration_seconds"]['route="/x"'][0]
+
+
+def test_dead_worker_file_is_folded_into_totals(app):
+    directory = metrics.METRICS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "1000001.json").write_text(json.dumps(_file(1000001, 3)))
+    (directory / "1000002.json").write_text(json.dumps(_file(1000002, 4)))
+    metrics.mark_process_dead(1000001)
+    metrics.mark_process_dead(1000002)
+    assert sorted(p.name for p in directory.glob("*.json")) == ["dead.json"]
+    assert _requests(metrics.collect()) == 7
+    metrics.mark_process_dead(1000003)  # no file
+    assert _requests(metrics.collect()) == 7
+
+
+def test_first_flush_folds_a_file_left_under_the_same_pid(app, monkeypatch):
+    directory = metrics.METRICS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{os.getpid()}.json").write_text(json.dumps(_file(os.getpid(), 5)))
+    monkeypatch.setattr(metrics, "_file_pid", None)  # as in a freshly started process
+    monkeypatch.setattr(metrics, "_series", {name: {} for name in metrics.HISTOGRAMS})
+    metrics.observe("http_request_duration_seconds", 'route="/x"', 0.001)
+    metrics.flush(force=True)
+    assert _requests(json.loads((directory / f"{os.getpid()}.json").read_text())) == 1
+    assert _requests(metrics.collect()) == 6
+    metrics.observe("http_request_duration_seconds", 'route="/x"', 0.001)
+    metrics.flush(force=True)  # later flushes just replace the file
+    assert _requests(metrics.collect()) == 7
+
+
+def test_token_protects_metrics(app, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "secret")
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+
+def test_single_row_scoring_is_not_timed(app):
+    from backend.app import calculate_fina_points
+    with metrics._lock:
+        before = dict(metrics._series["scoring_duration_seconds"])
+    calculate_fina_points(60.0, 65.3)
+    assert metrics._series["scoring_duration_seconds"] == before
@@ -0,0 +1,122 @@
+import ast
+import csv
+import json
+import shutil
+from pathlib import Path
+import pytest
+from sqlalchemy import select
+import backend.app as app_module
+from backend import points_tables
+from backend.app import db, Swimmers, reload_reference_tables
+from backend.points_tables import publish_points_tables
+from backend.rankings import Leaderboard
+from conftest import result_row
+
+SOURCE = Path(app_module.__file__).resolve().parent
+
+# name -> result row; the comments give the Rudolph cell (season, age, ...) each one is scored in
+ROWS = {
+    "A": result_row(full_name="A"),  # 2025, F 14, 100 free, 25m
+    "B": result_row(full_name="B", year_of_birth=2012),  # F 13
+    "C": result_row(full_name="C", gender="M"),  # M 14
+    "D": result_row(full_name="D", event="200M Freestyle", result="2:25,00"),
+    "E": result_row(full_name="E", year_of_birth=2010, date_of_competition="2024-03-01"),  # 2024: 2023 table
+    "F": result_row(full_name="F", year_of_birth=2000),  # open class (25)
+    "G": result_row(full_name="G", year_of_birth=2006),  # open class (19)
+    "H": result_row(full_name="H", year_of_birth=2007),  # F 18
+    "I": result_row(full_name="I", pool_length=50),  # F 14, 50m pool
+}
+
+
+@pytest.fixture
+def tables(app, client, tmp_path):
+    data_dir = tmp_path / "tables"
+    data_dir.mkdir()
+    for path in (SOURCE / "data").glob("rudolph_points_*.csv"):
+        shutil.copy(path, data_dir / path.name)
+    shutil.copy(SOURCE / "base_times.json", data_dir / "base_times.json")
+    with pytest.MonkeyPatch.context() as mp, app.app_context():
+        mp.setattr(app_module, "DATA_DIR", data_dir)
+        mp.setattr(app_module, "BASE_TIMES_PATH", data_dir / "base_times.json")
+        mp.setattr(points_tables, "BASE_TIMES_PATH", data_dir / "base_times.json")
+        reload_reference_tables()
+        assert client.post("/api/data/bulk", json=list(ROWS.values())).status_code == 201
+        publish_points_tables()  # baseline
+        yield data_dir
+    with app.app_context():
+        reload_reference_tables()
+
+
+def _edit_rudolph(path, age, gender, stroke, distance, time):
+    with open(path, encoding="utf-8", newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    for row in rows:
+        if row["age"] == str(age) and row["gender"] == gender:
+            events = ast.literal_eval(row["events"])
+            for entry in events[0][stroke]:
+                if entry["distance"] == distance:
+                    entry["time"] = time
+            row["events"] = repr(events)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _points(column) -> dict:
+    db.session.expire_all()
+    return {s.athlete.full_name: getattr(s, column) for s in db.session.scalars(select(Swimmers))}
+
+
+def _ranked(name, column) -> int:
+    return db.session.scalar(
+        select(getattr(Leaderboard, column)).join(Swimmers, Swimmers.id == Leaderboard.swimmer_id)
+        .where(Swimmers.athlete.has(full_name=name))
+    )
+
+
+def _publish(expected_rows, column, changed):
+    before = _points(column)
+    stats = publish_points_tables()
+    assert stats["rows"] == len(expected_rows)
+    after = _points(column)
+    assert {n for n in after if after[n] != before[n]} == set(changed)
+    for name in changed:
+        assert _ranked(name, column) == after[name]  # leaderboard partition refreshed
+    return stats
+
+
+def test_one_rudolph_cell(tables):
+    _edit_rudolph(tables / "rudolph_points_2025.csv", 14, "F", "Freestyle", 100, "09:59,00")
+    stats = _publish({"A", "I"}, "rudolph_points", {"A", "I"})
+    assert stats["tables"] == ["rudolph_2025"]
+
+
+def test_open_class_cell(tables):
+    _edit_rudolph(tables / "rudolph_points_2025.csv", 19, "F", "Freestyle", 100, "09:59,00")
+    _publish({"F", "G"}, "rudolph_points", {"F", "G"})
+
+
+def test_one_base_time(tables):
+    path = tables / "base_times.json"
+    base_times = json.loads(path.read_text(encoding="utf-8"))
+    base_times["fina_base_times_scm_female"]["100M Freestyle"] += 5
+    path.write_text(json.dumps(base_times), encoding="utf-8")
+    # every female 100 free in a 25m pool, any season; not the 50m pool, the boy or the 200
+    stats = _publish({"A", "B", "E", "F", "G", "H"}, "fina_points", {"A", "B", "E", "F", "G", "H"})
+    assert stats["tables"] == ["base_times"]
+
+
+def test_new_table_year(tables):
+    # A 2024 table takes season 2024 over from the 2023 one; it differs from it in one cell
+    shutil.copy(tables / "rudolph_points_2023.csv", tables / "rudolph_points_2024.csv")
+    _edit_rudolph(tables / "rudolph_points_2024.csv", 14, "F", "Freestyle", 100, "09:59,00")
+    stats = _publish({"E"}, "rudolph_points", {"E"})
+    assert stats["tables"] == ["rudolph_2024"]
+
+
+def test_first_publish_warns_about_the_baseline(app, caplog):
+    with app.app_context():
+        stats = publish_points_tables()
+    assert stats["baseline"] is True and stats["rows"] == 0
+    assert "--full" in caplog.text
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import MetaData, select, func, text
+from sqlalchemy.schema import CreateTable
+from backend.app import db, init_db, Athlete, Swimmers, YEAR
+from backend.seasons import ALL_SEASONS, SwimmersArchive, archive_season, parse_seasons
+from conftest import result_row
+
+
+def _ddl() -> str:
+    return db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'swimmers'")).scalar()
+
+
+def _import(client, rows):
+    response = client.post("/api/data/bulk", json=rows)
+    assert response.status_code == 201, response.json
+
+
+def test_new_schema_uses_autoincrement(app):
+    with app.app_context():
+        assert "AUTOINCREMENT" in _ddl().upper()
+
+
+def test_archived_ids_are_not_reused(app, client):
+    _import(client, [result_row(date_of_competition="2025-02-01")])
+    _import(client, [result_row(full_name=f"S{i}", date_of_competition="2024-05-01") for i in range(3)])
+    with app.app_context():
+        assert archive_season(2024) == 3  # the newest rows may be archived
+        archived = set(db.session.scalars(select(SwimmersArchive.id)))
+    _import(client, [result_row(full_name="New")])
+    with app.app_context():
+        db.session.execute(Swimmers.__table__.delete().where(Swimmers.id == max(db.session.scalars(select(Swimmers.id)))))
+        db.session.commit()
+    _import(client, [result_row(full_name="Newer")])
+    with app.app_context():
+        live = set(db.session.scalars(select(Swimmers.id)))
+        assert not live & archived
+        assert min(live - {1}) > max(archived)
+
+
+def test_existing_table_is_rebuilt_above_archived_ids(app, client):
+    _import(client, [result_row(), result_row(full_name="B")])
+    with app.app_context():
+        # An older database: swimmers without AUTOINCREMENT, archived ids above the live ones
+        rows = [r._asdict() for r in db.session.execute(select(*Swimmers.__table__.c))]
+        db.session.execute(text("DROP TABLE swimmers"))
+        metadata = MetaData()
+        Athlete.__table__.to_metadata(metadata)
+        plain = Swimmers.__table__.to_metadata(metadata)
+        plain.dialect_options["sqlite"]["autoincrement"] = False
+        db.session.execute(CreateTable(plain))
+        db.session.execute(plain.insert(), rows)
+        db.session.execute(SwimmersArchive.__table__.insert(), [dict(rows[0], id=50, season=2024)])
+        db.session.commit()
+        assert "AUTOINCREMENT" not in _ddl().upper()
+        init_db()
+        assert "AUTOINCREMENT" in _ddl().upper()
+        assert db.session.scalar(select(func.count()).select_from(Swimmers)) == 2
+    _import(client, [result_row(full_name="C")])
+    with app.app_context():
+        assert max(db.session.scalars(select(Swimmers.id))) == 51
+
+
+@pytest.mark.parametrize("value", ["1-3000000", "1899", "2024-99999999999", f"{YEAR + 2}"])
+def test_parse_seasons_checks_bounds_first(value):
+    with pytest.raises(ValueError, match="out of range"):
+        parse_seasons(value)
+
+
+def test_parse_seasons():
+    assert parse_seasons("2023, 2021-2022,2023") == (2021, 2022, 2023)
+    assert parse_seasons("All") == ALL_SEASONS
@@ -0,0 +1,17 @@
+import pytest
+from conftest import result_row
+
+
+@pytest.mark.parametrize("limit", ["-1", "0", "abc"])
+def test_bad_limit_is_rejected(client, limit):
+    assert client.post("/api/data/bulk", json=[result_row()]).status_code == 201
+    response = client.get(f"/api/stats/results?limit={limit}")
+    assert response.status_code == 400
+    assert response.json == {"error": "limit must be a positive integer"}
+
+
+def test_limit(client):
+    rows = [result_row(), result_row(full_name="B", event="200M Freestyle", result="2:25,00")]
+    assert client.post("/api/data/bulk", json=rows).status_code == 201
+    assert len(client.get("/api/stats/results?group_by=event").json) == 2
+    assert len(client.get("/api/stats/results?group_by=event&limit=1").json) == 1
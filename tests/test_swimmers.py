@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import update
+from backend.app import db, Swimmers
+from conftest import result_row
+
+
+def _pages(client, query):
+    ids, after = [], ""
+    while True:
+        response = client.get(f"/api/swimmers?{query}&limit=2{after}")
+        assert response.status_code == 200, response.json
+        ids += [r["id"] for r in response.json]
+        if "X-Next-After-Id" not in response.headers:
+            return ids
+        after = f"&after_id={response.headers['X-Next-After-Id']}&after_value={response.headers['X-Next-After-Value']}"
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_reach_results_without_points(app, client, order):
+    rows = [result_row(full_name=f"Swimmer {i}", result=f"1:0{i},00") for i in range(6)]
+    assert client.post("/api/data/bulk", json=rows).status_code == 201
+    with app.app_context():
+        db.session.execute(update(Swimmers).where(Swimmers.id > 3).values(fina_points=None))
+        db.session.commit()
+    ids = _pages(client, f"sort=fina_points&order={order}")
+    assert sorted(ids) == [1, 2, 3, 4, 5, 6]
+    assert set(ids[3:]) == {4, 5, 6}  # NULLs last either way
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1", "limit=abc", "sort=fina_points&after_id=3&after_value=x"])
+def test_list_rejects_bad_parameters(client, query):
+    response = client.get(f"/api/swimmers?{query}")
+    assert response.status_code == 400
+    assert "list index" not in response.json["error"]
+
+
+@pytest.mark.parametrize("query", ["limit=abc", "limit=-1", "limit="])
+def test_stream_rejects_bad_limit(client, query):
+    response = client.get(f"/api/swimmers/stream?{query}")
+    assert response.status_code == 400
+    assert response.json == {"error": "limit must be a non-negative integer"}
+
+
+def test_stream_limit(client):
+    rows = [result_row(full_name=f"Swimmer {i}") for i in range(3)]
+    assert client.post("/api/data/bulk", json=rows).status_code == 201
+    assert len(client.get("/api/swimmers/stream?limit=2").data.splitlines()) == 2
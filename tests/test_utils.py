@@ -0,0 +1,130 @@
+# The vectorized parser/formatter must agree with the scalar functions element for element,
+# including the inputs the scalar rejects. Inputs are seeded random strings and numbers.
+import math
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from backend.export import seconds_to_time
+from backend.utils import time_to_seconds, times_to_seconds, seconds_to_times
+
+N = 20000
+
+
+def _digits(rng, lo, hi) -> str:
+    return "".join(rng.choice("0123456789") for _ in range(rng.randint(lo, hi)))
+
+
+def _time_string(rng) -> str:
+    kind = rng.randrange(8)
+    sep = rng.choice(",.")
+    if kind == 0:  # M:SS.cc / MM:SS,cc
+        return f"{_digits(rng, 1, 2)}:{_digits(rng, 2, 2)}{sep}{_digits(rng, 1, 3)}"
+    if kind == 1:  # SS.cc
+        return f"{_digits(rng, 1, 3)}{sep}{_digits(rng, 1, 3)}"
+    if kind == 2:  # hours: H:MM:SS.cc (rejected by the scalar)
+        return f"{_digits(rng, 1, 2)}:{_digits(rng, 2, 2)}:{_digits(rng, 2, 2)}{sep}{_digits(rng, 2, 2)}"
+    if kind == 3:  # no fraction, or nothing after the separator
+        return rng.choice([f"{_digits(rng, 1, 2)}:{_digits(rng, 1, 2)}", _digits(rng, 1, 4), f"{_digits(rng, 1, 2)}{sep}"])
+    if kind == 4:  # surrounding whitespace
+        return f"{rng.choice(['', ' ', '  ', chr(9)])}{_digits(rng, 1, 2)}:{_digits(rng, 2, 2)}{sep}{_digits(rng, 2, 2)}{rng.choice(['', ' ', chr(10)])}"
+    if kind == 5:  # long digit runs (past the fast path's precision limit)
+        return f"{_digits(rng, 1, 9)}:{_digits(rng, 1, 9)}{sep}{_digits(rng, 1, 9)}"
+    # anything: signs, exponents, letters, non-ASCII digits, empty strings
+    return "".join(rng.choice("0123456789:,.-+eE nai٣½") for _ in range(rng.randint(0, 10)))
+
+
+def _scalar_seconds(value):
+    try:
+        return time_to_seconds(value)
+    except Exception:
+        return None
+
+
+def _assert_parsed_like_scalar(values, out, invalid):
+    invalid = set(invalid)
+    for i, value in enumerate(values):
+        expected = _scalar_seconds(value)
+        if expected is None:
+            assert i in invalid, value
+            assert math.isnan(out[i]), value
+        else:
+            assert i not in invalid, value
+            assert out[i] == expected or (math.isnan(expected) and math.isnan(out[i])), (value, out[i], expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_times_to_seconds_matches_scalar(seed):
+    rng = random.Random(seed)
+    values = [_time_string(rng) for _ in range(N)]
+    out, invalid = times_to_seconds(values)
+    _assert_parsed_like_scalar(values, out, invalid)
+
+
+def test_times_to_seconds_mixed_objects():
+    rng = random.Random(7)
+    values = [None, float("nan"), "nan", "", " ", 65.3, 12, "1:05,30", "01:05.3", "65,30", "1:02:03.45", "-1:05,30"]
+    values += [rng.uniform(0, 2000) for _ in range(200)] + [_time_string(rng) for _ in range(200)]
+    rng.shuffle(values)
+    out, invalid = times_to_seconds(values)
+    _assert_parsed_like_scalar(values, out, invalid)
+
+
+def test_times_to_seconds_numpy_and_series():
+    rng = random.Random(11)
+    values = [_time_string(rng) for _ in range(2000)]
+    out, invalid = times_to_seconds(np.array(values, dtype=str))
+    _assert_parsed_like_scalar(values, out, invalid)
+    series = pd.Series(values, index=range(100, 100 + len(values)))
+    out_series, invalid_labels = times_to_seconds(series)
+    assert list(out_series.index) == list(series.index)
+    _assert_parsed_like_scalar(values, out_series.to_numpy(), [label - 100 for label in invalid_labels])
+    numbers = np.array([rng.uniform(0, 500) for _ in range(100)])
+    out, invalid = times_to_seconds(numbers)
+    assert invalid == [] and (out == numbers).all()
+
+
+def _scalar_time(value):
+    try:
+        return seconds_to_time(value)
+    except Exception:
+        return None
+
+
+def _assert_formatted_like_scalar(values, out, invalid):
+    invalid = set(invalid)
+    for i, value in enumerate(values):
+        expected = _scalar_time(value)
+        if expected is None:
+            assert i in invalid and out[i] == "", value
+        else:
+            assert i not in invalid and out[i] == expected, (value, out[i], expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_seconds_to_times_matches_scalar(seed):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(N):
+        kind = rng.randrange(5)
+        if kind == 0:
+            values.append(round(rng.uniform(0, 6000), 2))  # up to 100 minutes
+        elif kind == 1:
+            values.append(rng.uniform(0, 60))  # unrounded
+        elif kind == 2:
+            values.append(rng.randint(0, 10 ** 5))  # past the two-digit minutes
+        elif kind == 3:
+            values.append(rng.uniform(-100, 0))
+        else:
+            values.append(rng.choice([float("nan"), float("inf"), -float("inf"), 5999.999, 6000.0, 0.0]))
+    out, invalid = seconds_to_times(values)
+    _assert_formatted_like_scalar(values, out, invalid)
+    array = np.array(values, dtype=float)
+    out, invalid = seconds_to_times(array)
+    _assert_formatted_like_scalar(values, out, invalid)
+
+
+def test_seconds_to_times_non_numbers():
+    values = [None, "abc", "65.3", "", 65.3, float("nan"), "1:05,30", b"12"]
+    out, invalid = seconds_to_times(values)
+    _assert_formatted_like_scalar(values, out, invalid)